@@ -0,0 +1,184 @@
+from typing import AsyncIterator, Deque, Dict, List
+from collections import deque
+from contextlib import asynccontextmanager
+import asyncio
+import math
+import time
+import logging
+
+from metrics import ADMISSION_DECISIONS, REQUEST_STAGE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Retry-After bounds (seconds) for shed requests
+MIN_RETRY_AFTER_SECONDS = 1
+MAX_RETRY_AFTER_SECONDS = 60
+
+# Weight of the newest sample in the moving average of how long requests hold their cost
+HOLD_TIME_SMOOTHING = 0.2
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed instead of admitted"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class AdmissionController:
+    """Caps the estimated cost of the requests a worker runs at once
+
+    A request's cost is the number of symbol-days it touches, which is what
+    its memory use and compute time grow with. Requests run while the total
+    cost in flight stays within max_cost; the others wait in a bounded FIFO
+    queue. A request is shed with AdmissionRejected when the queue is full,
+    when the wait predicted from the backlog exceeds max_wait_seconds, or
+    when it has waited that long without getting in. A single request costing
+    more than max_cost is counted as max_cost, so it runs alone.
+
+    Requests on the fast lane (everything already cached) skip the fetch, so
+    they count fast_lane_cost_factor of their cost. They are admitted ahead of
+    the queue whenever that reduced cost fits under the cap, and otherwise
+    wait like any other request. Must be used from the event loop thread.
+    """
+
+    def __init__(self, max_cost: int, max_queue: int, max_wait_seconds: float, fast_lane_cost_factor: float = 1.0):
+        self.max_cost = max_cost
+        self.max_queue = max_queue
+        self.max_wait_seconds = max_wait_seconds
+        self.fast_lane_cost_factor = fast_lane_cost_factor
+        self._in_flight_cost = 0
+        self._in_flight = 0
+        self._waiters: Deque[List] = deque()
+        self._queued_cost = 0
+        self._mean_hold_seconds = 0.0
+        self._counts: Dict[str, int] = {
+            "admitted": 0, "queued": 0, "fast_lane": 0,
+            "shed_queue_full": 0, "shed_overloaded": 0, "shed_timeout": 0
+        }
+
+    @asynccontextmanager
+    async def admit(self, cost: int, fast_lane: bool = False) -> AsyncIterator[None]:
+        """
+        Hold a share of the capacity for the duration of the block
+
+        Args:
+            cost: Estimated cost of the request in symbol-days
+            fast_lane: Whether everything the request needs is cached; its cost
+                is scaled down and it may be admitted ahead of the queue
+
+        Raises:
+            AdmissionRejected: If the request was shed
+        """
+        if fast_lane:
+            cost = math.ceil(cost * self.fast_lane_cost_factor)
+        cost = max(1, min(cost, self.max_cost))
+        started = time.monotonic()
+        if fast_lane and self._in_flight_cost + cost <= self.max_cost:
+            self._grant(cost)
+            self._record("fast_lane")
+        else:
+            fast_lane = False
+            try:
+                await self._acquire(cost)
+            finally:
+                REQUEST_STAGE_SECONDS.observe(time.monotonic() - started, stage="admission")
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            # Cached requests finish quickly and would skew the wait predicted for cold ones
+            self._release(cost, 0.0 if fast_lane else time.monotonic() - started)
+
+    async def _acquire(self, cost: int) -> None:
+        if not self._waiters and self._in_flight_cost + cost <= self.max_cost:
+            self._grant(cost)
+            self._record("admitted")
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self._shed("shed_queue_full", f"Admission queue is full ({self.max_queue} requests waiting)")
+        predicted_wait = self._predicted_wait(cost)
+        if predicted_wait > self.max_wait_seconds:
+            self._shed("shed_overloaded", f"Server busy, predicted wait {predicted_wait:.1f}s")
+
+        future = asyncio.get_running_loop().create_future()
+        waiter = [cost, future]
+        self._waiters.append(waiter)
+        self._queued_cost += cost
+        self._record("queued")
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait_seconds)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # Granted just as the wait ended; give the capacity back
+                self._release(cost, 0.0)
+            else:
+                future.cancel()
+                self._waiters.remove(waiter)
+                self._queued_cost -= cost
+                # A request at the head may have been blocking smaller ones behind it
+                self._wake()
+            if isinstance(e, asyncio.TimeoutError):
+                self._shed("shed_timeout", f"Not admitted within {self.max_wait_seconds}s")
+            raise
+        self._record("admitted")
+
+    def _grant(self, cost: int) -> None:
+        self._in_flight_cost += cost
+        self._in_flight += 1
+
+    def _release(self, cost: int, held_seconds: float) -> None:
+        self._in_flight_cost -= cost
+        self._in_flight -= 1
+        if held_seconds > 0:
+            self._mean_hold_seconds += HOLD_TIME_SMOOTHING * (held_seconds - self._mean_hold_seconds)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admit waiters in arrival order for as long as they fit"""
+        while self._waiters:
+            cost, future = self._waiters[0]
+            if self._in_flight_cost + cost > self.max_cost:
+                break
+            self._waiters.popleft()
+            self._queued_cost -= cost
+            self._grant(cost)
+            future.set_result(None)
+
+    def _predicted_wait(self, cost: int) -> float:
+        """Seconds until a new request would get in, assuming the cap drains once per mean hold time"""
+        backlog = self._in_flight_cost + self._queued_cost + cost - self.max_cost
+        return max(0.0, backlog / self.max_cost * self._mean_hold_seconds)
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait before retrying, from the current backlog"""
+        backlog = self._in_flight_cost + self._queued_cost
+        seconds = backlog / self.max_cost * max(self._mean_hold_seconds, 0.1)
+        return max(MIN_RETRY_AFTER_SECONDS, min(MAX_RETRY_AFTER_SECONDS, math.ceil(seconds)))
+
+    def _shed(self, outcome: str, message: str) -> None:
+        self._record(outcome)
+        logger.warning(f"Shedding request: {message}")
+        raise AdmissionRejected(message, self.retry_after())
+
+    def _record(self, outcome: str) -> None:
+        self._counts[outcome] += 1
+        ADMISSION_DECISIONS.inc(outcome=outcome)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the controller state
+
+        Returns:
+            Dictionary with the decision counts, the requests and cost in flight
+            and waiting, the cost cap and the mean time a request holds its cost
+        """
+        return {
+            **self._counts,
+            "in_flight": self._in_flight,
+            "in_flight_cost": self._in_flight_cost,
+            "waiting": len(self._waiters),
+            "waiting_cost": self._queued_cost,
+            "max_cost": self.max_cost,
+            "mean_hold_seconds": round(self._mean_hold_seconds, 3)
+        }
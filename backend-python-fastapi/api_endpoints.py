@@ -1,11 +1,39 @@
-from typing import Dict, List, Any, Optional
-from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List, Any, Optional, Callable, Collection, TypeVar, Iterator, AsyncIterator, AsyncContextManager, Tuple
+from fastapi import APIRouter, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 from pydantic import BaseModel, Field
-from datetime import date, datetime
+from contextlib import AsyncExitStack, nullcontext
+from datetime import date, datetime, timedelta
+import asyncio
+import threading
+import time
 import logging
 
+import numpy as np
+
 from data_fetcher import StockDataFetcher
 from data_processor import StockDataProcessor
+from price_series import DailySeries
+from singleflight import SingleFlight
+from shared_cache import create_shared_cache
+from warmup import WarmupScheduler
+from live_updates import LiveUpdateHub, LiveSubscriber
+from admission import AdmissionController, AdmissionRejected
+from cache import TTLLRUCache
+from compression import negotiate_encoding, compress
+from http_caching import (
+    IMMUTABLE_CACHE_CONTROL, VARY_ENCODING, VARY_FORMAT_AND_ENCODING, query_etag, body_etag, representation_etag, etag_matches, live_cache_control
+)
+import market_calendar
+from metrics import REQUEST_STAGE_SECONDS
+from response_formats import (
+    JSON_FORMAT, MEDIA_TYPES, negotiate_format, is_columnar, is_streaming, encode_returns,
+    encode_ndjson_line, encode_message
+)
+from data_processor import RESAMPLE_PERIODS
+from portfolio_analytics import PortfolioAnalyzer, CORRELATION, MATRIX_STATISTICS
+from downsampling import METHODS as DOWNSAMPLE_METHODS, NO_DOWNSAMPLING
 from config import config
 
 logger = logging.getLogger(__name__)
@@ -31,17 +59,433 @@ class DailyReturn(BaseModel):
 class ReturnsResponse(BaseModel):
     data: Dict[str, List[Dict[str, Any]]] = Field(..., description="Returns data for each symbol")
 
+class BatchQuery(BaseModel):
+    start: str = Field(..., description="Start date in YYYY-MM-DD format")
+    end: str = Field(..., description="End date in YYYY-MM-DD format")
+    symbols: Optional[List[str]] = Field(None, description="Stock symbols. If not provided, uses all MAG7 stocks.")
+
+class BatchRequest(BaseModel):
+    queries: List[BatchQuery] = Field(
+        ..., min_length=1, max_length=config.BATCH_MAX_QUERIES,
+        description="Returns queries answered from one shared fetch"
+    )
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "queries": [
+                    {"start": "2024-01-01", "end": "2024-02-01", "symbols": ["AAPL", "MSFT"]},
+                    {"start": "2024-01-15", "end": "2024-03-01", "symbols": ["MSFT"]}
+                ]
+            }
+        }
+
 class SymbolsResponse(BaseModel):
     symbols: List[str] = Field(..., description="List of available stock symbols")
     description: str = Field(..., description="Description of the symbol set")
 
+class SymbolMatch(BaseModel):
+    symbol: str = Field(..., description="Ticker symbol")
+    name: str = Field(..., description="Company or fund name, empty if unknown")
+
+class SymbolSearchResponse(BaseModel):
+    query: str = Field(..., description="Search prefix as received")
+    results: List[SymbolMatch] = Field(..., description="Ticker prefix matches first, then name prefix matches")
+
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="Error message")
     detail: Optional[str] = Field(None, description="Additional error details")
 
 # Initialize services
-data_fetcher = StockDataFetcher()
-data_processor = StockDataProcessor()
+# Cache shared by all worker processes (None unless SHARED_CACHE_BACKEND is set)
+shared_cache = create_shared_cache()
+data_fetcher = StockDataFetcher(shared_cache=shared_cache)
+data_processor = StockDataProcessor(shared_cache=shared_cache)
+portfolio_analyzer = PortfolioAnalyzer(data_processor)
+
+# Encoded bodies of immutable historical responses, keyed by (query ETag, content coding).
+# Kept per worker: re-encoding is cheaper than moving multi-MB bodies through the shared backend.
+compressed_responses = TTLLRUCache("compressed", config.COMPRESSED_CACHE_MAX_BYTES)
+
+# Identical concurrent returns computations share one execution
+returns_flight = SingleFlight("returns")
+
+# Background warm-up of the configured symbol universe, started from the app lifespan
+warmup_scheduler = WarmupScheduler(data_fetcher, config.MAG7_SYMBOLS, config.MAX_DATE_RANGE_DAYS)
+
+# One upstream poller per followed symbol, shared by all WebSocket subscribers
+live_hub = LiveUpdateHub(data_fetcher, data_processor)
+
+# Bounds the symbol-days of returns work running at once in this worker
+admission = AdmissionController(
+    config.ADMISSION_MAX_COST, config.ADMISSION_MAX_QUEUE, config.ADMISSION_MAX_WAIT_SECONDS,
+    config.ADMISSION_CACHED_COST_FACTOR
+)
+
+T = TypeVar("T")
+
+# Points per symbol when downsampling is requested without a target
+DEFAULT_DOWNSAMPLE_POINTS = 500
+
+# How often a running stage checks whether the client is still connected
+DISCONNECT_POLL_INTERVAL_SECONDS = 0.25
+
+class ClientDisconnected(Exception):
+    """Raised when the client goes away while a request stage is still running"""
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL_SECONDS)
+
+def _admit(start_date: date, end_date: date, symbols: List[str]) -> AsyncContextManager[None]:
+    """
+    Admission for the work of one query, sized by the symbol-days it covers
+    
+    Queries whose prices are all cached locally take the fast lane, since
+    they need no upstream fetch; their computation still counts at a reduced cost.
+    
+    Raises:
+        AdmissionRejected: On entering, if the request was shed
+    """
+    if not config.ADMISSION_ENABLED:
+        return nullcontext()
+    cost = len(symbols) * (end_date - start_date).days
+    return admission.admit(cost, fast_lane=data_fetcher.is_cached(start_date, end_date, symbols))
+
+def _admit_batch(
+    parsed: Dict[int, Tuple[date, date, List[str]]],
+    fetches: Dict[Tuple[date, date], List[str]]
+) -> AsyncContextManager[None]:
+    """
+    Admission for a whole batch, costing as much as its queries would separately
+    
+    The merged fetches never cover more symbol-days than the queries, so this
+    bounds both the fetched series held in memory and the returns computed.
+    
+    Raises:
+        AdmissionRejected: On entering, if the batch was shed
+    """
+    if not config.ADMISSION_ENABLED:
+        return nullcontext()
+    cost = sum(len(symbols) * (end_date - start_date).days for start_date, end_date, symbols in parsed.values())
+    cached = all(
+        data_fetcher.is_cached(start_date, end_date, symbols)
+        for (start_date, end_date), symbols in fetches.items()
+    )
+    return admission.admit(cost, fast_lane=cached)
+
+def _overloaded(e: AdmissionRejected) -> HTTPException:
+    """503 telling the client when to retry a shed request"""
+    return HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def run_stage(
+    request: Request,
+    stage: str,
+    timeout: float,
+    func: Callable[..., T],
+    *args: Any,
+    cancel_event: Optional[threading.Event] = None
+) -> T:
+    """
+    Run a blocking request stage in the thread pool so the event loop stays responsive
+    
+    Args:
+        request: Incoming request, watched for client disconnects
+        stage: Stage name used in error messages
+        timeout: Maximum number of seconds the stage may take
+        func: Blocking callable implementing the stage
+        *args: Positional arguments for func
+        cancel_event: Optional event set when the stage is abandoned, so the
+            callable can skip work that has not started yet
+        
+    Returns:
+        The return value of func
+        
+    Raises:
+        HTTPException: 504 if the stage timed out
+        ClientDisconnected: If the client disconnected before the stage finished
+    """
+    started = time.perf_counter()
+    work = asyncio.ensure_future(run_in_threadpool(func, *args))
+    disconnect = asyncio.ensure_future(_wait_for_disconnect(request))
+    try:
+        done, _ = await asyncio.wait(
+            {work, disconnect},
+            timeout=timeout,
+            return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        disconnect.cancel()
+        REQUEST_STAGE_SECONDS.observe(time.perf_counter() - started, stage=stage)
+    
+    if work in done:
+        return work.result()
+    
+    # The worker thread cannot be interrupted, but we stop waiting for it and
+    # let it skip whatever has not started yet
+    work.cancel()
+    if cancel_event is not None:
+        cancel_event.set()
+    
+    if disconnect in done:
+        raise ClientDisconnected(f"Client disconnected during {stage}")
+    raise HTTPException(status_code=504, detail=f"Timed out after {timeout}s during {stage}")
+
+def _parse_query(start: str, end: str, symbols: Optional[str]) -> Tuple[date, date, Optional[List[str]]]:
+    """
+    Parse and validate the date range and symbols shared by the returns endpoints
+    
+    Returns:
+        Start date, end date and the list of symbols (None for all MAG7 symbols)
+        
+    Raises:
+        HTTPException: 400 if a parameter is invalid
+    """
+    # Parse and validate dates
+    try:
+        start_date = datetime.strptime(start, '%Y-%m-%d').date()
+        end_date = datetime.strptime(end, '%Y-%m-%d').date()
+    except ValueError as e:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid date format. Use YYYY-MM-DD format. Error: {str(e)}"
+        )
+    
+    # Parse symbols if provided
+    symbols_list = None
+    if symbols:
+        try:
+            # Split by comma and clean up whitespace
+            symbols_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
+            
+            # Validate symbols
+            data_fetcher.validate_symbols(symbols_list)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+    
+    # Validate date range
+    try:
+        data_fetcher.validate_date_range(start_date, end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return start_date, end_date, symbols_list
+
+def _stream_returns_lines(
+    start_date: date,
+    end_date: date,
+    symbols: Optional[List[str]],
+    cancel_event: threading.Event
+) -> Iterator[bytes]:
+    """
+    Yield one NDJSON line per symbol as soon as its returns are computed
+    
+    Only one symbol's prices and returns are held at a time (plus whatever the
+    fetcher still has in flight), so memory does not grow with the request size.
+    """
+    for symbol, prices, error in data_fetcher.iter_daily_prices(
+        start_date, end_date, symbols, cancel_event
+    ):
+        if error is None:
+            try:
+                data_processor.validate_price_data({symbol: prices})
+                returns = data_processor.calculate_daily_returns({symbol: prices}).get(symbol, [])
+                yield encode_ndjson_line({"symbol": symbol, "returns": returns})
+                continue
+            except ValueError as e:
+                error = str(e)
+        
+        # Headers are already sent, so failures are reported inline per symbol
+        yield encode_ndjson_line({"symbol": symbol, "error": error})
+
+def _parse_batch(queries: List[BatchQuery]) -> Tuple[Dict[int, Tuple[date, date, List[str]]], Dict[int, str]]:
+    """
+    Parse every query of a batch
+    
+    Returns:
+        Start date, end date and symbols of each valid query, and the error
+        message of each invalid one, both keyed by query index
+    """
+    parsed: Dict[int, Tuple[date, date, List[str]]] = {}
+    errors: Dict[int, str] = {}
+    for index, query in enumerate(queries):
+        try:
+            start_date, end_date, symbols_list = _parse_query(
+                query.start, query.end, ",".join(query.symbols) if query.symbols is not None else None
+            )
+            parsed[index] = (start_date, end_date, symbols_list or list(data_fetcher.symbols))
+        except HTTPException as e:
+            errors[index] = e.detail
+    return parsed, errors
+
+def _merge_ranges(ranges: List[Tuple[date, date]]) -> List[Tuple[date, date]]:
+    """Merge overlapping or adjacent [start, end) date ranges, leaving gaps between them unfetched"""
+    merged: List[Tuple[date, date]] = []
+    for start_date, end_date in sorted(ranges):
+        if merged and start_date <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end_date))
+        else:
+            merged.append((start_date, end_date))
+    return merged
+
+def _plan_batch_fetches(parsed: Dict[int, Tuple[date, date, List[str]]]) -> Dict[Tuple[date, date], List[str]]:
+    """
+    Group the symbols of a batch into as few fetches as possible
+    
+    The ranges each symbol is queried over are merged where they overlap or
+    touch, so two queries years apart fetch two short ranges rather than
+    everything in between. Symbols needing the same merged range share a fetch.
+    
+    Returns:
+        Dictionary mapping each range to fetch to the symbols needed over it
+    """
+    ranges: Dict[str, List[Tuple[date, date]]] = {}
+    for start_date, end_date, symbols_list in parsed.values():
+        for symbol in symbols_list:
+            ranges.setdefault(symbol, []).append((start_date, end_date))
+    fetches: Dict[Tuple[date, date], List[str]] = {}
+    for symbol, symbol_ranges in ranges.items():
+        for merged_range in _merge_ranges(symbol_ranges):
+            fetches.setdefault(merged_range, []).append(symbol)
+    return fetches
+
+def _fetch_batch(
+    fetches: Dict[Tuple[date, date], List[str]],
+    cancel_event: threading.Event
+) -> Dict[str, List[Tuple[date, date, DailySeries]]]:
+    """
+    Run the fetches planned for a batch
+    
+    A failed fetch is logged and its symbols left out, so only the queries
+    that need them report an error.
+    
+    Returns:
+        Dictionary mapping symbol to the fetched ranges and their close prices
+    """
+    prices: Dict[str, List[Tuple[date, date, DailySeries]]] = {}
+    for (start_date, end_date), symbols_list in fetches.items():
+        if cancel_event.is_set():
+            break
+        try:
+            fetched = data_fetcher.fetch_daily_prices(start_date, end_date, symbols_list, cancel_event)
+        except ValueError as e:
+            logger.warning(f"Batch fetch of {len(symbols_list)} symbols failed: {str(e)}")
+            continue
+        for symbol, series in fetched.items():
+            prices.setdefault(symbol, []).append((start_date, end_date, series))
+    return prices
+
+def _batch_lines(
+    query_count: int,
+    parsed: Dict[int, Tuple[date, date, List[str]]],
+    errors: Dict[int, str],
+    prices: Dict[str, List[Tuple[date, date, DailySeries]]]
+) -> Iterator[bytes]:
+    """Slice each query from the fetched series and yield one NDJSON line per query, in query order"""
+    for index in range(query_count):
+        if index in errors:
+            yield encode_ndjson_line({"index": index, "error": errors[index]})
+            continue
+        
+        start_date, end_date, symbols_list = parsed[index]
+        sliced = {}
+        for symbol in symbols_list:
+            # Each query lies within exactly one merged range of each of its symbols
+            for fetched_start, fetched_end, series in prices.get(symbol, []):
+                if fetched_start <= start_date and end_date <= fetched_end:
+                    sliced[symbol] = series.slice(start_date, end_date)
+                    break
+        sliced = {symbol: series for symbol, series in sliced.items() if not series.empty}
+        try:
+            data_processor.validate_price_data(sliced)
+            returns = data_processor.calculate_daily_returns(sliced)
+            yield encode_ndjson_line({"index": index, "data": returns})
+        except ValueError as e:
+            yield encode_ndjson_line({"index": index, "error": str(e)})
+
+async def _stream_in_threadpool(lines: Iterator[bytes], cancel_event: threading.Event) -> AsyncIterator[bytes]:
+    """Drive a blocking line generator from the thread pool, stopping it when the client goes away"""
+    try:
+        async for line in iterate_in_threadpool(lines):
+            yield line
+    finally:
+        cancel_event.set()
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """Streaming response holding its admission until it is fully sent or abandoned
+
+    The admission is released around sending the response rather than in the
+    body generator, whose cleanup never runs if the client leaves before the
+    first line.
+    """
+
+    def __init__(self, content: AsyncIterator[bytes], admitted: AsyncExitStack, media_type: str):
+        super().__init__(content, media_type=media_type)
+        self.admitted = admitted
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.admitted.aclose()
+
+def _encode_with_etag(
+    returns_data: Dict[str, Any],
+    response_format: str,
+    encoding: Optional[str] = None
+) -> Tuple[bytes, str, Optional[str]]:
+    """
+    Encode a returns response, derive a strong ETag from it and compress it
+    
+    Args:
+        returns_data: Response data
+        response_format: Negotiated response format
+        encoding: Negotiated content coding, if any
+        
+    Returns:
+        Tuple of the body, the ETag of the unencoded body and the content
+        coding applied to the body (None if it was left unencoded)
+    """
+    body = encode_returns(returns_data, response_format)
+    etag = body_etag(body)
+    compressed = compress(body, encoding)
+    if compressed is None:
+        return body, etag, None
+    return compressed, etag, encoding
+
+def _not_modified(
+    if_none_match: Optional[str],
+    etag: str,
+    encoding: Optional[str],
+    cache_control: str,
+    vary: str = VARY_ENCODING
+) -> Optional[Response]:
+    """304 if the client's copy of the unencoded or the encoded representation is current"""
+    for tag in (etag, representation_etag(etag, encoding)):
+        if etag_matches(if_none_match, tag):
+            return Response(
+                status_code=304,
+                headers={"ETag": tag, "Cache-Control": cache_control, "Vary": vary}
+            )
+    return None
+
+def _body_response(
+    body: bytes,
+    media_type: str,
+    etag: str,
+    cache_control: str,
+    encoding: Optional[str],
+    vary: str = VARY_ENCODING
+) -> Response:
+    """Response for an encoded body, tagged with the ETag of its representation"""
+    headers = {
+        "ETag": representation_etag(etag, encoding),
+        "Cache-Control": cache_control,
+        "Vary": vary
+    }
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
 
 @router.get(
     "/symbols",
@@ -61,100 +505,638 @@ async def get_symbols() -> SymbolsResponse:
         description="MAG7 stocks (Microsoft, Apple, Google, Amazon, NVIDIA, Meta, Tesla)"
     )
 
+@router.get(
+    "/symbols/search",
+    response_model=SymbolSearchResponse,
+    summary="Search known symbols",
+    description="Find symbols whose ticker or name starts with a prefix, from the local symbol universe (SYMBOL_UNIVERSE_PATH). Answered from memory without any upstream call."
+)
+async def search_symbols(
+    q: str = Query(..., min_length=1, max_length=50, description="Ticker or name prefix, case-insensitive"),
+    limit: int = Query(10, ge=1, le=100, description="Maximum number of results")
+) -> SymbolSearchResponse:
+    """Symbol lookup endpoint"""
+    return SymbolSearchResponse(query=q, results=data_fetcher.universe.search(q, limit))
+
 @router.get(
     "/returns",
     response_model=ReturnsResponse,
     responses={
+        200: {
+            "content": {
+                MEDIA_TYPES["columnar"]: {},
+                MEDIA_TYPES["msgpack"]: {},
+                MEDIA_TYPES["ndjson"]: {}
+            },
+            "description": "Daily returns in the negotiated format"
+        },
+        304: {"description": "Not modified - the client's cached copy (If-None-Match) is current"},
         400: {"model": ErrorResponse, "description": "Bad request - invalid parameters"},
-        500: {"model": ErrorResponse, "description": "Internal server error"}
+        500: {"model": ErrorResponse, "description": "Internal server error"},
+        503: {"model": ErrorResponse, "description": "Server overloaded - retry after the Retry-After header's seconds"},
+        504: {"model": ErrorResponse, "description": "A request stage exceeded its timeout"}
     },
     summary="Get daily returns for specified stocks",
-    description="Fetch daily percentage returns for specified stocks within a specified date range. If no symbols are provided, returns data for all MAG7 stocks (MSFT, AAPL, GOOGL, AMZN, NVDA, META, TSLA)."
+    description="Fetch daily percentage returns for specified stocks within a specified date range. If no symbols are provided, returns data for all MAG7 stocks (MSFT, AAPL, GOOGL, AMZN, NVDA, META, TSLA). Compact columnar JSON, MessagePack or streamed NDJSON output can be requested with the format parameter or the Accept header."
 )
 async def get_returns(
+    request: Request,
     start: str = Query(..., description="Start date in YYYY-MM-DD format"),
     end: str = Query(..., description="End date in YYYY-MM-DD format"),
-    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols (e.g., 'AAPL,MSFT,GOOGL'). If not provided, fetches all MAG7 stocks.")
-) -> ReturnsResponse:
+    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols (e.g., 'AAPL,MSFT,GOOGL'). If not provided, fetches all MAG7 stocks."),
+    format: Optional[str] = Query(None, description="Response format: 'json' (default), 'columnar' (shared date axis with per-symbol arrays) 'msgpack' (columnar, binary) or 'ndjson' (streamed, one line per symbol). Overrides the Accept header.")
+) -> Response:
     """
     Get daily returns for specified stocks within a specified date range.
     
+    Fetching, computation and serialization all run in the thread pool, so a
+    slow request never stalls the event loop for other requests.
+    
     Args:
+        request: Incoming request
         start: Start date in YYYY-MM-DD format
         end: End date in YYYY-MM-DD format
         symbols: Optional comma-separated list of stock symbols
+        format: Optional response format, negotiated from the Accept header if omitted
         
     Returns:
-        ReturnsResponse: Daily returns data for each specified stock
+        Response: Daily returns data for each specified stock in the negotiated format
         
     Raises:
         HTTPException: If there's an error with the request or data processing
     """
     try:
-        # Parse and validate dates
+        parse_started = time.perf_counter()
+        start_date, end_date, symbols_list = _parse_query(start, end, symbols)
+        
+        # Pick the response format
         try:
-            start_date = datetime.strptime(start, '%Y-%m-%d').date()
-            end_date = datetime.strptime(end, '%Y-%m-%d').date()
+            response_format = negotiate_format(format, request.headers.get("accept"))
         except ValueError as e:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Invalid date format. Use YYYY-MM-DD format. Error: {str(e)}"
+            raise HTTPException(status_code=400, detail=str(e))
+        columnar = is_columnar(response_format)
+        REQUEST_STAGE_SECONDS.observe(time.perf_counter() - parse_started, stage="parse_validate")
+        
+        cancel_event = threading.Event()
+        
+        # Streamed responses send each symbol as soon as it is ready. Memory stays
+        # small, but the fetches and computation still have to be admitted.
+        if is_streaming(response_format):
+            admitted = AsyncExitStack()
+            await admitted.enter_async_context(
+                _admit(start_date, end_date, symbols_list if symbols_list is not None else data_fetcher.symbols)
+            )
+            lines = _stream_returns_lines(start_date, end_date, symbols_list, cancel_event)
+            return AdmittedStreamingResponse(
+                _stream_in_threadpool(lines, cancel_event), admitted, MEDIA_TYPES[response_format]
             )
         
-        # Parse symbols if provided
-        symbols_list = None
-        if symbols:
-            try:
-                # Split by comma and clean up whitespace
-                symbols_list = [s.strip().upper() for s in symbols.split(',') if s.strip()]
-                
-                # Validate symbols
-                # TODO: Check how is this being done
-                data_fetcher.validate_symbols(symbols_list)
-            except ValueError as e:
-                raise HTTPException(status_code=400, detail=str(e))
+        def compute(price_data: Dict[str, DailySeries]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+            calculate = (
+                data_processor.calculate_columnar_returns if columnar
+                else data_processor.calculate_daily_returns
+            )
+            returns_key = (start_date, end_date, tuple(price_data), columnar)
+            returns_data, _ = returns_flight.do(returns_key, calculate, price_data)
+            returned_symbols = returns_data["data"] if columnar else returns_data
+            logger.info(f"Successfully processed returns for {len(returned_symbols)} symbols")
+            return returns_data, returned_symbols
         
-        # Validate date range
-        try:
-            data_fetcher.validate_date_range(start_date, end_date)
-        except ValueError as e:
-            raise HTTPException(status_code=400, detail=str(e))
+        # Without the format parameter the body depends on the Accept header, which
+        # shared caches must then key on as well
+        vary = VARY_ENCODING if format else VARY_FORMAT_AND_ENCODING
+        return await _cached_response(
+            request, response_format, response_format, start_date, end_date, symbols_list, "returns", compute, vary
+        )
         
-        # Fetch price data
+    except HTTPException:
+        # Re-raise HTTP exceptions
+        raise
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except ClientDisconnected as e:
+        # Nobody is waiting for the answer any more, so stop here
+        logger.info(f"Abandoned returns request: {str(e)}")
+        return Response(status_code=499)
+    except Exception as e:
+        logger.error(f"Unexpected error in get_returns: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Internal server error: {str(e)}"
+        )
+
+@router.post(
+    "/returns/batch",
+    responses={
+        200: {
+            "content": {MEDIA_TYPES["ndjson"]: {}},
+            "description": "One NDJSON line per query, in query order"
+        },
+        422: {"description": "Malformed batch body"}
+    },
+    summary="Get daily returns for many queries at once",
+    description=f"Answer up to {config.BATCH_MAX_QUERIES} returns queries in one request. The data they need is fetched once, merging overlapping ranges, and sliced per query. Results are streamed as NDJSON lines of the form {{\"index\": i, \"data\": {{...}}}} in query order, with {{\"index\": i, \"error\": \"...\"}} for queries that failed."
+)
+async def get_returns_batch(request: Request, batch: BatchRequest) -> Response:
+    """
+    Answer a batch of returns queries
+    
+    Each line carries the same data as the /returns JSON response for that
+    query. Invalid queries are reported inline instead of failing the batch.
+    The batch passes admission control as a whole and holds its share of the
+    capacity until the last line is streamed. The fetch is bounded like that
+    of a single query; its results are then sliced and streamed per query.
+    """
+    cancel_event = threading.Event()
+    admitted = AsyncExitStack()
+    try:
+        parsed, errors = await run_stage(
+            request, "parse_validate", config.COMPUTE_TIMEOUT_SECONDS, _parse_batch, batch.queries
+        )
+        fetches = _plan_batch_fetches(parsed)
+        await admitted.enter_async_context(_admit_batch(parsed, fetches))
+        prices = await run_stage(
+            request, "fetch", config.FETCH_TIMEOUT_SECONDS,
+            _fetch_batch, fetches, cancel_event,
+            cancel_event=cancel_event
+        )
+    except BaseException as e:
+        await admitted.aclose()
+        if isinstance(e, AdmissionRejected):
+            raise _overloaded(e)
+        if isinstance(e, ClientDisconnected):
+            logger.info(f"Abandoned batch request: {str(e)}")
+            return Response(status_code=499)
+        raise
+    
+    lines = _batch_lines(len(batch.queries), parsed, errors, prices)
+    return AdmittedStreamingResponse(_stream_in_threadpool(lines, cancel_event), admitted, MEDIA_TYPES["ndjson"])
+
+async def _cached_response(
+    request: Request,
+    variant: str,
+    response_format: str,
+    start_date: date,
+    end_date: date,
+    symbols_list: Optional[List[str]],
+    label: str,
+    compute: Callable[[Dict[str, DailySeries]], Tuple[Any, Collection[str]]],
+    vary: str = VARY_ENCODING
+) -> Response:
+    """
+    Fetch prices, compute a response from them and serve it with HTTP caching
+    
+    Closes of past sessions never change, so a complete historical response is
+    identified by the query alone: it is revalidated and, once compressed, served
+    again without any work and cached forever by clients. Everything else,
+    including answers built from stale prices, is tagged by content and kept
+    short-lived.
+    
+    Args:
+        request: Incoming request
+        variant: Response format or aggregate with its parameters, part of the query ETag
+        response_format: Format the body is encoded in
+        start_date: Start date of the query
+        end_date: End date of the query
+        symbols_list: Requested symbols, None for all MAG7 symbols
+        label: What is computed, for error messages
+        compute: Blocking callable turning the price data into the response data
+            and the symbols that data covers
+        vary: Request headers the response varies with
+        
+    Returns:
+        Response in the negotiated format and content coding
+    """
+    requested_symbols = symbols_list if symbols_list is not None else data_fetcher.symbols
+    historical = market_calendar.is_final(end_date - timedelta(days=1))
+    if_none_match = request.headers.get("if-none-match")
+    media_type = MEDIA_TYPES[response_format]
+    etag = query_etag(start_date, end_date, requested_symbols, variant) if historical else None
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"))
+    if etag is not None:
+        not_modified = _not_modified(if_none_match, etag, encoding, IMMUTABLE_CACHE_CONTROL, vary)
+        if not_modified is not None:
+            return not_modified
+        # Repeat hits are sent as the bytes compressed the first time
+        compressed = compressed_responses.get((etag, encoding)) if encoding is not None else None
+        if compressed is not None:
+            return _body_response(compressed, media_type, etag, IMMUTABLE_CACHE_CONTROL, encoding, vary)
+    
+    cancel_event = threading.Event()
+    # Uncached work waits for capacity; cached queries go straight through
+    async with _admit(start_date, end_date, requested_symbols):
         try:
-            price_data = data_fetcher.fetch_daily_prices(start_date, end_date, symbols_list)
+            price_data = await run_stage(
+                request, "fetch", config.FETCH_TIMEOUT_SECONDS,
+                data_fetcher.fetch_daily_prices, start_date, end_date, symbols_list, cancel_event,
+                cancel_event=cancel_event
+            )
         except ValueError as e:
             raise HTTPException(status_code=500, detail=f"Failed to fetch stock data: {str(e)}")
         
-        # Validate price data
         try:
-            data_processor.validate_price_data(price_data)
+            await run_stage(
+                request, "validation", config.COMPUTE_TIMEOUT_SECONDS,
+                data_processor.validate_price_data, price_data
+            )
         except ValueError as e:
             raise HTTPException(status_code=500, detail=f"Invalid price data: {str(e)}")
         
-        # Calculate returns
+        # Stale prices stand in for an unavailable upstream and must not be cached as final
+        degraded = any(series.stale for series in price_data.values())
+        
         try:
-            returns_data = data_processor.calculate_daily_returns(price_data)
+            data, served_symbols = await run_stage(
+                request, "computation", config.COMPUTE_TIMEOUT_SECONDS, compute, price_data
+            )
         except ValueError as e:
-            raise HTTPException(status_code=500, detail=f"Failed to calculate returns: {str(e)}")
-        
-        # Convert to response format - use the raw dictionary format
-        response_data = {}
-        for symbol, returns in returns_data.items():
-            response_data[symbol] = returns
-        
-        logger.info(f"Successfully processed returns for {len(response_data)} symbols")
-        return ReturnsResponse(data=response_data)
+            raise HTTPException(status_code=500, detail=f"Failed to calculate {label}: {str(e)}")
         
+        # Encode in the thread pool. The data is built by our own processor, so it is
+        # written straight out instead of being re-validated item by item by Pydantic.
+        body, content_etag, body_encoding = await run_stage(
+            request, "serialization", config.COMPUTE_TIMEOUT_SECONDS,
+            _encode_with_etag, data, response_format, encoding
+        )
+    
+    # Only a complete, fresh historical answer may be cached forever. A response
+    # missing a symbol or built from stale prices (e.g. after an upstream error)
+    # is tagged by content and kept short-lived.
+    if etag is not None and not degraded and set(served_symbols) == set(requested_symbols):
+        cache_control = IMMUTABLE_CACHE_CONTROL
+        if body_encoding is not None:
+            compressed_responses.set((etag, body_encoding), body)
+    else:
+        etag = content_etag
+        cache_control = live_cache_control(market_calendar.next_session_close().timestamp() - time.time())
+        not_modified = _not_modified(if_none_match, etag, body_encoding, cache_control, vary)
+        if not_modified is not None:
+            return not_modified
+    
+    return _body_response(body, media_type, etag, cache_control, body_encoding, vary)
+
+async def _serve_aggregate(
+    request: Request,
+    variant: str,
+    start: str,
+    end: str,
+    symbols: Optional[str],
+    downsample: str,
+    compute: Callable[[Dict[str, Any], str], Dict[str, Any]]
+) -> Response:
+    """Validate the common aggregate parameters and serve the aggregate, mapping errors like /returns"""
+    try:
+        start_date, end_date, symbols_list = _parse_query(start, end, symbols)
+        downsample = downsample.strip().lower()
+        if downsample not in DOWNSAMPLE_METHODS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Invalid downsample method: {downsample}. Use one of: {', '.join(DOWNSAMPLE_METHODS)}"
+            )
+        return await _cached_response(
+            request, f"{variant}:{downsample}", JSON_FORMAT, start_date, end_date, symbols_list, "aggregate",
+            lambda price_data: (compute(price_data, downsample), price_data)
+        )
     except HTTPException:
-        # Re-raise HTTP exceptions
         raise
+    except AdmissionRejected as e:
+        raise _overloaded(e)
+    except ClientDisconnected as e:
+        logger.info(f"Abandoned {variant} request: {str(e)}")
+        return Response(status_code=499)
     except Exception as e:
-        logger.error(f"Unexpected error in get_returns: {str(e)}")
+        logger.error(f"Unexpected error in {variant} aggregate: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+def _target_points(downsample: str, points: Optional[int]) -> Optional[int]:
+    if downsample == NO_DOWNSAMPLING:
+        return None
+    return points if points is not None else DEFAULT_DOWNSAMPLE_POINTS
+
+AGGREGATE_RESPONSES = {
+    304: {"description": "Not modified - the client's cached copy (If-None-Match) is current"},
+    400: {"model": ErrorResponse, "description": "Bad request - invalid parameters"},
+    500: {"model": ErrorResponse, "description": "Internal server error"},
+    503: {"model": ErrorResponse, "description": "Server overloaded - retry after the Retry-After header's seconds"},
+    504: {"model": ErrorResponse, "description": "A request stage exceeded its timeout"}
+}
+
+DOWNSAMPLE_DESCRIPTION = (
+    "Downsampling per symbol: 'none' (default), 'lttb' (Largest-Triangle-Three-Buckets, "
+    "keeps the line shape) or 'minmax' (keeps the extremes of each bucket)"
+)
+POINTS_DESCRIPTION = f"Target number of points per symbol when downsampling (default {DEFAULT_DOWNSAMPLE_POINTS})"
+
+@router.get(
+    "/returns/cumulative",
+    response_model=ReturnsResponse,
+    responses=AGGREGATE_RESPONSES,
+    summary="Get cumulative returns for specified stocks",
+    description="Compounded returns since the first trading date of each symbol in the range, optionally downsampled for charting."
+)
+async def get_cumulative_returns(
+    request: Request,
+    start: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end: str = Query(..., description="End date in YYYY-MM-DD format"),
+    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols. If not provided, uses all MAG7 stocks."),
+    downsample: str = Query(NO_DOWNSAMPLING, description=DOWNSAMPLE_DESCRIPTION),
+    points: Optional[int] = Query(None, ge=3, le=100_000, description=POINTS_DESCRIPTION)
+) -> Response:
+    """Cumulative returns as {"data": {symbol: [{"date", "return"}]}}"""
+    def compute(price_data: Dict[str, Any], method: str) -> Dict[str, List[Dict[str, Any]]]:
+        cumulative = data_processor.cumulative_returns(price_data)
+        frames = {symbol: cumulative[[symbol]].rename(columns={symbol: "return"}) for symbol in cumulative.columns}
+        return data_processor.to_points(frames, ["return"], method, _target_points(method, points))
+    
+    return await _serve_aggregate(request, f"cumulative:{points}", start, end, symbols, downsample, compute)
+
+@router.get(
+    "/returns/rolling",
+    response_model=ReturnsResponse,
+    responses=AGGREGATE_RESPONSES,
+    summary="Get rolling mean and volatility of daily returns",
+    description="Mean daily return and annualized volatility over a rolling window of trading days, optionally downsampled for charting."
+)
+async def get_rolling_returns(
+    request: Request,
+    start: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end: str = Query(..., description="End date in YYYY-MM-DD format"),
+    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols. If not provided, uses all MAG7 stocks."),
+    window: int = Query(20, ge=2, le=1000, description="Rolling window length in trading days"),
+    downsample: str = Query(NO_DOWNSAMPLING, description=DOWNSAMPLE_DESCRIPTION + "; selection follows the volatility series"),
+    points: Optional[int] = Query(None, ge=3, le=100_000, description=POINTS_DESCRIPTION)
+) -> Response:
+    """Rolling statistics as {"data": {symbol: [{"date", "volatility", "mean"}]}}"""
+    def compute(price_data: Dict[str, Any], method: str) -> Dict[str, List[Dict[str, Any]]]:
+        frames = data_processor.rolling_statistics(price_data, window)
+        return data_processor.to_points(frames, ["volatility", "mean"], method, _target_points(method, points))
+    
+    return await _serve_aggregate(request, f"rolling:{window}:{points}", start, end, symbols, downsample, compute)
+
+@router.get(
+    "/returns/periods",
+    response_model=ReturnsResponse,
+    responses=AGGREGATE_RESPONSES,
+    summary="Get weekly, monthly or yearly returns",
+    description="Compounded returns per calendar period, each labelled with the last trading date in the period."
+)
+async def get_period_returns(
+    request: Request,
+    start: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end: str = Query(..., description="End date in YYYY-MM-DD format"),
+    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols. If not provided, uses all MAG7 stocks."),
+    period: str = Query("monthly", description=f"Resampling period: {', '.join(RESAMPLE_PERIODS)}"),
+    downsample: str = Query(NO_DOWNSAMPLING, description=DOWNSAMPLE_DESCRIPTION),
+    points: Optional[int] = Query(None, ge=3, le=100_000, description=POINTS_DESCRIPTION)
+) -> Response:
+    """Period returns as {"data": {symbol: [{"date", "return"}]}}"""
+    period = period.strip().lower()
+    if period not in RESAMPLE_PERIODS:
         raise HTTPException(
-            status_code=500,
-            detail=f"Internal server error: {str(e)}"
+            status_code=400,
+            detail=f"Invalid period: {period}. Use one of: {', '.join(RESAMPLE_PERIODS)}"
+        )
+    
+    def compute(price_data: Dict[str, Any], method: str) -> Dict[str, List[Dict[str, Any]]]:
+        returns = data_processor.period_returns(price_data, period)
+        frames = {symbol: returns[[symbol]].rename(columns={symbol: "return"}) for symbol in returns.columns}
+        return data_processor.to_points(frames, ["return"], method, _target_points(method, points))
+    
+    return await _serve_aggregate(request, f"periods:{period}:{points}", start, end, symbols, downsample, compute)
+
+def _with_benchmark(symbols: Optional[str], benchmark: str) -> str:
+    """Symbol list of a portfolio query with the benchmark added if it is not already in it"""
+    requested = symbols.split(",") if symbols else list(config.MAG7_SYMBOLS)
+    if benchmark not in (s.strip().upper() for s in requested):
+        requested.append(benchmark)
+    return ",".join(requested)
+
+def _benchmark_column(symbols: List[str], benchmark: str) -> int:
+    if benchmark not in symbols:
+        raise ValueError(f"No price data available for benchmark {benchmark}")
+    return symbols.index(benchmark)
+
+@router.get(
+    "/portfolio/matrix",
+    responses=AGGREGATE_RESPONSES,
+    summary="Get the correlation or covariance matrix of daily returns",
+    description="Pairwise correlation or covariance of daily returns across the requested symbols, using the dates each pair traded on together."
+)
+async def get_portfolio_matrix(
+    request: Request,
+    start: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end: str = Query(..., description="End date in YYYY-MM-DD format"),
+    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols. If not provided, uses all MAG7 stocks."),
+    statistic: str = Query(CORRELATION, description=f"Statistic to compute: {', '.join(MATRIX_STATISTICS)}")
+) -> Response:
+    """Matrix as {"data": {"statistic", "symbols", "matrix"}}, null for pairs without shared dates"""
+    statistic = statistic.strip().lower()
+    if statistic not in MATRIX_STATISTICS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Invalid statistic: {statistic}. Use one of: {', '.join(MATRIX_STATISTICS)}"
         )
+    
+    def compute(price_data: Dict[str, Any], _: str) -> Dict[str, Any]:
+        _, columns, matrix = portfolio_analyzer.return_matrix(price_data)
+        values = (
+            portfolio_analyzer.correlation_matrix(matrix) if statistic == CORRELATION
+            else portfolio_analyzer.covariance_matrix(matrix)
+        )
+        return {"statistic": statistic, "symbols": columns, "matrix": np.round(values, 8).tolist()}
+    
+    return await _serve_aggregate(request, f"matrix:{statistic}", start, end, symbols, NO_DOWNSAMPLING, compute)
+
+@router.get(
+    "/portfolio/beta",
+    responses=AGGREGATE_RESPONSES,
+    summary="Get beta and correlation against a benchmark",
+    description="Beta, correlation and the number of shared observations of each symbol's daily returns against a benchmark symbol."
+)
+async def get_portfolio_beta(
+    request: Request,
+    start: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end: str = Query(..., description="End date in YYYY-MM-DD format"),
+    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols. If not provided, uses all MAG7 stocks."),
+    benchmark: str = Query(config.BENCHMARK_SYMBOL, description="Benchmark symbol")
+) -> Response:
+    """Betas as {"data": {symbol: {"beta", "correlation", "observations"}}}"""
+    benchmark = benchmark.strip().upper()
+    
+    def compute(price_data: Dict[str, Any], _: str) -> Dict[str, Any]:
+        _, columns, matrix = portfolio_analyzer.return_matrix(price_data)
+        stats = portfolio_analyzer.beta(matrix, _benchmark_column(columns, benchmark))
+        beta = np.round(stats["beta"], 6).tolist()
+        correlation = np.round(stats["correlation"], 6).tolist()
+        observations = stats["observations"].astype(int).tolist()
+        return {
+            symbol: {"beta": beta[i], "correlation": correlation[i], "observations": observations[i]}
+            for i, symbol in enumerate(columns) if symbol != benchmark
+        }
+    
+    return await _serve_aggregate(
+        request, f"beta:{benchmark}", start, end, _with_benchmark(symbols, benchmark), NO_DOWNSAMPLING, compute
+    )
+
+@router.get(
+    "/portfolio/rolling-correlation",
+    response_model=ReturnsResponse,
+    responses=AGGREGATE_RESPONSES,
+    summary="Get rolling correlation against a benchmark",
+    description="Correlation of each symbol's daily returns with a benchmark over a rolling window of trading days, optionally downsampled for charting."
+)
+async def get_rolling_correlation(
+    request: Request,
+    start: str = Query(..., description="Start date in YYYY-MM-DD format"),
+    end: str = Query(..., description="End date in YYYY-MM-DD format"),
+    symbols: Optional[str] = Query(None, description="Comma-separated list of stock symbols. If not provided, uses all MAG7 stocks."),
+    benchmark: str = Query(config.BENCHMARK_SYMBOL, description="Benchmark symbol"),
+    window: int = Query(60, ge=2, le=1000, description="Rolling window length in trading days"),
+    downsample: str = Query(NO_DOWNSAMPLING, description=DOWNSAMPLE_DESCRIPTION),
+    points: Optional[int] = Query(None, ge=3, le=100_000, description=POINTS_DESCRIPTION)
+) -> Response:
+    """Rolling correlations as {"data": {symbol: [{"date", "correlation"}]}}"""
+    benchmark = benchmark.strip().upper()
+    
+    def compute(price_data: Dict[str, Any], method: str) -> Dict[str, Any]:
+        import pandas as pd
+        
+        dates, columns, matrix = portfolio_analyzer.return_matrix(price_data)
+        correlation = portfolio_analyzer.rolling_correlation(matrix, _benchmark_column(columns, benchmark), window)
+        frames = {
+            symbol: pd.DataFrame({"correlation": correlation[:, i]}, index=dates)
+            for i, symbol in enumerate(columns) if symbol != benchmark
+        }
+        return data_processor.to_points(frames, ["correlation"], method, _target_points(method, points))
+    
+    return await _serve_aggregate(
+        request, f"rolling-correlation:{benchmark}:{window}:{points}", start, end,
+        _with_benchmark(symbols, benchmark), downsample, compute
+    )
+
+# Close code sent to clients dropped for falling behind ("try again later")
+LIVE_OVERFLOW_CLOSE_CODE = 1013
+
+def _parse_live_symbols(symbols: Any, current: Optional[set] = None) -> List[str]:
+    """
+    Validate a list of symbols to follow, keeping the total per connection within the usual limit
+    
+    Raises:
+        ValueError: If a symbol is invalid or there are too many
+    """
+    if not isinstance(symbols, list) or not all(isinstance(symbol, str) for symbol in symbols):
+        raise ValueError("symbols must be a list of strings")
+    symbols_list = list(dict.fromkeys(symbol.strip().upper() for symbol in symbols))
+    data_fetcher.validate_symbols(symbols_list)
+    data_fetcher.validate_symbols(list((current or set()) | set(symbols_list)))
+    return symbols_list
+
+async def _send_live_messages(websocket: WebSocket, subscriber: LiveSubscriber) -> None:
+    """Forward a subscriber's queued messages until the hub asks to close the connection"""
+    while True:
+        message = await subscriber.queue.get()
+        if message is None:
+            await websocket.close(code=LIVE_OVERFLOW_CLOSE_CODE, reason="Client fell behind, reconnect")
+            return
+        await websocket.send_text(message)
+
+async def _receive_live_commands(websocket: WebSocket, subscriber: LiveSubscriber) -> None:
+    """Apply subscribe/unsubscribe messages from the client until it disconnects"""
+    while True:
+        try:
+            command = await websocket.receive_json()
+        except ValueError:
+            subscriber.send(encode_message({"type": "error", "error": "Messages must be JSON"}))
+            continue
+        
+        action = command.get("action") if isinstance(command, dict) else None
+        try:
+            if action == "subscribe":
+                live_hub.subscribe(subscriber, _parse_live_symbols(command.get("symbols"), subscriber.symbols))
+            elif action == "unsubscribe":
+                live_hub.unsubscribe(subscriber, _parse_live_symbols(command.get("symbols")))
+            else:
+                raise ValueError('action must be "subscribe" or "unsubscribe"')
+        except ValueError as e:
+            subscriber.send(encode_message({"type": "error", "error": str(e)}))
+
+@router.websocket("/live")
+async def live_updates(
+    websocket: WebSocket,
+    symbols: Optional[str] = Query(None, description="Comma-separated symbols to follow. If not provided, follows all MAG7 stocks.")
+) -> None:
+    """
+    Push new and updated daily returns as they change
+    
+    Every followed symbol first gets a {"type": "snapshot"} message with the
+    returns of the last LIVE_WINDOW_DAYS, then {"type": "update"} messages with
+    only the points that are new or changed. Clients can change what they
+    follow by sending {"action": "subscribe" | "unsubscribe", "symbols": [...]}.
+    """
+    await websocket.accept()
+    subscriber = live_hub.connect()
+    try:
+        try:
+            initial = symbols.split(",") if symbols else list(data_fetcher.symbols)
+            live_hub.subscribe(subscriber, _parse_live_symbols(initial))
+        except ValueError as e:
+            await websocket.send_text(encode_message({"type": "error", "error": str(e)}))
+            await websocket.close(code=1008)
+            return
+        
+        tasks = [
+            asyncio.create_task(_send_live_messages(websocket, subscriber)),
+            asyncio.create_task(_receive_live_commands(websocket, subscriber))
+        ]
+        done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in pending:
+            task.cancel()
+        for task in done:
+            if not isinstance(task.exception(), (WebSocketDisconnect, type(None))):
+                logger.warning(f"Live connection ended with an error: {str(task.exception())}")
+    finally:
+        live_hub.disconnect(subscriber)
+
+@router.get(
+    "/stats",
+    summary="Runtime statistics",
+    description="Counters for request coalescing, the in-memory price and returns caches and the upstream circuit breaker and rate limiter"
+)
+async def get_stats() -> Dict[str, Any]:
+    """Runtime statistics endpoint"""
+    return collect_stats()
+
+def collect_stats() -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    Gather runtime counters from all components
+    
+    Returns:
+        Nested dictionary of {component: {name: {counter: value}}}
+    """
+    return {
+        "singleflight": {
+            "fetch": data_fetcher.fetch_flight.stats(),
+            "returns": returns_flight.stats()
+        },
+        "cache": {
+            "prices": data_fetcher.price_cache.stats(),
+            "returns": data_processor.returns_cache.stats(),
+            "compressed": compressed_responses.stats()
+        },
+        "upstream": {
+            "provider": data_fetcher.upstream.stats()
+        },
+        "live": {
+            "updates": live_hub.stats()
+        },
+        "admission": {
+            "returns": admission.stats()
+        },
+        "symbols": {
+            "universe": data_fetcher.universe.stats(),
+            "unknown": data_fetcher.unknown_symbols.stats()
+        }
+    }
 
 @router.get(
     "/health",
@@ -163,4 +1145,17 @@ async def get_returns(
 )
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "message": "Stock returns API is running"} 
\ No newline at end of file
+    return {"status": "healthy", "message": "Stock returns API is running"}
+
+@router.get(
+    "/ready",
+    summary="Readiness check endpoint",
+    description="Reports ready (200) once the price cache has been warmed for the configured symbols, 503 until then",
+    responses={503: {"description": "Price cache is still warming up"}}
+)
+async def readiness_check():
+    """Readiness check endpoint"""
+    status = warmup_scheduler.status()
+    if not status["ready"]:
+        return JSONResponse(status_code=503, content={"status": "warming", **status})
+    return {"status": "ready", **status} 
\ No newline at end of file
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for /api/returns
+
+Drives the FastAPI app in-process against the deterministic synthetic price
+provider, so results are reproducible and need no network access. Reports
+throughput and p50/p95/p99 latency across symbol counts, range lengths and
+concurrency levels, and compares them against a stored baseline:
+
+    python benchmarks/bench_api.py                  # run and compare with baseline.json
+    python benchmarks/bench_api.py --save-baseline  # run and store a new baseline
+    python benchmarks/bench_api.py --quick          # smaller matrix for a fast check
+
+Every request of the run uses a different window, so each one goes through
+the fetch and compute path instead of being answered from the in-memory
+caches filled by earlier scenarios, and --quick results compare with a
+baseline saved from a full run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from datetime import date, timedelta
+from typing import Dict, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, ".."))
+
+# Configure the app for offline runs before it is imported
+os.environ["PRICE_PROVIDER"] = "synthetic"
+os.environ.setdefault("SYNTHETIC_LATENCY_MS", "0")
+os.environ["PRICE_STORE_ENABLED"] = "false"
+# The synthetic provider has no rate limit to protect, so the token bucket must not shape the results
+os.environ.setdefault("UPSTREAM_RATE_PER_SECOND", "1000000")
+os.environ.setdefault("UPSTREAM_BURST", "1000000")
+# Measure raw throughput rather than how much of the load admission control sheds
+os.environ.setdefault("ADMISSION_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+import httpx
+
+from main import app
+
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+SYMBOL_COUNTS = [1, 7, 50]
+RANGE_DAYS = [30, 365, 3650]
+CONCURRENCY_LEVELS = [1, 8, 32]
+REQUESTS_PER_SCENARIO = 40
+
+QUICK_SYMBOL_COUNTS = [7, 50]
+QUICK_RANGE_DAYS = [365, 3650]
+QUICK_CONCURRENCY_LEVELS = [8]
+QUICK_REQUESTS_PER_SCENARIO = 16
+
+# A scenario regresses when its p95 latency grows by more than this fraction
+REGRESSION_TOLERANCE = 0.25
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    symbol_count: int,
+    range_days: int,
+    concurrency: int,
+    request_count: int,
+    first_offset: int = 0
+) -> Dict[str, float]:
+    """Issue request_count returns queries with the given shape and concurrency, windows shifted from first_offset days"""
+    symbols = ",".join(f"SYM{i:03d}" for i in range(symbol_count))
+    end_date = date.today() - timedelta(days=7)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    failures = 0
+
+    async def one_request(offset: int) -> None:
+        nonlocal failures
+        params = {
+            "start": (end_date - timedelta(days=range_days + offset)).isoformat(),
+            "end": (end_date - timedelta(days=offset)).isoformat(),
+            "symbols": symbols
+        }
+        async with semaphore:
+            started = time.perf_counter()
+            response = await client.get("/api/returns", params=params)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code != 200:
+                failures += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request(first_offset + offset) for offset in range(request_count)))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "throughput_rps": request_count / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "failures": failures
+    }
+
+async def run_suite(quick: bool) -> Dict[str, Dict[str, float]]:
+    """Run every scenario of the benchmark matrix"""
+    symbol_counts = QUICK_SYMBOL_COUNTS if quick else SYMBOL_COUNTS
+    range_days = QUICK_RANGE_DAYS if quick else RANGE_DAYS
+    concurrency_levels = QUICK_CONCURRENCY_LEVELS if quick else CONCURRENCY_LEVELS
+    request_count = QUICK_REQUESTS_PER_SCENARIO if quick else REQUESTS_PER_SCENARIO
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=120) as client:
+        # Warm up imports, thread pools and the synthetic price paths
+        await run_scenario(client, max(symbol_counts), max(range_days), 1, 2)
+
+        # Windows never repeat across scenarios, so no scenario runs on another's cached results
+        first_offset = 2
+        for symbol_count in symbol_counts:
+            for days in range_days:
+                for concurrency in concurrency_levels:
+                    name = f"symbols={symbol_count} days={days} concurrency={concurrency}"
+                    results[name] = await run_scenario(
+                        client, symbol_count, days, concurrency, request_count, first_offset
+                    )
+                    first_offset += request_count
+                    result = results[name]
+                    print(
+                        f"{name:<42} {result['throughput_rps']:>8.1f} req/s "
+                        f"p50 {result['p50_ms']:>7.1f}ms p95 {result['p95_ms']:>7.1f}ms "
+                        f"p99 {result['p99_ms']:>7.1f}ms"
+                        + (f"  ({result['failures']} failed)" if result['failures'] else "")
+                    )
+    return results
+
+def compare_with_baseline(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]]) -> bool:
+    """Print p95 changes against the baseline and report whether any scenario regressed"""
+    print(f"\n{'=' * 20} Baseline Comparison {'=' * 20}")
+    regressed = False
+    for name, result in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            print(f"{name:<42} no baseline")
+            continue
+        change = result["p95_ms"] / reference["p95_ms"] - 1
+        status = "REGRESSION" if change > REGRESSION_TOLERANCE else "ok"
+        regressed = regressed or status == "REGRESSION"
+        print(f"{name:<42} p95 {reference['p95_ms']:>7.1f}ms -> {result['p95_ms']:>7.1f}ms ({change:+.0%}) {status}")
+    return not regressed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="run a smaller scenario matrix")
+    parser.add_argument("--save-baseline", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline file to compare against")
+    args = parser.parse_args()
+
+    print("Returns API Benchmark Suite (synthetic provider, in-process)")
+    print("=" * 60)
+    results = asyncio.run(run_suite(args.quick))
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nBaseline saved to {args.baseline}")
+        sys.exit(0)
+
+    if not os.path.exists(args.baseline):
+        print(f"\nNo baseline at {args.baseline}; run with --save-baseline to create one")
+        sys.exit(0)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    passed = compare_with_baseline(results, baseline)
+    if passed:
+        print("\nNo regressions against the baseline")
+    else:
+        print(f"\nRegressions found (p95 worse by more than {REGRESSION_TOLERANCE:.0%})")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Fan-out benchmark for the live update hub
+
+Connects a growing number of in-process subscribers to the same symbols and
+measures how many upstream calls the hub makes and how long publishing one
+poll's update takes. Upstream calls should not grow with the subscriber count
+and the publish cost should stay at one queue insertion per subscriber:
+
+    python benchmarks/bench_live.py
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCHMARK_DIR, ".."))
+
+os.environ["PRICE_PROVIDER"] = "synthetic"
+os.environ["PRICE_STORE_ENABLED"] = "false"
+os.environ.setdefault("SYNTHETIC_LATENCY_MS", "0")
+os.environ.setdefault("UPSTREAM_RATE_PER_SECOND", "1000000")
+os.environ.setdefault("UPSTREAM_BURST", "1000000")
+os.environ.setdefault("LIVE_POLL_SECONDS", "0.02")
+os.environ.setdefault("LIVE_IDLE_POLL_SECONDS", "0.02")
+os.environ.setdefault("LIVE_QUEUE_SIZE", "100000")
+
+from data_fetcher import StockDataFetcher
+from data_processor import StockDataProcessor
+from live_updates import LiveUpdateHub
+from price_providers import SyntheticPriceProvider
+
+SUBSCRIBER_COUNTS = [1, 10, 100, 1000, 10000]
+SYMBOLS = ["MSFT", "AAPL", "GOOGL", "AMZN", "NVDA", "META", "TSLA"]
+POLLS = 20
+
+class MovingPriceProvider(SyntheticPriceProvider):
+    """Synthetic prices whose latest close moves on every call, so every poll publishes an update"""
+
+    def __init__(self):
+        super().__init__()
+        self.calls = 0
+
+    def fetch_close_prices(self, symbol, start_date, end_date):
+        self.calls += 1
+        prices = super().fetch_close_prices(symbol, start_date, end_date).copy()
+        prices.iloc[-1] *= 1 + 0.0001 * self.calls
+        return prices
+
+async def run(subscriber_count: int) -> None:
+    provider = MovingPriceProvider()
+    hub = LiveUpdateHub(StockDataFetcher(provider=provider), StockDataProcessor())
+    subscribers = [hub.connect() for _ in range(subscriber_count)]
+    for subscriber in subscribers:
+        hub.subscribe(subscriber, SYMBOLS)
+
+    # Time every publish while the pollers run
+    publish_seconds = []
+    publish = hub._publish
+
+    def timed_publish(poller, message):
+        started = time.perf_counter()
+        publish(poller, message)
+        publish_seconds.append(time.perf_counter() - started)
+
+    hub._publish = timed_publish
+    while hub.stats()["published"] < POLLS * len(SYMBOLS):
+        await asyncio.sleep(0.01)
+    await hub.stop()
+
+    stats = hub.stats()
+    per_publish_us = sum(publish_seconds) / len(publish_seconds) * 1e6
+    print(
+        f"{subscriber_count:>11} {provider.calls:>14} {provider.calls / stats['polls']:>15.2f} "
+        f"{per_publish_us:>14.1f} {per_publish_us / subscriber_count * 1000:>17.1f}"
+    )
+
+def main() -> None:
+    print(f"{'=' * 20} Live Fan-out Benchmark {'=' * 20}")
+    print(f"{len(SYMBOLS)} symbols, at least {POLLS} polls each\n")
+    print(f"{'subscribers':>11} {'upstream calls':>14} {'calls per poll':>15} {'publish (us)':>14} {'per subscriber (ns)':>17}")
+    for subscriber_count in SUBSCRIBER_COUNTS:
+        asyncio.run(run(subscriber_count))
+
+if __name__ == "__main__":
+    main()
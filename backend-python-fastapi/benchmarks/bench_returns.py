@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark of StockDataProcessor.calculate_daily_returns
+
+Compares the vectorized returns engine against the previous per-row loop on
+synthetic 10-year price histories for 7, 50 and 500 symbols:
+
+    python benchmarks/bench_returns.py
+"""
+
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from data_processor import StockDataProcessor
+from price_series import DailySeries
+
+SYMBOL_COUNTS = [7, 50, 500]
+TRADING_DAYS = 2520  # Roughly 10 years
+REPEATS = 3
+
+def make_price_data(symbol_count: int, seed: int = 42) -> Dict[str, pd.Series]:
+    """Generate random-walk close prices, with a few missing days per symbol"""
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2015-01-02", periods=TRADING_DAYS, tz="America/New_York")
+
+    price_data = {}
+    for i in range(symbol_count):
+        returns = rng.normal(0.0005, 0.02, TRADING_DAYS)
+        prices = pd.Series(100 * np.exp(np.cumsum(returns)), index=dates, name="Close")
+        missing = rng.choice(TRADING_DAYS, size=TRADING_DAYS // 100, replace=False)
+        price_data[f"SYM{i:03d}"] = prices.drop(dates[missing])
+    return price_data
+
+def legacy_calculate_daily_returns(price_data: Dict[str, pd.Series]) -> Dict[str, List[Dict[str, Any]]]:
+    """The original per-row implementation, kept here as the comparison baseline"""
+    result = {}
+    for symbol, prices in price_data.items():
+        if len(prices) < 2:
+            continue
+        returns = prices.pct_change().dropna()
+        return_data = []
+        for date_idx, return_val in returns.items():
+            return_data.append({
+                "date": date_idx.strftime('%Y-%m-%d'),
+                "return": round(float(return_val), 6)
+            })
+        result[symbol] = return_data
+    return result
+
+def best_time(func, *args, reset: Optional[Callable[[], None]] = None) -> float:
+    """Best wall-clock time over REPEATS runs, in seconds, calling reset (untimed) before each run"""
+    timings = []
+    for _ in range(REPEATS):
+        if reset is not None:
+            reset()
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def count_mismatches(expected: Dict[str, List[Dict[str, Any]]], actual: Dict[str, List[Dict[str, Any]]]) -> int:
+    """Number of return points that differ between two results"""
+    mismatches = 0
+    for symbol, points in expected.items():
+        other = actual.get(symbol, [])
+        if len(other) != len(points):
+            return -1
+        for a, b in zip(points, other):
+            if a["date"] != b["date"] or abs(a["return"] - b["return"]) > 1e-6:
+                mismatches += 1
+    return mismatches
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+
+    processor = StockDataProcessor()
+
+    print("Returns Engine Benchmark")
+    print("=" * 60)
+    print(f"{'symbols':>8} {'legacy (s)':>12} {'vectorized (s)':>16} {'speedup':>9} {'mismatches':>11}")
+
+    for symbol_count in SYMBOL_COUNTS:
+        price_data = make_price_data(symbol_count)
+        compact_data = {symbol: DailySeries.from_pandas(prices) for symbol, prices in price_data.items()}
+
+        legacy_time = best_time(legacy_calculate_daily_returns, price_data)
+        # Cleared before every run, so repeats compute the returns instead of hitting the cache
+        vectorized_time = best_time(
+            processor.calculate_daily_returns, compact_data, reset=processor.returns_cache.clear
+        )
+        mismatches = count_mismatches(
+            legacy_calculate_daily_returns(price_data),
+            processor.calculate_daily_returns(compact_data)
+        )
+
+        print(
+            f"{symbol_count:>8} {legacy_time:>12.3f} {vectorized_time:>16.3f} "
+            f"{legacy_time / vectorized_time:>8.1f}x {mismatches:>11}"
+        )
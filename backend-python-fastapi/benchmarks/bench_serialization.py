@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Benchmark of /api/returns response encoding
+
+Compares payload size and encoding time of the Pydantic-validated JSON
+response against the json, columnar and msgpack formats:
+
+    python benchmarks/bench_serialization.py
+"""
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from api_endpoints import ReturnsResponse
+from bench_returns import make_price_data
+from data_processor import StockDataProcessor
+from price_series import DailySeries
+from response_formats import MEDIA_TYPES, encode_returns, is_columnar
+
+SYMBOL_COUNTS = [7, 50]
+REPEATS = 3
+
+def best_time(func, *args) -> float:
+    """Best wall-clock time over REPEATS runs, in seconds"""
+    timings = []
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+if __name__ == "__main__":
+    import logging
+    logging.disable(logging.INFO)
+
+    processor = StockDataProcessor()
+
+    print("Response Encoding Benchmark")
+    print("=" * 60)
+    print(f"{'symbols':>8} {'format':>10} {'size (KB)':>10} {'ratio':>7} {'encode (ms)':>12}")
+
+    for symbol_count in SYMBOL_COUNTS:
+        price_data = {
+            symbol: DailySeries.from_pandas(prices)
+            for symbol, prices in make_price_data(symbol_count).items()
+        }
+        rows = processor.calculate_daily_returns(price_data)
+        columns = processor.calculate_columnar_returns(price_data)
+
+        pydantic_body = ReturnsResponse(data=rows).model_dump_json().encode()
+        pydantic_time = best_time(lambda: ReturnsResponse(data=rows).model_dump_json())
+        print(f"{symbol_count:>8} {'pydantic':>10} {len(pydantic_body) / 1024:>10.0f} {1.0:>6.1f}x {pydantic_time * 1000:>12.1f}")
+
+        for response_format in MEDIA_TYPES:
+            data = columns if is_columnar(response_format) else rows
+            body = encode_returns(data, response_format)
+            encode_time = best_time(encode_returns, data, response_format)
+            print(
+                f"{symbol_count:>8} {response_format:>10} {len(body) / 1024:>10.0f} "
+                f"{len(pydantic_body) / len(body):>6.1f}x {encode_time * 1000:>12.1f}"
+            )
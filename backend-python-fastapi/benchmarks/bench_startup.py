@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the API process
+
+Starts `python main.py` as a fresh process several times and measures the
+time from launch to the first successful /api/health response, then checks
+that the heavy modules deferred to first use were not imported on the way:
+
+    python benchmarks/bench_startup.py                   # 5 runs against the default budget
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --budget-ms 1000  # exits non-zero if the median is slower
+
+Warmup and the price store are turned off so only process startup is timed.
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+from typing import Dict, List
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.join(BENCHMARK_DIR, "..")
+
+# Median time to the first health response must stay under this
+STARTUP_BUDGET_MS = 1500
+
+# Modules that must only be imported when a request needs them
+DEFERRED_MODULES = ["pandas", "yfinance"]
+
+# Give up on a run that has not answered by then
+STARTUP_TIMEOUT_SECONDS = 30
+POLL_INTERVAL_SECONDS = 0.005
+
+def free_port() -> int:
+    """Port that is free on the loopback interface right now"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def server_environment(port: int, workdir: str) -> Dict[str, str]:
+    """Environment for a single-worker server that does no work at startup"""
+    env = dict(os.environ)
+    env.update({
+        "HOST": "127.0.0.1",
+        "PORT": str(port),
+        "WORKERS": "1",
+        "WARMUP_ENABLED": "false",
+        "PRICE_STORE_ENABLED": "false",
+        "SHARED_CACHE_BACKEND": "none",
+        "LOG_LEVEL": "WARNING",
+        "PRICE_STORE_PATH": os.path.join(workdir, "price_store.db")
+    })
+    return env
+
+def time_to_first_health(workdir: str) -> float:
+    """Seconds from starting the server process to its first 200 from /api/health"""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}/api/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"],
+        cwd=APP_DIR,
+        env=server_environment(port, workdir),
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE
+    )
+    try:
+        while time.perf_counter() - started < STARTUP_TIMEOUT_SECONDS:
+            if process.poll() is not None:
+                raise RuntimeError(f"Server exited during startup:\n{process.stderr.read().decode()}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except (urllib.error.URLError, ConnectionError):
+                pass
+            time.sleep(POLL_INTERVAL_SECONDS)
+        raise RuntimeError(f"Server did not answer {url} within {STARTUP_TIMEOUT_SECONDS}s")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+def deferred_modules_loaded(workdir: str) -> List[str]:
+    """Deferred modules that are imported anyway when the app is loaded"""
+    check = (
+        "import sys, main; "
+        f"print(','.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", check],
+        cwd=APP_DIR,
+        env=server_environment(free_port(), workdir),
+        capture_output=True,
+        text=True,
+        check=True
+    ).stdout.strip()
+    return [name for name in output.split(",") if name]
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Number of server starts to time")
+    parser.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS,
+                        help="Maximum median time to the first health response")
+    args = parser.parse_args()
+
+    print(f"{'=' * 20} Startup Benchmark {'=' * 20}")
+    with tempfile.TemporaryDirectory() as workdir:
+        timings = []
+        for run in range(1, args.runs + 1):
+            elapsed_ms = time_to_first_health(workdir) * 1000
+            timings.append(elapsed_ms)
+            print(f"run {run:>2}: {elapsed_ms:>7.1f}ms to first /api/health response")
+        loaded = deferred_modules_loaded(workdir)
+
+    median = statistics.median(timings)
+    print(f"\nmin {min(timings):.1f}ms  median {median:.1f}ms  max {max(timings):.1f}ms  (budget {args.budget_ms:.0f}ms)")
+
+    failed = False
+    if median > args.budget_ms:
+        print(f"FAIL: median startup {median:.1f}ms exceeds the {args.budget_ms:.0f}ms budget")
+        failed = True
+    if loaded:
+        print(f"FAIL: imported at startup although deferred to first use: {', '.join(loaded)}")
+        failed = True
+    if not failed:
+        print("OK: startup within budget and no deferred module imported")
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Load test showing that heavy /api/returns queries do not stall /api/health
+
+Start the server first (ideally with PRICE_STORE_ENABLED=false so every
+returns query really goes upstream), then run:
+
+    python benchmarks/event_loop_load_test.py
+"""
+
+import requests
+import statistics
+import sys
+import threading
+import time
+from datetime import date, timedelta
+
+# API base URL
+BASE_URL = "http://localhost:8000"
+
+# Load shape
+HEAVY_CLIENTS = 8
+HEALTH_INTERVAL_SECONDS = 0.05
+DURATION_SECONDS = 20
+
+# Health checks must stay below this p99 latency while returns queries run
+HEALTH_P99_BUDGET_MS = 100.0
+
+def heavy_returns_worker(stop: threading.Event, results: list) -> None:
+    """Issue 10-year MAG7 returns queries back to back until stopped"""
+    end_date = date.today()
+    start_date = end_date - timedelta(days=3650)
+    params = {
+        "start": start_date.strftime('%Y-%m-%d'),
+        "end": end_date.strftime('%Y-%m-%d')
+    }
+
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            response = requests.get(f"{BASE_URL}/api/returns", params=params, timeout=120)
+            results.append((response.status_code, time.perf_counter() - started))
+        except Exception as e:
+            print(f"Returns request failed: {e}")
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of a non-empty list"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+def run_load_test() -> bool:
+    """Run the load test and report health check latency under load"""
+    stop = threading.Event()
+    returns_results = []
+    workers = [
+        threading.Thread(target=heavy_returns_worker, args=(stop, returns_results), daemon=True)
+        for _ in range(HEAVY_CLIENTS)
+    ]
+    for worker in workers:
+        worker.start()
+
+    health_latencies_ms = []
+    deadline = time.perf_counter() + DURATION_SECONDS
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        try:
+            response = requests.get(f"{BASE_URL}/api/health", timeout=10)
+            if response.status_code == 200:
+                health_latencies_ms.append((time.perf_counter() - started) * 1000)
+        except Exception as e:
+            print(f"Health check failed: {e}")
+        time.sleep(HEALTH_INTERVAL_SECONDS)
+
+    stop.set()
+    for worker in workers:
+        worker.join(timeout=120)
+
+    if not health_latencies_ms:
+        print("No successful health checks")
+        return False
+
+    p50 = statistics.median(health_latencies_ms)
+    p99 = percentile(health_latencies_ms, 99)
+    print(f"Returns requests completed: {len(returns_results)}")
+    if returns_results:
+        durations = [duration for _, duration in returns_results]
+        print(f"Returns latency p50: {statistics.median(durations):.2f}s")
+    print(f"Health checks: {len(health_latencies_ms)}")
+    print(f"Health latency p50: {p50:.1f}ms, p99: {p99:.1f}ms, max: {max(health_latencies_ms):.1f}ms")
+
+    return p99 <= HEALTH_P99_BUDGET_MS
+
+if __name__ == "__main__":
+    print("Event Loop Load Test")
+    print("=" * 40)
+
+    passed = run_load_test()
+    if passed:
+        print(f"PASS: health p99 within {HEALTH_P99_BUDGET_MS:.0f}ms budget")
+    else:
+        print(f"FAIL: health p99 exceeded {HEALTH_P99_BUDGET_MS:.0f}ms budget")
+    sys.exit(0 if passed else 1)
@@ -0,0 +1,288 @@
+from typing import Any, Dict, Hashable, Optional
+from collections import OrderedDict
+import math
+import struct
+import sys
+import threading
+import time
+import logging
+
+import numpy as np
+
+from shared_cache import SharedCacheBackend
+from price_series import DAY_DTYPE, VALUE_DTYPE, DailySeries
+
+# Part of every shared cache key; bump it when the encoding of shared values changes
+# so workers running different versions never read each other's entries
+SHARED_FORMAT_VERSION = 3
+
+# Shared entry header: expiry (NaN for none) and number of days, followed by the
+# little-endian int32 days and float64 values
+_SHARED_HEADER = struct.Struct("<dI")
+_SHARED_DAYS_DTYPE = np.dtype(DAY_DTYPE).newbyteorder("<")
+_SHARED_VALUES_DTYPE = np.dtype(VALUE_DTYPE).newbyteorder("<")
+
+logger = logging.getLogger(__name__)
+
+def encode_shared(value: DailySeries, expires_at: Optional[float]) -> bytes:
+    """
+    Encode a series and its expiry for the shared cache backend
+
+    Only raw arrays are written, so reading an entry never executes code,
+    whatever another process put in the backend.
+
+    Args:
+        value: Series to encode
+        expires_at: Optional Unix timestamp after which the entry is stale
+
+    Returns:
+        Encoded entry
+    """
+    header = _SHARED_HEADER.pack(math.nan if expires_at is None else expires_at, len(value))
+    return b"".join((
+        header,
+        value.days.astype(_SHARED_DAYS_DTYPE, copy=False).tobytes(),
+        value.values.astype(_SHARED_VALUES_DTYPE, copy=False).tobytes()
+    ))
+
+def decode_shared(payload: bytes) -> tuple:
+    """
+    Decode an entry written by encode_shared
+
+    Args:
+        payload: Encoded entry
+
+    Returns:
+        Tuple of the series and its expiry
+
+    Raises:
+        ValueError: If the payload is not a valid entry
+    """
+    if len(payload) < _SHARED_HEADER.size:
+        raise ValueError(f"shared entry of {len(payload)} bytes is too short")
+    expires_at, count = _SHARED_HEADER.unpack_from(payload)
+    days_end = _SHARED_HEADER.size + count * _SHARED_DAYS_DTYPE.itemsize
+    if len(payload) != days_end + count * _SHARED_VALUES_DTYPE.itemsize:
+        raise ValueError(f"shared entry of {len(payload)} bytes does not hold {count} days")
+    days = np.frombuffer(payload, dtype=_SHARED_DAYS_DTYPE, count=count, offset=_SHARED_HEADER.size)
+    values = np.frombuffer(payload, dtype=_SHARED_VALUES_DTYPE, count=count, offset=days_end)
+    return DailySeries(days, values), None if math.isnan(expires_at) else expires_at
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory footprint of a cached value in bytes
+
+    Pandas and numpy objects report their buffer sizes. Lists are estimated
+    from their first element, which is accurate for the homogeneous lists of
+    return points this cache holds and avoids walking every item.
+
+    Args:
+        value: Value to measure
+
+    Returns:
+        Approximate size in bytes
+    """
+    if isinstance(value, DailySeries):
+        return sys.getsizeof(value) + value.nbytes
+    # pandas is imported lazily; if it is not loaded yet, value cannot be a pandas object
+    pd = sys.modules.get("pandas")
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if pd is not None and isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return sys.getsizeof(value)
+        return sys.getsizeof(value) + len(value) * estimate_size(value[0])
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k) + estimate_size(v) for k, v in value.items()
+        )
+    return sys.getsizeof(value)
+
+class TTLLRUCache:
+    """Thread-safe LRU cache bounded by memory, with optional per-entry expiry
+
+    Entries are evicted least recently used first once the estimated size of
+    all entries exceeds max_bytes. Entries stored without an expiry only leave
+    the cache through eviction. Expired entries are kept until they are
+    replaced or evicted, so get_stale() can still serve them while the
+    upstream is unavailable.
+
+    With a shared backend the cache becomes two-level: local misses are looked
+    up in the backend, and every stored DailySeries is also written there, so
+    worker processes reuse each other's results. Other values stay local.
+    Backend failures and entries that do not decode are logged and treated as
+    misses.
+    """
+
+    def __init__(self, name: str, max_bytes: int, shared: Optional[SharedCacheBackend] = None):
+        self.name = name
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+        self._shared_hits = 0
+        self._shared_errors = 0
+
+    def _shared_key(self, key: Hashable) -> str:
+        return f"{self.name}:v{SHARED_FORMAT_VERSION}:{key!r}"
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a cached value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if it is missing or expired
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, size, expires_at = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                self._expirations += 1
+
+        value, expires_at = self._get_shared(key)
+        with self._lock:
+            if value is None:
+                self._misses += 1
+                return None
+            self._shared_hits += 1
+        self._set_local(key, value, expires_at)
+        return value
+
+    def contains(self, key: Hashable) -> bool:
+        """
+        Check whether an unexpired value is in the local cache
+
+        Unlike get, this neither counts as a hit or miss nor refreshes the
+        entry's position in the LRU order.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if a fresh value is cached locally
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False
+            expires_at = entry[2]
+            return expires_at is None or expires_at > time.time()
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """
+        Look up a locally cached value, even if it has expired
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None if it is not in the local cache
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def _get_shared(self, key: Hashable) -> tuple:
+        if self.shared is None:
+            return None, None
+        try:
+            payload = self.shared.get(self._shared_key(key))
+            if payload is None:
+                return None, None
+            value, expires_at = decode_shared(payload)
+        except Exception as e:
+            self._record_shared_error("read", key, e)
+            return None, None
+        if expires_at is not None and expires_at <= time.time():
+            return None, None
+        return value, expires_at
+
+    def _record_shared_error(self, operation: str, key: Hashable, error: Exception) -> None:
+        with self._lock:
+            self._shared_errors += 1
+        logger.warning(f"Shared {self.name} cache {operation} failed for {key}: {error}")
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """
+        Store a value, evicting least recently used entries if needed
+
+        Args:
+            key: Cache key
+            value: Value to store (must not be None)
+            expires_at: Optional Unix timestamp after which the entry is stale
+        """
+        self._set_local(key, value, expires_at)
+
+        # Series are the only values with a shared encoding; anything else stays local
+        if self.shared is not None and isinstance(value, DailySeries):
+            try:
+                payload = encode_shared(value, expires_at)
+                ttl = expires_at - time.time() if expires_at is not None else None
+                if ttl is None or ttl > 0:
+                    self.shared.set(self._shared_key(key), payload, ttl)
+            except Exception as e:
+                self._record_shared_error("write", key, e)
+
+    def _set_local(self, key: Hashable, value: Any, expires_at: Optional[float]) -> None:
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            logger.debug(f"Not caching {key} in {self.name} cache: {size} bytes exceeds capacity")
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (value, size, expires_at)
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self._evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+
+        Returns:
+            Dictionary with hit, miss, eviction and expiration counts plus current usage
+        """
+        with self._lock:
+            return {
+                "hits": self._hits,
+                "shared_hits": self._shared_hits,
+                "shared_errors": self._shared_errors,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "expirations": self._expirations,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
@@ -0,0 +1,76 @@
+from typing import Dict, List, Optional
+import gzip
+
+try:
+    import brotli
+except ImportError:
+    # Optional; without it responses are only offered gzip-encoded
+    brotli = None
+
+from config import config
+
+def supported_encodings() -> List[str]:
+    """Content codings the server can produce, most preferred first"""
+    return (["br"] if brotli is not None else []) + ["gzip"]
+
+def _accepted_weights(accept_encoding: str) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, *params = item.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        weight = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding] = weight
+    return weights
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick the content coding for a response from the Accept-Encoding header
+
+    Among the codings the client accepts with the highest q-value, the one the
+    server prefers wins (brotli over gzip). A "*" entry stands for every coding
+    the client did not list.
+
+    Args:
+        accept_encoding: Value of the Accept-Encoding header, if any
+
+    Returns:
+        "br" or "gzip", or None to send the body unencoded
+    """
+    if not config.COMPRESSION_ENABLED or not accept_encoding:
+        return None
+    weights = _accepted_weights(accept_encoding)
+    best, best_weight = None, 0.0
+    for coding in supported_encodings():
+        weight = weights.get(coding, weights.get("*", 0.0))
+        if weight > best_weight:
+            best, best_weight = coding, weight
+    return best
+
+def compress(body: bytes, encoding: Optional[str]) -> Optional[bytes]:
+    """
+    Encode a response body
+
+    Args:
+        body: Unencoded body
+        encoding: Negotiated coding, None for no encoding
+
+    Returns:
+        The encoded body, or None if it should be sent as is because no coding
+        was negotiated or it is smaller than COMPRESSION_MIN_SIZE
+    """
+    if encoding is None or len(body) < config.COMPRESSION_MIN_SIZE:
+        return None
+    if encoding == "br":
+        return brotli.compress(body, quality=config.BROTLI_QUALITY)
+    # A fixed mtime keeps the output, and so the cached bytes, deterministic
+    return gzip.compress(body, compresslevel=config.GZIP_LEVEL, mtime=0)
@@ -11,6 +11,7 @@ class Config:
     # Server Configuration
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
+    WORKERS: int = int(os.getenv("WORKERS", "1"))
     
     # CORS Configuration
     CORS_ORIGINS: List[str] = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://127.0.0.1:3000").split(",")
@@ -18,6 +19,10 @@ class Config:
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    # Per-symbol hot path messages, e.g. HOT_PATH_LOG_LEVEL=DEBUG and HOT_PATH_LOG_SAMPLE_RATE=0.01
+    HOT_PATH_LOG_LEVEL: str = os.getenv("HOT_PATH_LOG_LEVEL", "INFO")
+    HOT_PATH_LOG_SAMPLE_RATE: float = float(os.getenv("HOT_PATH_LOG_SAMPLE_RATE", "1.0"))
+    
     # API Configuration
     API_TITLE: str = os.getenv("API_TITLE", "MAG7 Stock Returns API 33333")
     API_DESCRIPTION: str = os.getenv(
@@ -30,8 +35,87 @@ class Config:
     # Stock Symbols Configuration
     MAG7_SYMBOLS: List[str] = os.getenv("MAG7_SYMBOLS", "MSFT,AAPL,GOOGL,AMZN,NVDA,META,TSLA").split(",")
     
+    # Benchmark for beta and rolling correlation
+    BENCHMARK_SYMBOL: str = os.getenv("BENCHMARK_SYMBOL", "SPY")
+    
     # Data Validation Configuration
     MAX_DATE_RANGE_DAYS: int = int(os.getenv("MAX_DATE_RANGE_DAYS", "3650"))
+    BATCH_MAX_QUERIES: int = int(os.getenv("BATCH_MAX_QUERIES", "500"))
+    
+    # Symbol Universe Configuration (no file means every well-formed symbol is accepted)
+    SYMBOL_UNIVERSE_PATH: str = os.getenv("SYMBOL_UNIVERSE_PATH", "")
+    SYMBOL_UNIVERSE_REFRESH_SECONDS: float = float(os.getenv("SYMBOL_UNIVERSE_REFRESH_SECONDS", "3600"))
+    UNKNOWN_SYMBOL_TTL_SECONDS: float = float(os.getenv("UNKNOWN_SYMBOL_TTL_SECONDS", "86400"))
+    UNKNOWN_SYMBOL_MIN_SESSIONS: int = int(os.getenv("UNKNOWN_SYMBOL_MIN_SESSIONS", "5"))
+    UNKNOWN_SYMBOL_CACHE_MAX_BYTES: int = int(os.getenv("UNKNOWN_SYMBOL_CACHE_MAX_BYTES", str(1024 * 1024)))
+    
+    # Price Provider Configuration ("yfinance", "synthetic" or "recorded")
+    PRICE_PROVIDER: str = os.getenv("PRICE_PROVIDER", "yfinance")
+    PRICE_FIXTURES_DIR: str = os.getenv("PRICE_FIXTURES_DIR", "fixtures/prices")
+    SYNTHETIC_LATENCY_MS: float = float(os.getenv("SYNTHETIC_LATENCY_MS", "0"))
+    
+    # Upstream Fetch Configuration
+    FETCH_MAX_WORKERS: int = int(os.getenv("FETCH_MAX_WORKERS", "8"))
+    
+    # Upstream Resilience Configuration
+    UPSTREAM_RATE_PER_SECOND: float = float(os.getenv("UPSTREAM_RATE_PER_SECOND", "10"))
+    UPSTREAM_BURST: int = int(os.getenv("UPSTREAM_BURST", "20"))
+    UPSTREAM_MAX_RETRIES: int = int(os.getenv("UPSTREAM_MAX_RETRIES", "2"))
+    UPSTREAM_RETRY_BASE_SECONDS: float = float(os.getenv("UPSTREAM_RETRY_BASE_SECONDS", "0.5"))
+    UPSTREAM_RETRY_MAX_SECONDS: float = float(os.getenv("UPSTREAM_RETRY_MAX_SECONDS", "8"))
+    UPSTREAM_CIRCUIT_FAILURE_THRESHOLD: int = int(os.getenv("UPSTREAM_CIRCUIT_FAILURE_THRESHOLD", "5"))
+    UPSTREAM_CIRCUIT_RESET_SECONDS: float = float(os.getenv("UPSTREAM_CIRCUIT_RESET_SECONDS", "30"))
+    UPSTREAM_DEADLINE_SECONDS: float = float(os.getenv("UPSTREAM_DEADLINE_SECONDS", "25"))
+    
+    # Request Stage Timeouts (seconds)
+    FETCH_TIMEOUT_SECONDS: float = float(os.getenv("FETCH_TIMEOUT_SECONDS", "30"))
+    COMPUTE_TIMEOUT_SECONDS: float = float(os.getenv("COMPUTE_TIMEOUT_SECONDS", "10"))
+    
+    # Admission Control Configuration (cost is symbols x calendar days requested)
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_MAX_COST: int = int(os.getenv("ADMISSION_MAX_COST", "365000"))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", "64"))
+    ADMISSION_MAX_WAIT_SECONDS: float = float(os.getenv("ADMISSION_MAX_WAIT_SECONDS", "2"))
+    ADMISSION_CACHED_COST_FACTOR: float = float(os.getenv("ADMISSION_CACHED_COST_FACTOR", "0.25"))
+    
+    # HTTP Caching Configuration
+    LIVE_CACHE_MAX_AGE_SECONDS: int = int(os.getenv("LIVE_CACHE_MAX_AGE_SECONDS", "60"))
+    
+    # Response Compression Configuration (/api/returns and the aggregate endpoints)
+    COMPRESSION_ENABLED: bool = os.getenv("COMPRESSION_ENABLED", "true").lower() == "true"
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "1"))
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "1"))
+    COMPRESSED_CACHE_MAX_BYTES: int = int(os.getenv("COMPRESSED_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    
+    # Live Update Configuration (WebSocket /api/live)
+    LIVE_POLL_SECONDS: float = float(os.getenv("LIVE_POLL_SECONDS", "15"))
+    LIVE_IDLE_POLL_SECONDS: float = float(os.getenv("LIVE_IDLE_POLL_SECONDS", "300"))
+    LIVE_WINDOW_DAYS: int = int(os.getenv("LIVE_WINDOW_DAYS", "7"))
+    LIVE_QUEUE_SIZE: int = int(os.getenv("LIVE_QUEUE_SIZE", "256"))
+    LIVE_MAX_POLLERS: int = int(os.getenv("LIVE_MAX_POLLERS", "50"))
+    
+    # Cache Warm-up Configuration
+    WARMUP_ENABLED: bool = os.getenv("WARMUP_ENABLED", "true").lower() == "true"
+    WARMUP_REFRESH_DELAY_MINUTES: float = float(os.getenv("WARMUP_REFRESH_DELAY_MINUTES", "20"))
+    WARMUP_JITTER_SECONDS: float = float(os.getenv("WARMUP_JITTER_SECONDS", "300"))
+    WARMUP_RETRY_SECONDS: float = float(os.getenv("WARMUP_RETRY_SECONDS", "30"))
+    WARMUP_MAX_BACKOFF_SECONDS: float = float(os.getenv("WARMUP_MAX_BACKOFF_SECONDS", "1800"))
+    
+    # Price Store Configuration
+    PRICE_STORE_ENABLED: bool = os.getenv("PRICE_STORE_ENABLED", "true").lower() == "true"
+    PRICE_STORE_PATH: str = os.getenv("PRICE_STORE_PATH", "price_store.db")
+    
+    # In-Memory Cache Configuration (bytes)
+    PRICE_CACHE_MAX_BYTES: int = int(os.getenv("PRICE_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RETURNS_CACHE_MAX_BYTES: int = int(os.getenv("RETURNS_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    
+    # Shared Cache Configuration ("none", "sqlite" or "redis")
+    SHARED_CACHE_BACKEND: str = os.getenv("SHARED_CACHE_BACKEND", "none")
+    SHARED_CACHE_PATH: str = os.getenv("SHARED_CACHE_PATH", "shared_cache.db")
+    SHARED_CACHE_URL: str = os.getenv("SHARED_CACHE_URL", "redis://localhost:6379/0")
+    SHARED_CACHE_MAX_BYTES: int = int(os.getenv("SHARED_CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))
+    SHARED_CACHE_MAX_TTL_SECONDS: float = float(os.getenv("SHARED_CACHE_MAX_TTL_SECONDS", str(7 * 86400)))
 
 # Create a global config instance
 config = Config() 
\ No newline at end of file
@@ -1,28 +1,122 @@
-from typing import Dict, List, Optional
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, date
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+from datetime import datetime, date, timedelta
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+import threading
+import time
 import logging
 
+import numpy as np
+
 # Import configuration
 from config import config
+from price_store import PriceStore
+from price_series import DailySeries, StaleSeries
+from price_providers import PriceProvider, create_price_provider
+from singleflight import SingleFlight
+from cache import TTLLRUCache
+from shared_cache import SharedCacheBackend
+from hot_path_logging import log_hot_path
+from metrics import UPSTREAM_FETCH_SECONDS, UPSTREAM_ERRORS, STALE_PRICES_SERVED
+from resilience import CircuitBreaker, TokenBucket, UpstreamGuard, UpstreamUnavailable
+from symbol_universe import SymbolUniverse, always_known_symbols
+import market_calendar
+
+if TYPE_CHECKING:
+    import pandas as pd
 
-# Configure logging
-logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
 logger = logging.getLogger(__name__)
 
+# Calendar days searched on each side of a gap for a stored close to re-fetch
+# alongside it, long enough to reach across weekends and holidays
+BASIS_CHECK_DAYS = 7
+
+# Relative difference between a stored and a re-fetched close of the same
+# session above which the provider's adjustment basis is taken to have changed
+BASIS_TOLERANCE = 1e-6
+
+def basis_changed(stored: DailySeries, fetched: DailySeries) -> bool:
+    """
+    Check whether re-fetched closes disagree with stored closes of the same sessions
+    
+    The provider returns split- and dividend-adjusted closes, adjusted as of the
+    time of the call. After a split or an ex-dividend date every earlier close
+    changes, so closes stored before it are on a different basis than new ones.
+    
+    Args:
+        stored: Closes from the price store
+        fetched: Closes just fetched from the provider
+        
+    Returns:
+        True if any session present in both differs by more than BASIS_TOLERANCE
+    """
+    _, stored_at, fetched_at = np.intersect1d(stored.days, fetched.days, return_indices=True)
+    if len(stored_at) == 0:
+        return False
+    return not np.allclose(fetched.values[fetched_at], stored.values[stored_at], rtol=BASIS_TOLERANCE, atol=0)
+
 class StockDataFetcher:
-    """Handles fetching stock data from yfinance"""
+    """Handles fetching stock data from the configured price provider (yfinance by default)"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        price_store: Optional[PriceStore] = None,
+        provider: Optional[PriceProvider] = None,
+        shared_cache: Optional[SharedCacheBackend] = None,
+        universe: Optional[SymbolUniverse] = None
+    ):
         self.symbols = config.MAG7_SYMBOLS
+        
+        # Known symbols, so typos and delisted tickers are rejected before any upstream call
+        if universe is None:
+            universe = SymbolUniverse(
+                config.SYMBOL_UNIVERSE_PATH,
+                always_known_symbols(self.symbols + [config.BENCHMARK_SYMBOL]),
+                config.SYMBOL_UNIVERSE_REFRESH_SECONDS
+            )
+        self.universe = universe
+        
+        # Symbols the provider had no data for, rejected until the entry expires.
+        # Kept per worker: a shared lookup would cost more than it saves on valid symbols.
+        self.unknown_symbols = TTLLRUCache("unknown_symbols", config.UNKNOWN_SYMBOL_CACHE_MAX_BYTES)
+        
+        # Upstream source of close prices, selected by PRICE_PROVIDER unless given
+        self.provider = provider if provider is not None else create_price_provider()
+        
+        # Rate limiting, retries and circuit breaking shared by every upstream call
+        self.upstream = UpstreamGuard(
+            TokenBucket(config.UPSTREAM_RATE_PER_SECOND, config.UPSTREAM_BURST),
+            CircuitBreaker(config.UPSTREAM_CIRCUIT_FAILURE_THRESHOLD, config.UPSTREAM_CIRCUIT_RESET_SECONDS),
+            max_retries=config.UPSTREAM_MAX_RETRIES,
+            retry_base_seconds=config.UPSTREAM_RETRY_BASE_SECONDS,
+            retry_max_seconds=config.UPSTREAM_RETRY_MAX_SECONDS
+        )
+        
+        # Local price store so overlapping requests only fetch missing edges upstream
+        if price_store is None and config.PRICE_STORE_ENABLED:
+            price_store = PriceStore(config.PRICE_STORE_PATH)
+        self.price_store = price_store
+        
+        # Bounded pool shared by all requests so upstream concurrency stays capped per worker
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.FETCH_MAX_WORKERS,
+            thread_name_prefix="stock-fetch"
+        )
+        
+        # Concurrent requests for the same symbol share one upstream fetch
+        self.fetch_flight = SingleFlight("fetch")
+        
+        # Recently served price series per (symbol, start, end), expiring at the
+        # next session close when the range is not final yet. With a shared cache
+        # backend, series fetched by one worker process are reused by the others.
+        self.price_cache = TTLLRUCache("prices", config.PRICE_CACHE_MAX_BYTES, shared_cache)
     
     def fetch_daily_prices(
         self, 
         start_date: date, 
         end_date: date,
-        symbols: Optional[List[str]] = None
-    ) -> Dict[str, pd.Series]:
+        symbols: Optional[List[str]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Dict[str, DailySeries]:
         """
         Fetch daily close prices for specified stocks
         
@@ -30,9 +124,12 @@ class StockDataFetcher:
             start_date: Start date for data fetching
             end_date: End date for data fetching
             symbols: Optional list of stock symbols to fetch. If None, uses all symbols from config
+            cancel_event: Optional event that, once set, makes symbols still waiting
+                for a worker get skipped instead of fetched
             
         Returns:
-            Dictionary mapping symbol to DataFrame with daily close prices
+            Dictionary mapping symbol to its daily close prices. Symbols answered
+            from stale data while the upstream is unavailable have `stale` set.
         """
         try:
             # Use provided symbols or fall back to config symbols
@@ -44,32 +141,25 @@ class StockDataFetcher:
             
             logger.info(f"Fetching data for {len(symbols_to_fetch)} symbols from {start_date} to {end_date}")
             
-            # Convert dates to string format for yfinance
-            start_str = start_date.strftime('%Y-%m-%d')
-            end_str = end_date.strftime('%Y-%m-%d')
-            
             result = {}
+            deadline = time.monotonic() + config.UPSTREAM_DEADLINE_SECONDS
+            
+            # Fetch each symbol individually (to ensure we get data) but concurrently,
+            # so total latency tracks the slowest symbol rather than the sum of all
+            futures = {
+                symbol: self._executor.submit(
+                    self._fetch_symbol_prices, symbol, start_date, end_date, cancel_event, deadline
+                )
+                for symbol in symbols_to_fetch
+            }
             
-            # Fetch data for each symbol individually to ensure we get data
-            for symbol in symbols_to_fetch:
+            for symbol, future in futures.items():
                 try:
-                    logger.info(f"Fetching data for {symbol}")
-                    ticker = yf.Ticker(symbol)
-                    data = ticker.history(start=start_str, end=end_str)
-                    
-                    if data.empty:
-                        logger.warning(f"No data available for {symbol}")
-                        continue
-                    
-                    # Extract close prices
-                    close_data = data['Close']
-                    
-                    # Remove any NaN values
-                    close_data = close_data.dropna()
+                    close_data = future.result()
                     
                     if len(close_data) > 0:
                         result[symbol] = close_data
-                        logger.info(f"Successfully fetched {len(close_data)} data points for {symbol}")
+                        log_hot_path(logger, f"Successfully fetched {len(close_data)} data points for {symbol}")
                     else:
                         logger.warning(f"No valid close prices for {symbol}")
                         
@@ -87,6 +177,314 @@ class StockDataFetcher:
             logger.error(f"Error fetching stock data: {str(e)}")
             raise ValueError(f"Failed to fetch stock data: {str(e)}")
     
+    def iter_daily_prices(
+        self,
+        start_date: date,
+        end_date: date,
+        symbols: Optional[List[str]] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> Iterator[Tuple[str, Optional[DailySeries], Optional[str]]]:
+        """
+        Fetch daily close prices symbol by symbol, yielding each as soon as it is ready
+        
+        At most FETCH_MAX_WORKERS symbols are in flight at a time and each result is
+        handed over as soon as it completes, so memory stays bounded by the window
+        rather than by the number of requested symbols.
+        
+        Args:
+            start_date: Start date for data fetching
+            end_date: End date for data fetching
+            symbols: Optional list of stock symbols to fetch. If None, uses all symbols from config
+            cancel_event: Optional event that, once set, stops submitting further symbols
+            
+        Yields:
+            Tuples of (symbol, close prices, error message). Exactly one of close
+            prices and error message is None.
+            
+        Raises:
+            ValueError: If no symbols are provided
+        """
+        symbols_to_fetch = symbols if symbols is not None else self.symbols
+        if not symbols_to_fetch:
+            raise ValueError("No symbols provided for data fetching")
+        
+        logger.info(f"Streaming data for {len(symbols_to_fetch)} symbols from {start_date} to {end_date}")
+        
+        pending_symbols = list(dict.fromkeys(symbols_to_fetch))
+        in_flight = {}
+        deadline = time.monotonic() + config.UPSTREAM_DEADLINE_SECONDS
+        try:
+            while pending_symbols or in_flight:
+                while pending_symbols and len(in_flight) < config.FETCH_MAX_WORKERS:
+                    if cancel_event is not None and cancel_event.is_set():
+                        return
+                    symbol = pending_symbols.pop(0)
+                    future = self._executor.submit(
+                        self._fetch_symbol_prices, symbol, start_date, end_date, cancel_event, deadline
+                    )
+                    in_flight[future] = symbol
+                
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol = in_flight.pop(future)
+                    try:
+                        close_data = future.result()
+                    except Exception as e:
+                        logger.error(f"Error fetching data for {symbol}: {str(e)}")
+                        yield symbol, None, str(e)
+                        continue
+                    
+                    if len(close_data) > 0:
+                        yield symbol, close_data, None
+                    else:
+                        logger.warning(f"No valid close prices for {symbol}")
+                        yield symbol, None, "No data available"
+        finally:
+            for future in in_flight:
+                future.cancel()
+    
+    def fetch_latest_prices(self, symbol: str, window_days: int) -> DailySeries:
+        """
+        Fetch the most recent close prices of a symbol straight from the provider
+        
+        Bypasses the price cache and the price store, which keep a session in
+        progress until its close, so the close of the current session reflects
+        the latest trade. Used by the live update pollers.
+        
+        Args:
+            symbol: Stock symbol to fetch
+            window_days: Number of calendar days to fetch, ending today
+            
+        Returns:
+            Daily close prices (may be empty)
+            
+        Raises:
+            UpstreamUnavailable: If the resilience layer gave up on the provider
+        """
+        end_date = date.today() + timedelta(days=1)
+        deadline = time.monotonic() + config.UPSTREAM_DEADLINE_SECONDS
+        return self._download_close_prices(symbol, end_date - timedelta(days=window_days), end_date, deadline)
+    
+    def _fetch_symbol_prices(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        cancel_event: Optional[threading.Event] = None,
+        deadline: Optional[float] = None
+    ) -> DailySeries:
+        """
+        Fetch daily close prices for a single symbol, going through the price store if enabled
+        
+        When the upstream is unavailable (circuit open, deadline passed or retries
+        exhausted), expired cached prices or whatever the price store already
+        holds for the range are served instead.
+        
+        Args:
+            symbol: Stock symbol to fetch
+            start_date: Start date for data fetching (inclusive)
+            end_date: End date for data fetching (exclusive)
+            cancel_event: Optional event signalling that the request was abandoned
+            deadline: Optional time.monotonic() value by which upstream calls must succeed
+            
+        Returns:
+            Daily close prices (may be empty), a StaleSeries if served from stale data
+            
+        Raises:
+            RuntimeError: If the request was abandoned before this symbol was fetched
+            UpstreamUnavailable: If the upstream failed and there is no stale data to serve
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            raise RuntimeError("Request was cancelled")
+        
+        cache_key = (symbol, start_date, end_date)
+        close_data = self.price_cache.get(cache_key)
+        if close_data is not None:
+            return close_data
+        
+        try:
+            close_data = self._load_symbol_prices(symbol, start_date, end_date, deadline)
+        except UpstreamUnavailable as e:
+            stale = self._stale_prices(symbol, start_date, end_date)
+            if stale is None:
+                raise
+            logger.warning(f"Serving stale prices for {symbol}: {str(e)}")
+            STALE_PRICES_SERVED.inc()
+            return stale
+        
+        self.price_cache.set(
+            cache_key,
+            close_data,
+            expires_at=market_calendar.expiry_for(end_date - timedelta(days=1))
+        )
+        return close_data
+    
+    def is_cached(self, start_date: date, end_date: date, symbols: List[str]) -> bool:
+        """
+        Check whether the prices of every symbol for a range are in the local cache
+        
+        Args:
+            start_date: Start date of the range
+            end_date: End date of the range (exclusive)
+            symbols: Stock symbols
+            
+        Returns:
+            True if fetching the range would not reach the store or the upstream
+        """
+        return all(self.price_cache.contains((symbol, start_date, end_date)) for symbol in symbols)
+    
+    def _stale_prices(self, symbol: str, start_date: date, end_date: date) -> Optional[StaleSeries]:
+        """Expired cached prices for a range, or the part of it the price store holds, marked stale"""
+        close_data = self.price_cache.get_stale((symbol, start_date, end_date))
+        if close_data is None and self.price_store is not None:
+            close_data = self.price_store.load(symbol, start_date, end_date)
+        if close_data is None or close_data.empty:
+            return None
+        return StaleSeries.of(close_data)
+    
+    def _load_symbol_prices(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        deadline: Optional[float] = None
+    ) -> DailySeries:
+        """
+        Load daily close prices for a single symbol from the price store or yfinance
+        
+        Args:
+            symbol: Stock symbol to fetch
+            start_date: Start date for data fetching (inclusive)
+            end_date: End date for data fetching (exclusive)
+            deadline: Optional time.monotonic() value by which upstream calls must succeed
+            
+        Returns:
+            Daily close prices (may be empty)
+        """
+        log_hot_path(logger, f"Fetching data for {symbol}")
+        
+        if self.price_store is None:
+            close_data, _ = self.fetch_flight.do(
+                (symbol, start_date, end_date),
+                self._download_close_prices, symbol, start_date, end_date, deadline
+            )
+            return close_data
+        
+        # Gap fills are coalesced per symbol, so a request overlapping one already in
+        # flight waits for it and then only fetches what the leader's range did not
+        # include. The session in progress is never marked covered, so a gap the
+        # leader fetched must not send us around again.
+        gaps = self.price_store.missing_ranges(symbol, start_date, end_date)
+        while gaps:
+            (filled_start, filled_end), shared = self.fetch_flight.do(
+                symbol, self._fill_gaps, symbol, start_date, end_date, deadline
+            )
+            if not shared:
+                break
+            gaps = [
+                (gap_start, gap_end)
+                for gap_start, gap_end in self.price_store.missing_ranges(symbol, start_date, end_date)
+                if gap_start < filled_start or gap_end > filled_end
+            ]
+        
+        return self.price_store.load(symbol, start_date, end_date)
+    
+    def _fill_gaps(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        deadline: Optional[float] = None
+    ) -> Tuple[date, date]:
+        """
+        Download the date ranges of a symbol still missing from the price store
+        
+        Args:
+            symbol: Stock symbol to fetch
+            start_date: Start of the wanted range (inclusive)
+            end_date: End of the wanted range (exclusive)
+            deadline: Optional time.monotonic() value by which upstream calls must succeed
+            
+        Returns:
+            The range whose prices are now stored, so callers that waited for this
+            fill know which of their gaps it took care of
+        """
+        # Another worker process may have filled the gaps while we waited for the lock
+        with self.price_store.symbol_lock(symbol):
+            gaps = self.price_store.missing_ranges(symbol, start_date, end_date)
+            
+            # A session's close is not final until the market has closed, so coverage
+            # never extends past the last closed session
+            covered_until = market_calendar.last_closed_session() + timedelta(days=1)
+            for gap_start, gap_end in gaps:
+                logger.debug(f"Filling {symbol} gap from {gap_start} to {gap_end}")
+                # Stored closes next to the gap are fetched again to check that the
+                # new closes are on the same adjustment basis as the stored ones
+                before = self.price_store.load(symbol, gap_start - timedelta(days=BASIS_CHECK_DAYS), gap_start)
+                after = self.price_store.load(symbol, gap_end, gap_end + timedelta(days=BASIS_CHECK_DAYS))
+                fetch_start = before.last_date if not before.empty else gap_start
+                fetch_end = after.first_date + timedelta(days=1) if not after.empty else gap_end
+                close_data = self._download_close_prices(symbol, fetch_start, fetch_end, deadline)
+                
+                if basis_changed(before, close_data) or basis_changed(after, close_data):
+                    # A split or dividend since the stored closes were fetched: drop
+                    # them and fetch the whole range again on the current basis
+                    logger.warning(f"Adjustment basis of {symbol} changed, re-fetching {start_date} to {end_date}")
+                    self.price_store.invalidate(symbol)
+                    close_data = self._download_close_prices(symbol, start_date, end_date, deadline)
+                    self.price_store.save(symbol, close_data, start_date, min(end_date, covered_until))
+                    return start_date, end_date
+                
+                self.price_store.save(symbol, close_data.slice(gap_start, gap_end), gap_start, min(gap_end, covered_until))
+        return start_date, end_date
+    
+    def _download_close_prices(
+        self,
+        symbol: str,
+        start_date: date,
+        end_date: date,
+        deadline: Optional[float] = None
+    ) -> DailySeries:
+        """
+        Download daily close prices for a single symbol from the price provider
+        
+        Args:
+            symbol: Stock symbol to fetch
+            start_date: Start date for data fetching (inclusive)
+            end_date: End date for data fetching (exclusive)
+            deadline: Optional time.monotonic() value by which the call must succeed
+            
+        Returns:
+            Daily close prices (may be empty)
+            
+        Raises:
+            UpstreamUnavailable: If the resilience layer gave up on the provider
+        """
+        def attempt() -> "pd.Series":
+            started = time.perf_counter()
+            try:
+                return self.provider.fetch_close_prices(symbol, start_date, end_date)
+            except Exception:
+                UPSTREAM_ERRORS.inc()
+                raise
+            finally:
+                UPSTREAM_FETCH_SECONDS.observe(time.perf_counter() - started)
+        
+        # Only the day numbers and closes are kept from here on (NaN values are dropped)
+        close_data = DailySeries.from_pandas(self.upstream.call(attempt, deadline=deadline))
+        
+        if close_data.empty:
+            logger.warning(f"No data available for {symbol} from {start_date} to {end_date}")
+            # No closes over several sessions up to the latest one means the provider
+            # does not know the symbol (any listed symbol traded recently). Older
+            # ranges are not conclusive: they may predate the listing.
+            last_session = market_calendar.last_closed_session()
+            if end_date > last_session and market_calendar.sessions_between(
+                start_date, last_session + timedelta(days=1)
+            ) >= config.UNKNOWN_SYMBOL_MIN_SESSIONS:
+                self.unknown_symbols.set(symbol, True, expires_at=time.time() + config.UNKNOWN_SYMBOL_TTL_SECONDS)
+        return close_data
+    
     def validate_date_range(self, start_date: date, end_date: date) -> None:
         """
         Validate the date range for data fetching
@@ -108,7 +506,6 @@ class StockDataFetcher:
         if (end_date - start_date).days > config.MAX_DATE_RANGE_DAYS:
             raise ValueError(f"Date range cannot exceed {config.MAX_DATE_RANGE_DAYS} days")
     
-    # TODO: Improve this validation
     def validate_symbols(self, symbols: List[str]) -> None:
         """
         Validate the provided symbols
@@ -117,7 +514,8 @@ class StockDataFetcher:
             symbols: List of stock symbols to validate
             
         Raises:
-            ValueError: If symbols are invalid
+            ValueError: If symbols are invalid, outside the symbol universe or
+                recently reported unknown by the provider
         """
         if not symbols:
             raise ValueError("At least one symbol must be provided")
@@ -133,4 +531,12 @@ class StockDataFetcher:
         
         # Check if we have too many symbols (to prevent abuse)
         if len(symbols) > 50:  # Reasonable limit
-            raise ValueError("Too many symbols requested. Maximum 50 symbols allowed.") 
\ No newline at end of file
+            raise ValueError("Too many symbols requested. Maximum 50 symbols allowed.")
+        
+        # Reject symbols outside the universe or recently unknown to the provider
+        unknown = [
+            symbol for symbol in (s.strip().upper() for s in symbols)
+            if not self.universe.contains(symbol) or self.unknown_symbols.get(symbol) is not None
+        ]
+        if unknown:
+            raise ValueError(f"Unknown symbols: {', '.join(unknown)}") 
\ No newline at end of file
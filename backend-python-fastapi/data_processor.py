@@ -1,22 +1,54 @@
-from typing import Dict, List, Any
-import pandas as pd
+from typing import TYPE_CHECKING, Dict, List, Any, Hashable, Optional, Sequence
+import numpy as np
 from datetime import date
 import logging
 
+from cache import TTLLRUCache
+from shared_cache import SharedCacheBackend
+from hot_path_logging import log_hot_path
+from downsampling import downsample_indices
+from price_series import DailySeries, DailyMatrix, format_days
+from config import config
+import market_calendar
+
+# pandas is only needed for the resampling and rolling aggregates, so it is
+# imported on first use to keep it off the startup path
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = logging.getLogger(__name__)
 
+# Trading days per year, used to annualize volatility
+TRADING_DAYS_PER_YEAR = 252
+
+# Resampling periods and their pandas offset aliases. Weeks end on Friday.
+RESAMPLE_PERIODS = {
+    "weekly": "W-FRI",
+    "monthly": "ME",
+    "yearly": "YE",
+}
+
 class StockDataProcessor:
     """Handles processing stock data and calculating returns"""
     
+    def __init__(self, shared_cache: Optional[SharedCacheBackend] = None):
+        # Computed returns per symbol and date range. Ranges ending on a closed
+        # session never change; others expire at the next session close.
+        self.returns_cache = TTLLRUCache("returns", config.RETURNS_CACHE_MAX_BYTES, shared_cache)
+    
+    @staticmethod
+    def _returns_cache_key(symbol: str, prices: DailySeries) -> Hashable:
+        return (symbol, int(prices.days[0]), int(prices.days[-1]), len(prices))
+    
     def calculate_daily_returns(
         self, 
-        price_data: Dict[str, pd.Series]
+        price_data: Dict[str, DailySeries]
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Calculate daily percentage returns for each stock
         
         Args:
-            price_data: Dictionary mapping symbol to Series of daily close prices
+            price_data: Dictionary mapping symbol to its daily close prices
             
         Returns:
             Dictionary mapping symbol to list of daily return data
@@ -24,39 +56,269 @@ class StockDataProcessor:
         try:
             logger.info("Calculating daily returns for all symbols")
             
+            # Point dicts only exist for the response being built; everything before
+            # (and the cache) holds the compact day/value arrays
             result = {}
+            for symbol, returns in self.symbol_returns(price_data).items():
+                result[symbol] = [
+                    {"date": day, "return": value}
+                    for day, value in zip(format_days(returns.days), np.round(returns.values, 6).tolist())
+                ]
+            return result
             
-            for symbol, prices in price_data.items():
-                if len(prices) < 2:
-                    logger.warning(f"Insufficient data for {symbol}, skipping")
-                    continue
-                
-                # Calculate daily returns (percentage change)
-                returns = prices.pct_change().dropna()
-                
-                # Convert to list of dictionaries with date and return
-                return_data = []
-                for date_idx, return_val in returns.items():
-                    return_data.append({
-                        "date": date_idx.strftime('%Y-%m-%d'),
-                        "return": round(float(return_val), 6)  # Round to 6 decimal places
-                    })
-                
-                result[symbol] = return_data
-                logger.info(f"Calculated {len(return_data)} daily returns for {symbol}")
+        except Exception as e:
+            logger.error(f"Error calculating returns: {str(e)}")
+            raise ValueError(f"Failed to calculate returns: {str(e)}")
+    
+    def symbol_returns(self, price_data: Dict[str, DailySeries]) -> Dict[str, DailySeries]:
+        """
+        Daily returns of each symbol as compact series, served from the cache where possible
+        
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
             
-            return result
+        Returns:
+            Dictionary mapping symbol to its daily returns, in request order
+            (symbols with fewer than two prices are left out)
+        """
+        result = {}
+        
+        # Serve what we can from the cache and only compute the rest
+        uncached = {}
+        for symbol, prices in price_data.items():
+            cached = None
+            if len(prices) >= 2:
+                cached = self.returns_cache.get(self._returns_cache_key(symbol, prices))
+            if cached is not None:
+                result[symbol] = cached
+            else:
+                uncached[symbol] = prices
+        
+        returns = self.aligned_returns_matrix(uncached)
+        for symbol in returns.symbols:
+            symbol_returns = returns.column(symbol)
+            result[symbol] = symbol_returns
+            log_hot_path(logger, f"Calculated {len(symbol_returns)} daily returns for {symbol}")
+            
+            prices = uncached[symbol]
+            if prices.stale:
+                # Stale prices may be outdated or incomplete; a later fetch computes the real answer
+                continue
+            self.returns_cache.set(
+                self._returns_cache_key(symbol, prices),
+                symbol_returns,
+                expires_at=market_calendar.expiry_for(prices.last_date)
+            )
+        
+        # Keep the symbols in the order they were requested
+        return {symbol: result[symbol] for symbol in price_data if symbol in result}
+    
+    def calculate_columnar_returns(
+        self,
+        price_data: Dict[str, DailySeries]
+    ) -> Dict[str, Any]:
+        """
+        Calculate daily percentage returns in a columnar layout
+        
+        All symbols share a single date axis, and each symbol's returns are one
+        float array aligned to it (NaN where the symbol has no return that day).
+        
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
+            
+        Returns:
+            Dictionary with a "dates" list and a "data" dict mapping symbol to a numpy array
+        """
+        try:
+            logger.info("Calculating columnar daily returns for all symbols")
+            
+            returns = self.aligned_returns_matrix(price_data)
+            rows = returns.mask.any(axis=1)
+            
+            return {
+                "dates": format_days(returns.days[rows]),
+                "data": {
+                    symbol: np.round(returns.values[rows, column], 6)
+                    for column, symbol in enumerate(returns.symbols)
+                }
+            }
             
         except Exception as e:
             logger.error(f"Error calculating returns: {str(e)}")
             raise ValueError(f"Failed to calculate returns: {str(e)}")
     
-    def validate_price_data(self, price_data: Dict[str, pd.Series]) -> None:
+    def aligned_returns_matrix(self, price_data: Dict[str, DailySeries]) -> DailyMatrix:
+        """
+        Calculate daily percentage returns for all stocks on one shared day axis
+        
+        Each symbol's return is relative to its own previous close, exactly as if
+        pct_change() had been applied to every series on its own. Dates on which a
+        symbol did not trade, as well as its first date, are masked out.
+        
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
+            
+        Returns:
+            Matrix of daily returns with one column per symbol
+        """
+        usable = {}
+        for symbol, prices in price_data.items():
+            if len(prices) < 2:
+                logger.warning(f"Insufficient data for {symbol}, skipping")
+                continue
+            usable[symbol] = prices
+        
+        prices = DailyMatrix.from_series(usable)
+        if prices.empty:
+            return prices
+        
+        # Forward-fill by carrying each symbol's last valid row down, so every return
+        # is relative to the last traded close; NaN cells of untraded days stay NaN
+        rows = np.arange(len(prices.days))[:, None]
+        last_valid = np.maximum.accumulate(np.where(prices.mask, rows, 0), axis=0)
+        filled = np.take_along_axis(prices.values, last_valid, axis=0)
+        previous = np.vstack([np.full((1, len(prices.symbols)), np.nan), filled[:-1]])
+        
+        returns = prices.values / previous - 1
+        return DailyMatrix(prices.days, prices.symbols, returns, ~np.isnan(returns))
+    
+    def aligned_returns(self, price_data: Dict[str, DailySeries]) -> "pd.DataFrame":
+        """
+        Daily returns on one shared date axis as a DataFrame, for pandas-based aggregates
+        
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
+            
+        Returns:
+            DataFrame of daily returns indexed by date with one column per symbol
+        """
+        return self.aligned_returns_matrix(price_data).to_frame()
+    
+    def cumulative_returns(self, price_data: Dict[str, DailySeries]) -> "pd.DataFrame":
+        """
+        Calculate compounded returns since the first date of each symbol
+        
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
+            
+        Returns:
+            DataFrame of cumulative returns indexed by date with one column per
+            symbol, NaN on dates the symbol did not trade
+        """
+        returns = self.aligned_returns(price_data)
+        # cumprod skips NaN, so each symbol compounds only over its own trading days
+        return (1 + returns).cumprod() - 1
+    
+    def rolling_statistics(self, price_data: Dict[str, DailySeries], window: int) -> Dict[str, "pd.DataFrame"]:
+        """
+        Calculate the rolling mean and annualized volatility of daily returns
+        
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
+            window: Number of trading days in the rolling window
+            
+        Returns:
+            Dictionary mapping symbol to a DataFrame with "mean" and "volatility"
+            columns, starting at the first date with a full window
+        """
+        import pandas as pd
+        
+        returns = self.aligned_returns(price_data)
+        result = {}
+        for symbol in returns.columns:
+            # Roll over the symbol's own trading days so gaps do not break the window
+            rolling = returns[symbol].dropna().rolling(window, min_periods=window)
+            stats = pd.DataFrame({
+                "mean": rolling.mean(),
+                "volatility": rolling.std() * np.sqrt(TRADING_DAYS_PER_YEAR)
+            }).dropna()
+            result[symbol] = stats
+        return result
+    
+    def period_returns(self, price_data: Dict[str, DailySeries], period: str) -> "pd.DataFrame":
+        """
+        Calculate compounded returns per week, month or year
+        
+        Each period's return runs from the last close of the previous period (or
+        the first close in the range) to the last close of the period, and is
+        labelled with the last trading date in the period.
+        
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
+            period: One of RESAMPLE_PERIODS
+            
+        Returns:
+            DataFrame of period returns with one column per symbol
+            
+        Raises:
+            ValueError: If the period is unknown
+        """
+        if period not in RESAMPLE_PERIODS:
+            raise ValueError(f"Invalid period: {period}. Use one of: {', '.join(RESAMPLE_PERIODS)}")
+        
+        import pandas as pd
+        
+        usable = {symbol: prices for symbol, prices in price_data.items() if len(prices) >= 2}
+        if not usable:
+            return pd.DataFrame()
+        
+        prices = DailyMatrix.from_series(usable).to_frame().ffill()
+        rule = RESAMPLE_PERIODS[period]
+        period_close = prices.resample(rule).last()
+        
+        # A symbol's first period is measured from its first close in the range
+        base = period_close.shift(1).fillna(prices.bfill().iloc[0])
+        returns = period_close / base - 1
+        
+        # Relabel periods with their last trading date and drop periods without one
+        last_dates = pd.Series(prices.index, index=prices.index).resample(rule).last()
+        returns.index = pd.DatetimeIndex(last_dates.to_numpy())
+        return returns[returns.index.notna()]
+    
+    def to_points(
+        self,
+        frames: Dict[str, "pd.DataFrame"],
+        fields: Sequence[str],
+        downsample: str,
+        points: Optional[int]
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Convert per-symbol series into lists of points, optionally downsampled
+        
+        Args:
+            frames: Dictionary mapping symbol to a DataFrame indexed by date
+            fields: Columns to include in every point; the first one drives downsampling
+            downsample: Downsampling method, see downsampling.METHODS
+            points: Target number of points per symbol, None to keep all
+            
+        Returns:
+            Dictionary mapping symbol to a list of {"date", field...} dictionaries
+        """
+        result = {}
+        for symbol, frame in frames.items():
+            frame = frame[list(fields)].dropna()
+            if frame.empty:
+                result[symbol] = []
+                continue
+            
+            # Days since the epoch, so LTTB accounts for weekends and holidays
+            x = frame.index.asi8 / 86_400_000_000_000
+            keep = downsample_indices(x, frame[fields[0]].to_numpy(), downsample, points)
+            
+            dates = frame.index[keep].strftime('%Y-%m-%d').tolist()
+            columns = [np.round(frame[field].to_numpy()[keep], 6).tolist() for field in fields]
+            result[symbol] = [
+                {"date": day, **dict(zip(fields, values))}
+                for day, *values in zip(dates, *columns)
+            ]
+        return result
+    
+    def validate_price_data(self, price_data: Dict[str, DailySeries]) -> None:
         """
         Validate the price data before processing
         
         Args:
-            price_data: Dictionary mapping symbol to Series of daily close prices
+            price_data: Dictionary mapping symbol to its daily close prices
             
         Raises:
             ValueError: If price data is invalid
@@ -68,8 +330,8 @@ class StockDataProcessor:
             if prices.empty:
                 raise ValueError(f"No price data available for {symbol}")
             
-            if prices.isnull().any():
+            if np.isnan(prices.values).any():
                 logger.warning(f"Missing values detected in {symbol} data")
             
-            if (prices <= 0).any():
-                raise ValueError(f"Invalid price values (non-positive) found in {symbol} data") 
\ No newline at end of file
+            if (prices.values <= 0).any():
+                raise ValueError(f"Invalid price values (non-positive) found in {symbol} data")
@@ -0,0 +1,117 @@
+from typing import Optional
+import numpy as np
+
+# Downsampling methods accepted by the aggregate endpoints
+NO_DOWNSAMPLING = "none"
+LTTB = "lttb"
+MIN_MAX = "minmax"
+
+METHODS = (NO_DOWNSAMPLING, LTTB, MIN_MAX)
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, target: int) -> np.ndarray:
+    """
+    Select points with the Largest-Triangle-Three-Buckets algorithm
+
+    The first and last points are always kept. The points in between are split
+    into target - 2 buckets, and from each bucket the point forming the largest
+    triangle with the previously selected point and the average of the next
+    bucket is kept, which preserves the visual shape of a line chart.
+
+    Args:
+        x: Monotonic x coordinates
+        y: Values, without NaN
+        target: Number of points to keep (at least 3)
+
+    Returns:
+        Sorted positions of the selected points
+    """
+    n = len(y)
+    if target >= n or target < 3:
+        return np.arange(n)
+
+    # Bucket boundaries over positions 1 .. n-2, plus sentinel buckets for the end points
+    edges = np.linspace(1, n - 1, target - 1).astype(np.int64)
+    starts = np.concatenate(([0], edges[:-1], [n - 1]))
+    ends = np.concatenate(([1], edges[1:], [n]))
+
+    # Average of every bucket, computed up front for all of them at once
+    x_sums = np.add.reduceat(x, starts)
+    y_sums = np.add.reduceat(y, starts)
+    counts = ends - starts
+    x_means = x_sums / counts
+    y_means = y_sums / counts
+
+    selected = np.empty(target, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    previous = 0
+    for bucket in range(1, target - 1):
+        lo, hi = starts[bucket], ends[bucket]
+        ax, ay = x[previous], y[previous]
+        cx, cy = x_means[bucket + 1], y_means[bucket + 1]
+        # Twice the triangle areas for every candidate in the bucket
+        areas = np.abs((ax - cx) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (cy - ay))
+        previous = lo + int(np.argmax(areas))
+        selected[bucket] = previous
+    return selected
+
+def min_max_indices(y: np.ndarray, target: int) -> np.ndarray:
+    """
+    Select the minimum and maximum of equally sized buckets
+
+    Keeps every extreme, so spikes survive downsampling, at the cost of a
+    less faithful line shape than LTTB.
+
+    Args:
+        y: Values, without NaN
+        target: Number of points to keep (at least 2)
+
+    Returns:
+        Sorted positions of the selected points, including the first and last.
+        At most target of them, except that a target below 4 still keeps the
+        first, last, minimum and maximum
+    """
+    n = len(y)
+    if target >= n or target < 2:
+        return np.arange(n)
+
+    bucket_count = max(1, (target - 2) // 2)
+    starts = np.linspace(0, n, bucket_count + 1).astype(np.int64)[:-1]
+    minima = np.minimum.reduceat(y, starts)
+    maxima = np.maximum.reduceat(y, starts)
+
+    # Map each bucket's extreme values back to their first position in the bucket
+    bucket_of = np.repeat(np.arange(bucket_count), np.diff(np.append(starts, n)))
+    positions = np.arange(n)
+    is_min = y == minima[bucket_of]
+    is_max = y == maxima[bucket_of]
+    first_min = np.full(bucket_count, n, dtype=np.int64)
+    first_max = np.full(bucket_count, n, dtype=np.int64)
+    np.minimum.at(first_min, bucket_of[is_min], positions[is_min])
+    np.minimum.at(first_max, bucket_of[is_max], positions[is_max])
+
+    return np.unique(np.concatenate(([0, n - 1], first_min, first_max)))
+
+def downsample_indices(x: np.ndarray, y: np.ndarray, method: str, target: Optional[int]) -> np.ndarray:
+    """
+    Select the positions of the points to keep
+
+    Args:
+        x: Monotonic x coordinates
+        y: Values, without NaN
+        method: One of METHODS
+        target: Number of points to keep, None to keep all
+
+    Returns:
+        Sorted positions of the selected points
+
+    Raises:
+        ValueError: If the method is unknown
+    """
+    if method not in METHODS:
+        raise ValueError(f"Invalid downsample method: {method}. Use one of: {', '.join(METHODS)}")
+    if method == NO_DOWNSAMPLING or target is None:
+        return np.arange(len(y))
+    if method == LTTB:
+        return lttb_indices(x, y, target)
+    return min_max_indices(y, target)
@@ -0,0 +1,25 @@
+import logging
+import random
+
+from config import config
+
+_LEVEL = getattr(logging, config.HOT_PATH_LOG_LEVEL)
+_SAMPLE_RATE = config.HOT_PATH_LOG_SAMPLE_RATE
+
+def log_hot_path(logger: logging.Logger, message: str) -> None:
+    """
+    Log a per-symbol message from the request hot path
+
+    These messages are emitted for every symbol of every request, so their
+    level (HOT_PATH_LOG_LEVEL) and the fraction of them that is kept
+    (HOT_PATH_LOG_SAMPLE_RATE) are configurable separately from LOG_LEVEL.
+
+    Args:
+        logger: Logger to emit to
+        message: Message to log
+    """
+    if not logger.isEnabledFor(_LEVEL):
+        return
+    if _SAMPLE_RATE < 1.0 and random.random() >= _SAMPLE_RATE:
+        return
+    logger.log(_LEVEL, message)
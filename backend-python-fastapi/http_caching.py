@@ -0,0 +1,106 @@
+from typing import List, Optional
+from datetime import date
+import hashlib
+
+from config import config
+
+# Browsers and CDNs may keep immutable historical responses for a year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Request headers a response varies with. The body format follows Accept unless
+# it was picked with the format parameter, which is already part of the URL.
+VARY_ENCODING = "Accept-Encoding"
+VARY_FORMAT_AND_ENCODING = "Accept, Accept-Encoding"
+
+def _etag(digest_input: bytes) -> str:
+    return '"' + hashlib.sha256(digest_input).hexdigest()[:32] + '"'
+
+def query_etag(
+    start_date: date,
+    end_date: date,
+    symbols: List[str],
+    response_format: str
+) -> str:
+    """
+    Strong ETag for a query whose data can no longer change
+
+    Historical closes are final, so the query itself identifies the response.
+    The API version is part of the tag so a deploy that changes the output
+    invalidates every tag handed out before it.
+
+    Args:
+        start_date: Start date of the query
+        end_date: End date of the query
+        symbols: Requested symbols, in request order
+        response_format: Negotiated response format
+
+    Returns:
+        Quoted ETag value
+    """
+    key = "|".join([
+        config.API_VERSION,
+        start_date.isoformat(),
+        end_date.isoformat(),
+        ",".join(symbols),
+        response_format
+    ])
+    return _etag(key.encode())
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag derived from the response body itself"""
+    return _etag(body)
+
+def representation_etag(etag: str, encoding: Optional[str]) -> str:
+    """
+    ETag of a content-encoded representation of a response
+
+    Strong ETags must differ between representations, so the gzip and brotli
+    bodies of a response are tagged apart from the unencoded one.
+
+    Args:
+        etag: ETag of the unencoded response
+        encoding: Content coding of the body, None if unencoded
+
+    Returns:
+        Quoted ETag value
+    """
+    if encoding is None:
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Check an If-None-Match header against an ETag
+
+    Uses the weak comparison RFC 9110 prescribes for If-None-Match.
+
+    Args:
+        if_none_match: Value of the If-None-Match header, if any
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's cached representation is still current
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    return any(opaque(candidate) == opaque(etag) for candidate in if_none_match.split(","))
+
+def live_cache_control(seconds_until_expiry: float) -> str:
+    """
+    Cache-Control value for a response that includes a session still in progress
+
+    Args:
+        seconds_until_expiry: Seconds until the server-side data expires
+
+    Returns:
+        Cache-Control header value
+    """
+    max_age = max(0, min(int(seconds_until_expiry), config.LIVE_CACHE_MAX_AGE_SECONDS))
+    return f"public, max-age={max_age}, must-revalidate"
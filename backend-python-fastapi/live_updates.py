@@ -0,0 +1,232 @@
+from typing import Dict, Iterable, List, Optional, Set
+import asyncio
+import logging
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from config import config
+from data_fetcher import StockDataFetcher
+from data_processor import StockDataProcessor
+from price_series import DailySeries, format_days
+from response_formats import encode_message
+import market_calendar
+
+logger = logging.getLogger(__name__)
+
+class LiveSubscriber:
+    """One connected client: the symbols it follows and a bounded queue of encoded messages
+
+    A None in the queue tells the connection to close, which happens when the
+    client falls so far behind that its queue overflowed.
+    """
+
+    def __init__(self, queue_size: int):
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(queue_size)
+        self.symbols: Set[str] = set()
+
+    def send(self, message: str) -> bool:
+        """Queue a message without waiting, returning False if the queue is full"""
+        try:
+            self.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    def close(self) -> None:
+        """Drop queued messages and tell the connection to close"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+class SymbolPoller:
+    """Latest returns of one symbol and the subscribers following it"""
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.subscribers: Set[LiveSubscriber] = set()
+        # Day number -> rounded return of every point in the current window
+        self.points: Dict[int, float] = {}
+        self.snapshot: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+
+class LiveUpdateHub:
+    """Pushes new and changed return points to WebSocket subscribers
+
+    Every symbol with at least one subscriber has exactly one polling task per
+    worker process, however many clients follow it. A poll fetches the last
+    LIVE_WINDOW_DAYS of closes straight from the provider, computes their
+    returns and compares them with the previous poll. Only points that are new
+    or whose value changed are published, encoded once and put on the queue of
+    every subscriber, so fan-out costs one queue insertion per client.
+
+    Pollers start with the first subscriber of a symbol and stop with the last.
+    New subscribers get the symbol's current window as a snapshot. Pollers take
+    tokens from the same upstream rate limiter as requests, so at most
+    max_pollers symbols are followed per worker and subscriptions that would
+    start more are rejected.
+    """
+
+    def __init__(
+        self,
+        fetcher: StockDataFetcher,
+        processor: StockDataProcessor,
+        max_pollers: Optional[int] = None
+    ):
+        self.fetcher = fetcher
+        self.processor = processor
+        self.max_pollers = max_pollers if max_pollers is not None else config.LIVE_MAX_POLLERS
+        self._pollers: Dict[str, SymbolPoller] = {}
+        self._subscribers: Set[LiveSubscriber] = set()
+        self._polls = 0
+        self._poll_errors = 0
+        self._published = 0
+        self._overflows = 0
+        self._rejected = 0
+
+    def connect(self) -> LiveSubscriber:
+        """Register a new client"""
+        subscriber = LiveSubscriber(config.LIVE_QUEUE_SIZE)
+        self._subscribers.add(subscriber)
+        return subscriber
+
+    def disconnect(self, subscriber: LiveSubscriber) -> None:
+        """Unregister a client and stop pollers nobody follows any more"""
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+        self._subscribers.discard(subscriber)
+
+    def subscribe(self, subscriber: LiveSubscriber, symbols: Iterable[str]) -> None:
+        """
+        Follow symbols, starting their pollers if needed
+
+        Symbols that already have data are answered with a snapshot right away;
+        the others get theirs with the first poll.
+        
+        Raises:
+            ValueError: If following the symbols would start more than max_pollers
+                pollers; nothing is subscribed then
+        """
+        symbols = list(dict.fromkeys(symbols))
+        new_pollers = sum(1 for symbol in symbols if symbol not in self._pollers)
+        if len(self._pollers) + new_pollers > self.max_pollers:
+            self._rejected += 1
+            raise ValueError(
+                f"Live updates are limited to {self.max_pollers} followed symbols per server; "
+                f"{len(self._pollers)} are in use"
+            )
+        for symbol in symbols:
+            if symbol in subscriber.symbols:
+                continue
+            poller = self._pollers.get(symbol)
+            if poller is None:
+                poller = self._pollers[symbol] = SymbolPoller(symbol)
+                poller.task = asyncio.create_task(self._run(poller), name=f"live-{symbol}")
+            poller.subscribers.add(subscriber)
+            subscriber.symbols.add(symbol)
+            if poller.snapshot is not None and not subscriber.send(poller.snapshot):
+                self._overflow(subscriber)
+                return
+
+    def unsubscribe(self, subscriber: LiveSubscriber, symbols: Iterable[str]) -> None:
+        """Stop following symbols, stopping pollers without subscribers"""
+        for symbol in symbols:
+            subscriber.symbols.discard(symbol)
+            poller = self._pollers.get(symbol)
+            if poller is None:
+                continue
+            poller.subscribers.discard(subscriber)
+            if not poller.subscribers:
+                del self._pollers[symbol]
+                if poller.task is not None:
+                    poller.task.cancel()
+
+    async def stop(self) -> None:
+        """Cancel every poller and wait for them to finish"""
+        tasks = [poller.task for poller in self._pollers.values() if poller.task is not None]
+        self._pollers.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the hub counters
+
+        Returns:
+            Dictionary with the number of active pollers and their limit, subscribers,
+            polls, failed polls, published messages, subscribers dropped for falling
+            behind and subscriptions rejected at the poller limit
+        """
+        return {
+            "pollers": len(self._pollers),
+            "max_pollers": self.max_pollers,
+            "subscribers": len(self._subscribers),
+            "polls": self._polls,
+            "poll_errors": self._poll_errors,
+            "published": self._published,
+            "overflows": self._overflows,
+            "rejected": self._rejected
+        }
+
+    async def _run(self, poller: SymbolPoller) -> None:
+        while True:
+            self._polls += 1
+            try:
+                prices = await run_in_threadpool(
+                    self.fetcher.fetch_latest_prices, poller.symbol, config.LIVE_WINDOW_DAYS
+                )
+                self._update(poller, prices)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._poll_errors += 1
+                logger.warning(f"Live poll for {poller.symbol} failed: {str(e)}")
+
+            # Closes only move while a session is open; outside it a slow poll
+            # still picks up late corrections and the next session's first trade
+            await asyncio.sleep(
+                config.LIVE_POLL_SECONDS if market_calendar.is_session_open()
+                else config.LIVE_IDLE_POLL_SECONDS
+            )
+
+    def _update(self, poller: SymbolPoller, prices: DailySeries) -> None:
+        """Publish the points of a poll that differ from the previous one"""
+        if len(prices) < 2:
+            return
+        returns = self.processor.aligned_returns_matrix({poller.symbol: prices}).column(poller.symbol)
+        values = np.round(returns.values, 6).tolist()
+        points = dict(zip(returns.days.tolist(), values))
+
+        changed = [day for day, value in points.items() if poller.points.get(day) != value]
+        if not changed and points.keys() == poller.points.keys():
+            return
+        first_poll = poller.snapshot is None
+        poller.points = points
+        poller.snapshot = self._encode("snapshot", poller.symbol, points, list(points))
+        if first_poll:
+            # Subscribers that joined before any data was there still need their snapshot
+            self._publish(poller, poller.snapshot)
+        elif changed:
+            self._publish(poller, self._encode("update", poller.symbol, points, changed))
+
+    @staticmethod
+    def _encode(kind: str, symbol: str, points: Dict[int, float], days: List[int]) -> str:
+        dates = format_days(np.array(days, dtype=np.int64))
+        return encode_message({
+            "type": kind,
+            "symbol": symbol,
+            "returns": [{"date": day, "return": points[number]} for day, number in zip(dates, days)]
+        })
+
+    def _publish(self, poller: SymbolPoller, message: str) -> None:
+        self._published += 1
+        for subscriber in list(poller.subscribers):
+            if not subscriber.send(message):
+                self._overflow(subscriber)
+
+    def _overflow(self, subscriber: LiveSubscriber) -> None:
+        """Drop a subscriber that fell behind; it gets a fresh snapshot when it reconnects"""
+        self._overflows += 1
+        logger.warning(f"Dropping live subscriber with {len(subscriber.symbols)} symbols: queue full")
+        self.unsubscribe(subscriber, list(subscriber.symbols))
+        subscriber.close()
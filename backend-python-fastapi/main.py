@@ -1,20 +1,37 @@
 from typing import Union
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import logging
 
-# Import our custom API endpoints and configuration
-from api_endpoints import router as stock_router
 from config import config
 
-# Configure logging
+# Configure logging once for the whole process, before any module logs at import time
 logging.basicConfig(level=getattr(logging, config.LOG_LEVEL))
+
+# Import our custom API endpoints
+from api_endpoints import router as stock_router, collect_stats, data_fetcher, live_hub, warmup_scheduler
+from metrics import registry, stats_collector
+
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm the price cache in the background; /api/ready reports when it is done
+    await warmup_scheduler.start()
+    # Pick up changes to the symbol universe file
+    await data_fetcher.universe.start()
+    yield
+    await live_hub.stop()
+    await data_fetcher.universe.stop()
+    await warmup_scheduler.stop()
+
 app = FastAPI(
     title=config.API_TITLE,
     description=config.API_DESCRIPTION,
-    version=config.API_VERSION
+    version=config.API_VERSION,
+    lifespan=lifespan
 )
 
 # Enable CORS for the React frontend
@@ -24,6 +41,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
 # Include the stock returns API router
@@ -36,11 +54,28 @@ async def read_root():
         "version": config.API_VERSION,
         "endpoints": {
             "stock_returns": "/api/returns?start=YYYY-MM-DD&end=YYYY-MM-DD",
+            "live_updates": "ws /api/live?symbols=AAPL,MSFT",
+            "symbol_search": "/api/symbols/search?q=AA",
             "health_check": "/api/health",
+            "readiness_check": "/api/ready",
+            "stats": "/api/stats",
+            "metrics": "/api/metrics",
             "info": "/api/info"
         }
     }
 
+# Expose the /api/stats counters (coalescing, caches) alongside the histograms
+registry.add_collector(stats_collector(
+    "stock_api_component_stats",
+    "Runtime counters and usage of internal components, as served by /api/stats",
+    collect_stats
+))
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """Prometheus metrics endpoint"""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/api/info")
 async def get_info():
     return {"message": config.INFO_MESSAGE}
@@ -48,4 +83,8 @@ async def get_info():
 if __name__ == "__main__":
     import uvicorn
     logger.info("Starting MAG7 Stock Returns API server...")
-    uvicorn.run(app, host=config.HOST, port=config.PORT) 
\ No newline at end of file
+    if config.WORKERS > 1:
+        # Worker processes import the app themselves, so it is passed as an import string
+        uvicorn.run("main:app", host=config.HOST, port=config.PORT, workers=config.WORKERS)
+    else:
+        uvicorn.run(app, host=config.HOST, port=config.PORT)
\ No newline at end of file
@@ -0,0 +1,126 @@
+from typing import Optional
+from datetime import date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+# US equity market session boundaries
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+MARKET_OPEN_TIME = time(9, 30)
+MARKET_CLOSE_TIME = time(16, 0)
+
+def _now() -> datetime:
+    return datetime.now(MARKET_TIMEZONE)
+
+def is_trading_day(day: date) -> bool:
+    """
+    Check whether a date is a trading day
+
+    Only weekends are treated as non-trading days. Exchange holidays are not
+    modelled, which at worst makes a cached entry expire one session early.
+
+    Args:
+        day: Date to check
+
+    Returns:
+        True if the market has a session on that date
+    """
+    return day.weekday() < 5
+
+def sessions_between(start_date: date, end_date: date) -> int:
+    """
+    Count the trading days in a date range
+
+    Args:
+        start_date: Start date (inclusive)
+        end_date: End date (exclusive)
+
+    Returns:
+        Number of trading days in [start_date, end_date)
+    """
+    days = (end_date - start_date).days
+    if days <= 0:
+        return 0
+    weeks, remainder = divmod(days, 7)
+    tail_start = start_date + timedelta(days=weeks * 7)
+    return weeks * 5 + sum(is_trading_day(tail_start + timedelta(days=i)) for i in range(remainder))
+
+def session_close(day: date) -> datetime:
+    """Market close time of the session on a date"""
+    return datetime.combine(day, MARKET_CLOSE_TIME, tzinfo=MARKET_TIMEZONE)
+
+def is_session_open(now: Optional[datetime] = None) -> bool:
+    """
+    Check whether a session is in progress, i.e. closes can still move
+
+    Args:
+        now: Reference time, defaults to the current time
+
+    Returns:
+        True between the open and the close of a trading day
+    """
+    now = (now or _now()).astimezone(MARKET_TIMEZONE)
+    return is_trading_day(now.date()) and MARKET_OPEN_TIME <= now.time() < MARKET_CLOSE_TIME
+
+def last_closed_session(now: Optional[datetime] = None) -> date:
+    """
+    Get the date of the most recent session whose close has already happened
+
+    Args:
+        now: Reference time, defaults to the current time
+
+    Returns:
+        Date of the last closed trading session
+    """
+    now = (now or _now()).astimezone(MARKET_TIMEZONE)
+    day = now.date()
+    if not is_trading_day(day) or now < session_close(day):
+        day -= timedelta(days=1)
+    while not is_trading_day(day):
+        day -= timedelta(days=1)
+    return day
+
+def next_session_close(now: Optional[datetime] = None) -> datetime:
+    """
+    Get the next session close strictly after a reference time
+
+    Args:
+        now: Reference time, defaults to the current time
+
+    Returns:
+        Timezone-aware datetime of the next market close
+    """
+    now = (now or _now()).astimezone(MARKET_TIMEZONE)
+    day = now.date()
+    if now >= session_close(day):
+        day += timedelta(days=1)
+    while not is_trading_day(day):
+        day += timedelta(days=1)
+    return session_close(day)
+
+def is_final(last_day: date, now: Optional[datetime] = None) -> bool:
+    """
+    Check whether daily closes up to and including a date can no longer change
+
+    Args:
+        last_day: Last date of a range (inclusive)
+        now: Reference time, defaults to the current time
+
+    Returns:
+        True if every session up to last_day has already closed
+    """
+    return last_day <= last_closed_session(now)
+
+def expiry_for(last_day: date, now: Optional[datetime] = None) -> Optional[float]:
+    """
+    Get the cache expiry for data covering sessions up to a date
+
+    Args:
+        last_day: Last date of a range (inclusive)
+        now: Reference time, defaults to the current time
+
+    Returns:
+        None if the data is final and never expires, otherwise the Unix
+        timestamp of the next session close
+    """
+    if is_final(last_day, now):
+        return None
+    return next_session_close(now).timestamp()
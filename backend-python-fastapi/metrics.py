@@ -0,0 +1,214 @@
+from typing import Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+from contextlib import contextmanager
+import bisect
+import threading
+import time
+
+# A sample is (labels, value) or (labels, value, name suffix) for histogram series;
+# a metric family is (name, type, help, samples)
+Sample = Tuple
+MetricFamily = Tuple[str, str, str, List[Sample]]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = []
+    for key, value in labels.items():
+        escaped = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        pairs.append(f'{key}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+class Counter:
+    """Monotonically increasing counter, optionally split by labels"""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        """Increase the counter for the given label values"""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def collect(self) -> MetricFamily:
+        with self._lock:
+            samples = [
+                (dict(zip(self.label_names, key)), value)
+                for key, value in self._values.items()
+            ]
+        if not samples and not self.label_names:
+            samples = [({}, 0.0)]
+        return self.name, "counter", self.documentation, samples
+
+class Histogram:
+    """Cumulative histogram of observed values, optionally split by labels"""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Record one observation for the given label values"""
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Observe the wall-clock duration of a block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def collect(self) -> MetricFamily:
+        samples = []
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._values.items()]
+        for key, counts, total in items:
+            labels = dict(zip(self.label_names, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                samples.append(({**labels, "le": _format_value(bound)}, cumulative, "_bucket"))
+            samples.append((labels, total, "_sum"))
+            samples.append((labels, cumulative, "_count"))
+        return self.name, "histogram", self.documentation, samples
+
+class MetricsRegistry:
+    """Holds metrics and renders them in the Prometheus text exposition format"""
+
+    def __init__(self):
+        self._metrics: List = []
+        self._collectors: List[Callable[[], Iterable[MetricFamily]]] = []
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        """Create and register a counter"""
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """Create and register a histogram"""
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[MetricFamily]]) -> None:
+        """Register a callback producing metric families at scrape time"""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """
+        Render all metrics
+
+        Returns:
+            Metrics in the Prometheus text exposition format
+        """
+        families = [metric.collect() for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, metric_type, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample in samples:
+                labels, value = sample[0], sample[1]
+                suffix = sample[2] if len(sample) > 2 else ""
+                lines.append(f"{name}{suffix}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry and the metrics instrumented across the service
+registry = MetricsRegistry()
+
+REQUEST_STAGE_SECONDS = registry.histogram(
+    "stock_api_request_stage_seconds",
+    "Time spent in each stage of a returns request",
+    ["stage"]
+)
+UPSTREAM_FETCH_SECONDS = registry.histogram(
+    "stock_api_upstream_fetch_seconds",
+    "Time spent in a single upstream price history call"
+)
+UPSTREAM_ERRORS = registry.counter(
+    "stock_api_upstream_errors_total",
+    "Upstream price history calls that raised an error"
+)
+UPSTREAM_RETRIES = registry.counter(
+    "stock_api_upstream_retries_total",
+    "Upstream price history calls that were retried"
+)
+UPSTREAM_REJECTED = registry.counter(
+    "stock_api_upstream_rejected_total",
+    "Upstream calls not made or abandoned by the resilience layer",
+    ["reason"]
+)
+STALE_PRICES_SERVED = registry.counter(
+    "stock_api_stale_prices_served_total",
+    "Symbols answered from expired or incomplete cached prices because upstream was unavailable"
+)
+ADMISSION_DECISIONS = registry.counter(
+    "stock_api_admission_decisions_total",
+    "Admission control outcomes of returns requests",
+    ["outcome"]
+)
+
+def stats_collector(
+    name: str,
+    documentation: str,
+    get_stats: Callable[[], Dict[str, Dict[str, Dict[str, float]]]]
+) -> Callable[[], Iterable[MetricFamily]]:
+    """
+    Build a collector exposing nested stats dictionaries as a gauge
+
+    Args:
+        name: Metric name
+        documentation: Metric help text
+        get_stats: Callable returning {component: {name: {field: value}}}, the
+            shape served by /api/stats
+
+    Returns:
+        Collector callable for MetricsRegistry.add_collector
+    """
+    def collect() -> Iterable[MetricFamily]:
+        samples = []
+        for group, entries in get_stats().items():
+            for entry_name, fields in entries.items():
+                for field, value in fields.items():
+                    labels = {"component": group, "name": entry_name, "field": field}
+                    samples.append((labels, value))
+        return [(name, "gauge", documentation, samples)]
+    return collect
@@ -0,0 +1,142 @@
+from typing import TYPE_CHECKING, Dict, List, Tuple
+import numpy as np
+import logging
+
+from data_processor import StockDataProcessor
+from price_series import DailySeries, days_to_index
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Statistics served by the matrix endpoint
+CORRELATION = "correlation"
+COVARIANCE = "covariance"
+MATRIX_STATISTICS = (CORRELATION, COVARIANCE)
+
+class PortfolioAnalyzer:
+    """Pairwise statistics across symbols, computed on one date-aligned return matrix
+
+    Returns are laid out as a (dates x symbols) NumPy matrix with NaN where a
+    symbol did not trade. Every pairwise statistic uses the dates on which both
+    symbols traded (pairwise-complete observations, like DataFrame.corr), and
+    all pairs are computed together with a handful of matrix products instead
+    of one pass per pair.
+    """
+
+    def __init__(self, processor: StockDataProcessor):
+        self.processor = processor
+
+    def return_matrix(self, price_data: Dict[str, DailySeries]) -> Tuple["pd.DatetimeIndex", List[str], np.ndarray]:
+        """
+        Build the date-aligned matrix of daily returns
+
+        Args:
+            price_data: Dictionary mapping symbol to its daily close prices
+
+        Returns:
+            Shared date axis, symbols in column order and the (dates x symbols) matrix
+
+        Raises:
+            ValueError: If no symbol has enough data
+        """
+        returns = self.processor.aligned_returns_matrix(price_data)
+        if returns.empty:
+            raise ValueError("Not enough price data to calculate returns")
+        return days_to_index(returns.days), returns.symbols, returns.values
+
+    @staticmethod
+    def _pairwise_moments(matrix: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pairwise-complete covariance and per-pair variances
+
+        Returns:
+            covariance[i, j], variance[i, j] (variance of symbol i over the dates
+            shared with j) and the observation counts n[i, j]
+        """
+        valid = (~np.isnan(matrix)).astype(np.float64)
+        values = np.nan_to_num(matrix)
+
+        # Zeroed NaNs drop out of every product, so each sum only covers shared dates
+        counts = valid.T @ valid
+        sums = values.T @ valid
+        squares = (values * values).T @ valid
+        products = values.T @ values
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            degrees = np.where(counts > 1, counts - 1, np.nan)
+            covariance = (products - sums * sums.T / counts) / degrees
+            variance = (squares - sums * sums / counts) / degrees
+        return covariance, variance, counts
+
+    def covariance_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """Pairwise covariance of daily returns (NaN for pairs with fewer than two shared dates)"""
+        covariance, _, _ = self._pairwise_moments(matrix)
+        return covariance
+
+    def correlation_matrix(self, matrix: np.ndarray) -> np.ndarray:
+        """Pairwise Pearson correlation of daily returns (NaN for pairs with fewer than two shared dates)"""
+        covariance, variance, _ = self._pairwise_moments(matrix)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.clip(covariance / np.sqrt(variance * variance.T), -1.0, 1.0)
+
+    def beta(self, matrix: np.ndarray, benchmark_column: int) -> Dict[str, np.ndarray]:
+        """
+        Beta and correlation of every symbol against a benchmark column
+
+        Args:
+            matrix: Date-aligned return matrix
+            benchmark_column: Column of the benchmark symbol
+
+        Returns:
+            Dictionary with "beta", "correlation" and "observations" arrays, one value per column
+        """
+        covariance, variance, counts = self._pairwise_moments(matrix)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # Benchmark variance over the dates it shares with each symbol
+            benchmark_variance = variance[benchmark_column, :]
+            beta = covariance[:, benchmark_column] / benchmark_variance
+            correlation = covariance[:, benchmark_column] / np.sqrt(variance[:, benchmark_column] * benchmark_variance)
+        return {
+            "beta": beta,
+            "correlation": np.clip(correlation, -1.0, 1.0),
+            "observations": counts[:, benchmark_column]
+        }
+
+    def rolling_correlation(self, matrix: np.ndarray, benchmark_column: int, window: int) -> np.ndarray:
+        """
+        Rolling correlation of every column against a benchmark column
+
+        Windows span `window` rows of the shared date axis and are only filled
+        when both symbols traded on every date in them.
+
+        Args:
+            matrix: Date-aligned return matrix
+            benchmark_column: Column of the benchmark symbol
+            window: Window length in trading days
+
+        Returns:
+            (dates x symbols) matrix of correlations, NaN where the window is incomplete
+        """
+        benchmark = matrix[:, [benchmark_column]]
+        valid = ~np.isnan(matrix) & ~np.isnan(benchmark)
+        x = np.where(valid, matrix, 0.0)
+        y = np.where(valid, benchmark, 0.0)
+
+        def window_sums(values: np.ndarray) -> np.ndarray:
+            # Cumulative sums turn every window sum into one subtraction for all columns at once
+            cumulative = np.cumsum(np.vstack([np.zeros((1, values.shape[1])), values]), axis=0)
+            sums = np.full(values.shape, np.nan)
+            sums[window - 1:] = cumulative[window:] - cumulative[:-window]
+            return sums
+
+        n = window_sums(valid.astype(np.float64))
+        sx, sy = window_sums(x), window_sums(y)
+        sxx, syy, sxy = window_sums(x * x), window_sums(y * y), window_sums(x * y)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            covariance = sxy - sx * sy / n
+            correlation = covariance / np.sqrt((sxx - sx * sx / n) * (syy - sy * sy / n))
+        correlation[n < window] = np.nan
+        return np.clip(correlation, -1.0, 1.0)
@@ -0,0 +1,182 @@
+from typing import TYPE_CHECKING, Dict, Optional
+from abc import ABC, abstractmethod
+from datetime import date, timedelta
+import os
+import threading
+import time
+import zlib
+import logging
+
+import numpy as np
+
+from config import config
+
+# pandas and yfinance take a large share of process startup, so they are
+# imported on the first fetch rather than when the app is loaded
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+class PriceProvider(ABC):
+    """Source of daily close prices used by StockDataFetcher"""
+
+    name: str = "provider"
+
+    @abstractmethod
+    def fetch_close_prices(self, symbol: str, start_date: date, end_date: date) -> "pd.Series":
+        """
+        Fetch daily close prices for a single symbol
+
+        Args:
+            symbol: Stock symbol to fetch
+            start_date: Start date (inclusive)
+            end_date: End date (exclusive)
+
+        Returns:
+            Series of daily close prices indexed by date (may be empty or contain NaN)
+        """
+
+class YFinanceProvider(PriceProvider):
+    """Fetches daily close prices from Yahoo Finance through yfinance"""
+
+    name = "yfinance"
+
+    def fetch_close_prices(self, symbol: str, start_date: date, end_date: date) -> "pd.Series":
+        import pandas as pd
+        import yfinance as yf
+
+        ticker = yf.Ticker(symbol)
+        data = ticker.history(
+            start=start_date.strftime('%Y-%m-%d'),
+            end=end_date.strftime('%Y-%m-%d')
+        )
+        if data.empty:
+            return pd.Series(dtype='float64', name='Close')
+        return data['Close']
+
+class SyntheticPriceProvider(PriceProvider):
+    """Deterministic random-walk prices for offline benchmarks and development
+
+    Every symbol gets its own geometric random walk over business days, seeded
+    from the symbol name and anchored at a fixed epoch, so any two requests for
+    overlapping ranges see exactly the same prices. An optional per-call latency
+    simulates the upstream round-trip.
+    """
+
+    name = "synthetic"
+
+    EPOCH = date(1990, 1, 1)
+
+    def __init__(self, latency_seconds: float = 0.0):
+        self.latency_seconds = latency_seconds
+        self._lock = threading.Lock()
+        self._paths: Dict[str, "pd.Series"] = {}
+
+    def _path(self, symbol: str, end_date: date) -> "pd.Series":
+        import pandas as pd
+
+        with self._lock:
+            path = self._paths.get(symbol)
+            if path is not None and path.index[-1].date() >= end_date:
+                return path
+
+            # Regenerating from the epoch with the same seed extends the path
+            # without changing any of the prices already handed out
+            horizon = max(end_date, date.today()) + timedelta(days=366)
+            dates = pd.bdate_range(self.EPOCH, horizon)
+            rng = np.random.default_rng(zlib.crc32(symbol.encode()))
+            log_returns = rng.normal(0.0003, 0.018, len(dates))
+            start_price = 20.0 + (zlib.crc32(symbol.encode()) % 200)
+            path = pd.Series(start_price * np.exp(np.cumsum(log_returns)), index=dates, name='Close')
+            self._paths[symbol] = path
+            return path
+
+    def fetch_close_prices(self, symbol: str, start_date: date, end_date: date) -> "pd.Series":
+        import pandas as pd
+
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+
+        path = self._path(symbol, end_date)
+        return path[(path.index >= pd.Timestamp(start_date)) & (path.index < pd.Timestamp(end_date))]
+
+class RecordedPriceProvider(PriceProvider):
+    """Replays close prices recorded as CSV fixtures
+
+    Each symbol is read from ``<fixtures_dir>/<SYMBOL>.csv`` with ``Date`` and
+    ``Close`` columns. Symbols without a fixture have no data.
+    """
+
+    name = "recorded"
+
+    def __init__(self, fixtures_dir: str):
+        self.fixtures_dir = fixtures_dir
+        self._lock = threading.Lock()
+        self._series: Dict[str, "pd.Series"] = {}
+
+    def _fixture_path(self, symbol: str) -> str:
+        return os.path.join(self.fixtures_dir, f"{symbol}.csv")
+
+    def _load(self, symbol: str) -> "pd.Series":
+        import pandas as pd
+
+        with self._lock:
+            series = self._series.get(symbol)
+            if series is None:
+                path = self._fixture_path(symbol)
+                if os.path.exists(path):
+                    frame = pd.read_csv(path, parse_dates=['Date'], index_col='Date')
+                    series = frame['Close'].sort_index()
+                else:
+                    logger.warning(f"No recorded fixture for {symbol} in {self.fixtures_dir}")
+                    series = pd.Series(dtype='float64', name='Close', index=pd.DatetimeIndex([]))
+                self._series[symbol] = series
+            return series
+
+    def fetch_close_prices(self, symbol: str, start_date: date, end_date: date) -> "pd.Series":
+        import pandas as pd
+
+        series = self._load(symbol)
+        return series[(series.index >= pd.Timestamp(start_date)) & (series.index < pd.Timestamp(end_date))]
+
+    def record(self, symbol: str, prices: "pd.Series") -> None:
+        """
+        Write close prices to the fixture file of a symbol
+
+        Args:
+            symbol: Stock symbol
+            prices: Series of daily close prices indexed by date
+        """
+        import pandas as pd
+
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        frame = pd.DataFrame({
+            'Date': prices.index.strftime('%Y-%m-%d'),
+            'Close': prices.to_numpy()
+        })
+        frame.to_csv(self._fixture_path(symbol), index=False)
+        with self._lock:
+            self._series.pop(symbol, None)
+
+def create_price_provider(name: Optional[str] = None) -> PriceProvider:
+    """
+    Create the price provider selected in the configuration
+
+    Args:
+        name: Provider name, defaults to config.PRICE_PROVIDER
+
+    Returns:
+        Configured price provider
+
+    Raises:
+        ValueError: If the provider name is unknown
+    """
+    name = (name or config.PRICE_PROVIDER).lower()
+    if name == YFinanceProvider.name:
+        return YFinanceProvider()
+    if name == SyntheticPriceProvider.name:
+        return SyntheticPriceProvider(latency_seconds=config.SYNTHETIC_LATENCY_MS / 1000)
+    if name == RecordedPriceProvider.name:
+        return RecordedPriceProvider(config.PRICE_FIXTURES_DIR)
+    raise ValueError(f"Unknown price provider: {name}")
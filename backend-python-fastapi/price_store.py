@@ -0,0 +1,218 @@
+from typing import Iterator, List, Tuple
+from contextlib import contextmanager
+import numpy as np
+from datetime import date
+import os
+import sqlite3
+import threading
+import logging
+
+from price_series import DailySeries, format_days
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where workers fall back to per-process locking
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DateRange = Tuple[date, date]
+
+class PriceStore:
+    """Persistent SQLite store of daily close prices keyed by (symbol, date)
+
+    Besides the prices themselves, the store records which date ranges have
+    already been fetched for each symbol, so callers only need to go upstream
+    for the edges that are still missing. All ranges are half-open
+    ``[start, end)``, matching the ``start``/``end`` semantics of yfinance.
+
+    The database file can be shared by several worker processes: it runs in
+    WAL mode, and symbol_lock() serialises gap fills for a symbol across
+    processes so only one of them goes upstream for a given gap.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._locks_dir = f"{path}.locks"
+        os.makedirs(self._locks_dir, exist_ok=True)
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            # WAL lets readers in other worker processes proceed while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS prices (
+                    symbol TEXT NOT NULL,
+                    date TEXT NOT NULL,
+                    close REAL NOT NULL,
+                    PRIMARY KEY (symbol, date)
+                ) WITHOUT ROWID
+                """
+            )
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS coverage (
+                    symbol TEXT NOT NULL,
+                    start TEXT NOT NULL,
+                    end TEXT NOT NULL,
+                    PRIMARY KEY (symbol, start)
+                ) WITHOUT ROWID
+                """
+            )
+
+    @contextmanager
+    def symbol_lock(self, symbol: str) -> Iterator[None]:
+        """
+        Hold an exclusive cross-process lock for filling a symbol's gaps
+
+        Args:
+            symbol: Stock symbol about to be fetched
+        """
+        if fcntl is None:
+            yield
+            return
+
+        with open(os.path.join(self._locks_dir, f"{symbol}.lock"), "a") as lock_file:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _covered_ranges(self, symbol: str) -> List[DateRange]:
+        rows = self._conn.execute(
+            "SELECT start, end FROM coverage WHERE symbol = ? ORDER BY start",
+            (symbol,)
+        ).fetchall()
+        return [(date.fromisoformat(s), date.fromisoformat(e)) for s, e in rows]
+
+    def missing_ranges(self, symbol: str, start_date: date, end_date: date) -> List[DateRange]:
+        """
+        Get the parts of a date range that are not yet covered by the store
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start of the range (inclusive)
+            end_date: End of the range (exclusive)
+
+        Returns:
+            Sorted list of ``(start, end)`` gaps that have to be fetched upstream
+        """
+        with self._lock:
+            covered = self._covered_ranges(symbol)
+
+        gaps = []
+        cursor = start_date
+        for covered_start, covered_end in covered:
+            if covered_end <= cursor:
+                continue
+            if covered_start >= end_date:
+                break
+            if covered_start > cursor:
+                gaps.append((cursor, covered_start))
+            cursor = max(cursor, covered_end)
+            if cursor >= end_date:
+                break
+
+        if cursor < end_date:
+            gaps.append((cursor, end_date))
+        return gaps
+
+    def save(
+        self,
+        symbol: str,
+        prices: DailySeries,
+        start_date: date,
+        end_date: date
+    ) -> None:
+        """
+        Store close prices and mark the range they were fetched for as covered
+
+        Args:
+            symbol: Stock symbol
+            prices: Daily close prices
+            start_date: Start of the fetched range (inclusive)
+            end_date: End of the fetched range (exclusive)
+        """
+        rows = [
+            (symbol, day, close)
+            for day, close in zip(format_days(prices.days), prices.values.tolist())
+        ]
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO prices (symbol, date, close) VALUES (?, ?, ?)",
+                rows
+            )
+            if start_date < end_date:
+                self._mark_covered(symbol, start_date, end_date)
+
+        logger.debug(f"Stored {len(rows)} prices for {symbol} covering {start_date} to {end_date}")
+
+    def _mark_covered(self, symbol: str, start_date: date, end_date: date) -> None:
+        # Merge the new range with every overlapping or adjacent one so the
+        # coverage table stays a small set of disjoint ranges per symbol
+        merged_start, merged_end = start_date, end_date
+        kept = []
+        for covered_start, covered_end in self._covered_ranges(symbol):
+            if covered_end < merged_start or covered_start > merged_end:
+                kept.append((covered_start, covered_end))
+            else:
+                merged_start = min(merged_start, covered_start)
+                merged_end = max(merged_end, covered_end)
+        kept.append((merged_start, merged_end))
+
+        self._conn.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
+        self._conn.executemany(
+            "INSERT INTO coverage (symbol, start, end) VALUES (?, ?, ?)",
+            [(symbol, s.isoformat(), e.isoformat()) for s, e in kept]
+        )
+
+    def invalidate(self, symbol: str) -> None:
+        """
+        Forget every stored price and covered range of a symbol
+
+        Used when the provider's adjustment basis changed, since the stored
+        closes can then no longer be stitched to newly fetched ones.
+
+        Args:
+            symbol: Stock symbol
+        """
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM prices WHERE symbol = ?", (symbol,))
+            self._conn.execute("DELETE FROM coverage WHERE symbol = ?", (symbol,))
+        logger.info(f"Invalidated stored prices for {symbol}")
+
+    def load(self, symbol: str, start_date: date, end_date: date) -> DailySeries:
+        """
+        Load stored close prices for a symbol
+
+        Args:
+            symbol: Stock symbol
+            start_date: Start of the range (inclusive)
+            end_date: End of the range (exclusive)
+
+        Returns:
+            Daily close prices (may be empty)
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT date, close FROM prices WHERE symbol = ? AND date >= ? AND date < ? ORDER BY date",
+                (symbol, start_date.isoformat(), end_date.isoformat())
+            ).fetchall()
+
+        if not rows:
+            return DailySeries.empty_series()
+        days, closes = zip(*rows)
+        day_numbers = np.array(days, dtype="datetime64[D]").astype(np.int64)
+        return DailySeries(day_numbers, np.array(closes, dtype=np.float64))
+
+    def close(self) -> None:
+        """Close the underlying database connection"""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,230 @@
+from typing import Any, Callable, Dict, Optional, TypeVar
+import random
+import threading
+import time
+import logging
+
+from metrics import UPSTREAM_RETRIES, UPSTREAM_REJECTED
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class UpstreamUnavailable(Exception):
+    """Raised when the upstream provider cannot be called or keeps failing"""
+
+class CircuitOpenError(UpstreamUnavailable):
+    """Raised instead of calling the provider while the circuit breaker is open"""
+
+class UpstreamDeadlineExceeded(UpstreamUnavailable):
+    """Raised when the request's upstream deadline passes before a call could succeed"""
+
+class TokenBucket:
+    """Thread-safe token bucket limiting the rate of upstream calls
+
+    Tokens refill continuously at `rate` per second up to `burst`. Each call
+    takes one token, waiting for it if the bucket is empty. The clock and sleep
+    function can be replaced, e.g. by a fake clock in tests.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.rate = rate
+        self.burst = burst
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, deadline: Optional[float] = None) -> bool:
+        """
+        Take one token, waiting until one is available
+
+        Args:
+            deadline: Optional clock value (time.monotonic() by default) after which to give up
+
+        Returns:
+            True if a token was taken, False if the deadline would pass first
+        """
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if deadline is not None and now + wait > deadline:
+                return False
+            self._sleep(wait)
+
+    def available(self) -> float:
+        """Number of tokens currently in the bucket"""
+        with self._lock:
+            self._refill(self._clock())
+            return self._tokens
+
+class CircuitBreaker:
+    """Stops calling a failing upstream until it has had time to recover
+
+    After `failure_threshold` consecutive failures the circuit opens and calls
+    are rejected for `reset_seconds`. Then it is half-open: a single trial call
+    is let through, which closes the circuit on success or opens it again on
+    failure. The clock can be replaced, e.g. by a fake clock in tests.
+    """
+
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+    def __init__(self, failure_threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._times_opened = 0
+
+    def allow(self) -> bool:
+        """Whether a call may go upstream now"""
+        with self._lock:
+            if self._state == self.OPEN:
+                if self._clock() - self._opened_at < self.reset_seconds:
+                    return False
+                self._state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def release(self) -> None:
+        """Give back a call allowed by allow() that was not made after all"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("Upstream recovered, closing circuit")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"Opening upstream circuit after {self._failures} consecutive failures")
+                    self._times_opened += 1
+                self._state = self.OPEN
+                self._opened_at = self._clock()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the breaker state
+
+        Returns:
+            Dictionary with the state (0 closed, 1 half-open, 2 open), the number of
+            consecutive failures and how often the circuit has opened
+        """
+        with self._lock:
+            return {
+                "state": self._state,
+                "consecutive_failures": self._failures,
+                "times_opened": self._times_opened
+            }
+
+class UpstreamGuard:
+    """Rate limiting, retries and circuit breaking around calls to the price provider
+
+    Every attempt takes a token from the rate limiter and is let through by the
+    circuit breaker. Failed attempts are retried with full-jitter exponential
+    backoff as long as the caller's deadline allows it.
+    """
+
+    def __init__(
+        self,
+        rate_limiter: TokenBucket,
+        breaker: CircuitBreaker,
+        max_retries: int,
+        retry_base_seconds: float,
+        retry_max_seconds: float
+    ):
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.max_retries = max_retries
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+
+    def call(self, func: Callable[..., T], *args: Any, deadline: Optional[float] = None) -> T:
+        """
+        Call the provider with retries
+
+        Args:
+            func: Provider call
+            *args: Positional arguments for func
+            deadline: Optional time.monotonic() value by which the call must have succeeded
+
+        Returns:
+            The return value of func
+
+        Raises:
+            CircuitOpenError: If the circuit breaker rejected the call
+            UpstreamDeadlineExceeded: If the deadline passed before a call succeeded
+            UpstreamUnavailable: If every attempt failed
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                UPSTREAM_REJECTED.inc(reason="circuit_open")
+                raise CircuitOpenError("Upstream circuit is open")
+            if not self.rate_limiter.acquire(deadline):
+                UPSTREAM_REJECTED.inc(reason="rate_limited")
+                # Nothing went upstream, so a half-open trial is still to be made
+                self.breaker.release()
+                raise UpstreamDeadlineExceeded("Upstream deadline passed while waiting for the rate limiter")
+
+            try:
+                result = func(*args)
+            except Exception as e:
+                self.breaker.record_failure()
+                backoff = random.uniform(0, min(self.retry_max_seconds, self.retry_base_seconds * 2 ** attempt))
+                if attempt >= self.max_retries:
+                    raise UpstreamUnavailable(f"Upstream failed after {attempt + 1} attempts: {str(e)}") from e
+                if deadline is not None and time.monotonic() + backoff > deadline:
+                    UPSTREAM_REJECTED.inc(reason="deadline")
+                    raise UpstreamDeadlineExceeded(f"Upstream deadline passed after {attempt + 1} attempts: {str(e)}") from e
+                attempt += 1
+                UPSTREAM_RETRIES.inc()
+                logger.warning(f"Upstream call failed ({str(e)}), retry {attempt} in {backoff:.2f}s")
+                time.sleep(backoff)
+                continue
+
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Get the guard state
+
+        Returns:
+            Circuit breaker stats plus the tokens left in the rate limiter
+        """
+        return {**self.breaker.stats(), "tokens_available": round(self.rate_limiter.available(), 3)}
@@ -0,0 +1,95 @@
+from typing import Any, Dict, Optional
+import msgpack
+import orjson
+
+# Response formats supported by /api/returns and their media types
+JSON_FORMAT = "json"
+COLUMNAR_FORMAT = "columnar"
+MSGPACK_FORMAT = "msgpack"
+NDJSON_FORMAT = "ndjson"
+
+MEDIA_TYPES: Dict[str, str] = {
+    JSON_FORMAT: "application/json",
+    COLUMNAR_FORMAT: "application/vnd.stock-returns.columnar+json",
+    MSGPACK_FORMAT: "application/x-msgpack",
+    NDJSON_FORMAT: "application/x-ndjson",
+}
+
+def negotiate_format(requested: Optional[str], accept: Optional[str]) -> str:
+    """
+    Pick the response format from the format parameter or the Accept header
+
+    An explicit format parameter wins. Otherwise the first media type in the
+    Accept header that matches a compact format is used, falling back to JSON.
+
+    Args:
+        requested: Value of the format query parameter, if any
+        accept: Value of the Accept header, if any
+
+    Returns:
+        One of the format names in MEDIA_TYPES
+
+    Raises:
+        ValueError: If an unknown format is requested
+    """
+    if requested:
+        requested = requested.strip().lower()
+        if requested not in MEDIA_TYPES:
+            raise ValueError(
+                f"Invalid format: {requested}. Use one of: {', '.join(MEDIA_TYPES)}"
+            )
+        return requested
+
+    if accept:
+        for media_range in accept.split(","):
+            media_type = media_range.split(";")[0].strip().lower()
+            for name, candidate in MEDIA_TYPES.items():
+                if media_type == candidate:
+                    return name
+
+    return JSON_FORMAT
+
+def is_columnar(response_format: str) -> bool:
+    """Whether a format uses the columnar layout (one shared date axis)"""
+    return response_format in (COLUMNAR_FORMAT, MSGPACK_FORMAT)
+
+def is_streaming(response_format: str) -> bool:
+    """Whether a format is streamed symbol by symbol"""
+    return response_format == NDJSON_FORMAT
+
+def encode_ndjson_line(payload: Dict[str, Any]) -> bytes:
+    """Encode one newline-terminated record of a streamed response"""
+    return orjson.dumps(payload, option=orjson.OPT_APPEND_NEWLINE)
+
+def encode_message(payload: Dict[str, Any]) -> str:
+    """Encode one WebSocket text message"""
+    return orjson.dumps(payload).decode()
+
+def encode_returns(returns_data: Dict[str, Any], response_format: str) -> bytes:
+    """
+    Encode returns data for the response body
+
+    Args:
+        returns_data: Per-symbol returns lists for the json format, or the output of
+            StockDataProcessor.calculate_columnar_returns for the columnar formats
+        response_format: One of the format names in MEDIA_TYPES
+
+    Returns:
+        Encoded response body
+    """
+    if response_format == MSGPACK_FORMAT:
+        # Each symbol's returns are packed as one little-endian float32 binary blob
+        # (NaN where missing), which clients can read as a Float32Array directly
+        return msgpack.packb({
+            "dates": returns_data["dates"],
+            "data": {
+                symbol: values.astype("<f4").tobytes()
+                for symbol, values in returns_data["data"].items()
+            }
+        })
+
+    if response_format == COLUMNAR_FORMAT:
+        # orjson writes numpy arrays natively and encodes NaN as null
+        return orjson.dumps(returns_data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    return orjson.dumps({"data": returns_data})
@@ -0,0 +1,190 @@
+from typing import Optional
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+import logging
+
+from config import config
+
+logger = logging.getLogger(__name__)
+
+class SharedCacheBackend(ABC):
+    """Byte store shared by all worker processes, used behind the in-memory caches
+
+    Values are opaque bytes; TTLLRUCache handles serialization. Backends must
+    be safe to use from several threads and several processes at once.
+    """
+
+    name: str = "shared"
+
+    # Longest time any entry is kept, so entries stored without a TTL also leave
+    # eventually; 0 or None keeps them until evicted
+    max_ttl_seconds: Optional[float] = None
+
+    def _capped_ttl(self, ttl_seconds: Optional[float]) -> Optional[float]:
+        """TTL to store an entry with, capped at max_ttl_seconds"""
+        if not self.max_ttl_seconds:
+            return ttl_seconds
+        if ttl_seconds is None:
+            return self.max_ttl_seconds
+        return min(ttl_seconds, self.max_ttl_seconds)
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up a value
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Stored bytes, or None if missing or expired
+        """
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        """
+        Store a value
+
+        Args:
+            key: Cache key
+            value: Bytes to store
+            ttl_seconds: Optional time to live, entries without one never expire
+        """
+
+class SQLiteCacheBackend(SharedCacheBackend):
+    """Shared cache in a SQLite file, for workers running on the same host
+
+    The file is bounded by max_bytes of stored values: once they exceed it, the
+    oldest entries are evicted until they take up EVICT_TO of it again. Sizes
+    are summed every PURGE_INTERVAL writes, or sooner once a tenth of max_bytes
+    has been written, so the file overshoots the cap by little even while other
+    worker processes write too. Expired rows are purged at the same time.
+
+    Also serves as the local stand-in for the Redis backend in development.
+    """
+
+    name = "sqlite"
+
+    # Expired rows are purged and the size cap enforced every this many writes
+    PURGE_INTERVAL = 256
+
+    # Fraction of max_bytes left after an eviction, so eviction does not run on every write
+    EVICT_TO = 0.9
+
+    def __init__(self, path: str, max_bytes: int, max_ttl_seconds: Optional[float] = None):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_ttl_seconds = max_ttl_seconds
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._bytes_since_purge = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        with self._lock, self._conn:
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+            if columns and "stored_at" not in columns:
+                # Written by a version without size tracking; it only holds cached data
+                self._conn.execute("DROP TABLE entries")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL, "
+                "size INTEGER NOT NULL, stored_at REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_stored_at ON entries (stored_at)")
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, time.time())
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        now = time.time()
+        ttl_seconds = self._capped_ttl(ttl_seconds)
+        expires_at = now + ttl_seconds if ttl_seconds is not None else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, expires_at, size, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (key, sqlite3.Binary(value), expires_at, len(value), now)
+            )
+            self._writes += 1
+            self._bytes_since_purge += len(value)
+            if self._writes % self.PURGE_INTERVAL == 0 or self._bytes_since_purge > self.max_bytes / 10:
+                self._purge(now)
+
+    def _purge(self, now: float) -> None:
+        """Delete expired rows, then the oldest ones while the values exceed max_bytes"""
+        self._bytes_since_purge = 0
+        self._conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes * self.EVICT_TO
+        evicted = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY stored_at"):
+            if excess <= 0:
+                break
+            evicted.append((key,))
+            excess -= size
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", evicted)
+        logger.info(f"Evicted {len(evicted)} entries from the shared cache to stay under {self.max_bytes} bytes")
+
+    def size(self) -> int:
+        """Total bytes of the stored values"""
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+class RedisCacheBackend(SharedCacheBackend):
+    """Shared cache in Redis or any server speaking its protocol, for workers spread over hosts"""
+
+    name = "redis"
+
+    def __init__(self, url: str, max_ttl_seconds: Optional[float] = None):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError("SHARED_CACHE_BACKEND=redis requires the redis package") from e
+        self.url = url
+        self.max_ttl_seconds = max_ttl_seconds
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._client.get(key)
+
+    def set(self, key: str, value: bytes, ttl_seconds: Optional[float] = None) -> None:
+        # Memory is bounded by the server's maxmemory policy; the TTL cap ages entries out
+        ttl_seconds = self._capped_ttl(ttl_seconds)
+        if ttl_seconds is None:
+            self._client.set(key, value)
+        else:
+            self._client.set(key, value, px=max(1, int(ttl_seconds * 1000)))
+
+def create_shared_cache(name: Optional[str] = None) -> Optional[SharedCacheBackend]:
+    """
+    Create the shared cache backend selected in the configuration
+
+    Args:
+        name: Backend name, defaults to config.SHARED_CACHE_BACKEND
+
+    Returns:
+        Configured backend, or None if the shared cache is disabled
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    name = (name or config.SHARED_CACHE_BACKEND).lower()
+    if name == "none":
+        return None
+    if name == SQLiteCacheBackend.name:
+        return SQLiteCacheBackend(
+            config.SHARED_CACHE_PATH, config.SHARED_CACHE_MAX_BYTES, config.SHARED_CACHE_MAX_TTL_SECONDS
+        )
+    if name == RedisCacheBackend.name:
+        return RedisCacheBackend(config.SHARED_CACHE_URL, config.SHARED_CACHE_MAX_TTL_SECONDS)
+    raise ValueError(f"Unknown shared cache backend: {name}")
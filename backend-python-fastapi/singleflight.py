@@ -0,0 +1,88 @@
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+class _Call:
+    """A single in-flight execution that other callers can wait on"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Collapses concurrent calls with the same key into one execution
+
+    The first caller for a key (the leader) runs the function; every caller
+    that arrives with the same key while it is running waits for the leader
+    and receives the same result or exception.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[..., T], *args: Any) -> Tuple[T, bool]:
+        """
+        Run func for key, or wait for the execution already in flight for it
+
+        Args:
+            key: Key identifying identical work
+            func: Callable doing the work
+            *args: Positional arguments for func
+
+        Returns:
+            Tuple of the result and whether it was shared from another caller's execution
+
+        Raises:
+            Exception: Whatever func raised, for the leader and all waiting callers
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            logger.debug(f"Coalesced {self.name} call for {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = func(*args)
+            return call.result, False
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get execution counters
+
+        Returns:
+            Dictionary with the number of executions, coalesced calls and calls in flight
+        """
+        with self._lock:
+            return {
+                "executions": self._executions,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._calls)
+            }
@@ -0,0 +1,182 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+import asyncio
+import bisect
+import csv
+import os
+import time
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+logger = logging.getLogger(__name__)
+
+# Column headers recognised in universe files, compared case-insensitively
+SYMBOL_COLUMNS = ("symbol", "ticker")
+NAME_COLUMNS = ("name", "security name", "company name")
+
+class SymbolUniverse:
+    """Index of the symbols the service knows about, loaded from a file
+
+    The file is a CSV with a symbol and a name column, or a pipe-delimited
+    listing such as NASDAQ Trader's nasdaqtraded.txt. Membership checks are a
+    dictionary lookup and prefix searches are binary searches over sorted
+    symbols and names, so both stay fast for tens of thousands of symbols.
+
+    Without a file every symbol counts as known, and searches only cover the
+    always-known symbols (the configured MAG7 and benchmark symbols). A
+    background task reloads the file when its modification time changes; a
+    reload builds a new index and swaps it in as a whole, so readers never see
+    a half-built one.
+    """
+
+    def __init__(self, path: Optional[str], always_known: Dict[str, str], refresh_seconds: float = 3600):
+        self.path = path or None
+        self.refresh_seconds = refresh_seconds
+        self._always_known = {symbol.upper(): name for symbol, name in always_known.items()}
+        self._index = self._build(self._always_known)
+        self._loaded = False
+        self._mtime: Optional[float] = None
+        self._loaded_at: Optional[float] = None
+        self._reload_errors = 0
+        self._task: Optional[asyncio.Task] = None
+        if self.path is not None:
+            self.reload()
+
+    @staticmethod
+    def _build(names: Dict[str, str]) -> Tuple[Dict[str, str], List[str], List[Tuple[str, str]]]:
+        symbols = sorted(names)
+        by_name = sorted((name.lower(), symbol) for symbol, name in names.items() if name)
+        return names, symbols, by_name
+
+    def _read(self) -> Dict[str, str]:
+        """Read symbol -> name pairs from the universe file"""
+        with open(self.path, newline="", encoding="utf-8") as handle:
+            header = handle.readline()
+            delimiter = "|" if "|" in header else ","
+            columns = [column.strip().lower() for column in next(csv.reader([header], delimiter=delimiter))]
+            symbol_column = next((columns.index(c) for c in SYMBOL_COLUMNS if c in columns), None)
+            if symbol_column is None:
+                raise ValueError(f"No symbol column in {self.path}; expected one of: {', '.join(SYMBOL_COLUMNS)}")
+            name_column = next((columns.index(c) for c in NAME_COLUMNS if c in columns), None)
+
+            names = dict(self._always_known)
+            for row in csv.reader(handle, delimiter=delimiter):
+                if len(row) <= symbol_column:
+                    continue
+                symbol = row[symbol_column].strip().upper()
+                # Only symbols the API accepts at all; this also skips footer lines
+                if not symbol.isalnum():
+                    continue
+                name = row[name_column].strip() if name_column is not None and len(row) > name_column else ""
+                names[symbol] = name or names.get(symbol, "")
+            return names
+
+    def reload(self) -> bool:
+        """
+        Load the universe file if it changed since the last load
+
+        Returns:
+            True if a new index was loaded; on errors the current index is kept
+        """
+        if self.path is None:
+            return False
+        try:
+            mtime = os.path.getmtime(self.path)
+            if self._loaded and mtime == self._mtime:
+                return False
+            names = self._read()
+        except (OSError, ValueError) as e:
+            self._reload_errors += 1
+            logger.warning(f"Could not load symbol universe from {self.path}: {str(e)}")
+            return False
+
+        self._index = self._build(names)
+        self._mtime = mtime
+        self._loaded = True
+        self._loaded_at = time.time()
+        logger.info(f"Loaded {len(names)} symbols from {self.path}")
+        return True
+
+    @property
+    def loaded(self) -> bool:
+        """Whether membership is restricted to a loaded universe file"""
+        return self._loaded
+
+    def contains(self, symbol: str) -> bool:
+        """Whether a symbol is known (always True when no universe file is loaded)"""
+        return not self._loaded or symbol in self._index[0]
+
+    def search(self, query: str, limit: int) -> List[Dict[str, str]]:
+        """
+        Find symbols whose ticker or name starts with a query, case-insensitively
+
+        Ticker matches come first, in alphabetical order, followed by name matches.
+
+        Args:
+            query: Prefix to look for
+            limit: Maximum number of results
+
+        Returns:
+            List of {"symbol", "name"} dictionaries
+        """
+        names, symbols, by_name = self._index
+        results: Dict[str, str] = {}
+
+        prefix = query.strip().upper()
+        if prefix:
+            start = bisect.bisect_left(symbols, prefix)
+            for symbol in symbols[start:start + limit]:
+                if not symbol.startswith(prefix):
+                    break
+                results[symbol] = names[symbol]
+
+        prefix = query.strip().lower()
+        if prefix and len(results) < limit:
+            start = bisect.bisect_left(by_name, (prefix, ""))
+            for name, symbol in by_name[start:]:
+                if len(results) >= limit or not name.startswith(prefix):
+                    break
+                results.setdefault(symbol, names[symbol])
+
+        return [{"symbol": symbol, "name": name} for symbol, name in results.items()]
+
+    async def start(self) -> None:
+        """Start reloading the file in the background (no-op without a file)"""
+        if self.path is None or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="symbol-universe-refresh")
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_seconds)
+            await run_in_threadpool(self.reload)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the index state
+
+        Returns:
+            Dictionary with the number of symbols, whether a file is loaded, the
+            time of the last load and the number of failed loads
+        """
+        return {
+            "symbols": len(self._index[0]),
+            "loaded": int(self._loaded),
+            "loaded_at": int(self._loaded_at or 0),
+            "reload_errors": self._reload_errors
+        }
+
+def always_known_symbols(symbols: Iterable[str]) -> Dict[str, str]:
+    """Symbols that are valid even when missing from the universe file, without names"""
+    return {symbol.strip().upper(): "" for symbol in symbols if symbol.strip()}
@@ -0,0 +1,17 @@
+"""Shared setup for the unit tests: run the app offline against synthetic prices"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Configuration is read when the modules are imported, so it is set up first
+os.environ["PRICE_PROVIDER"] = "synthetic"
+os.environ["PRICE_STORE_ENABLED"] = "false"
+os.environ["WARMUP_ENABLED"] = "false"
+os.environ["SHARED_CACHE_BACKEND"] = "none"
+os.environ["SYNTHETIC_LATENCY_MS"] = "0"
+os.environ["UPSTREAM_RATE_PER_SECOND"] = "1000000"
+os.environ["UPSTREAM_BURST"] = "1000000"
+os.environ["UPSTREAM_RETRY_BASE_SECONDS"] = "0"
+os.environ["LOG_LEVEL"] = "WARNING"
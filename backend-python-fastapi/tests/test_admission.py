@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_endpoints
+from admission import AdmissionController, AdmissionRejected
+from main import app
+
+def test_fast_lane_counts_reduced_cost():
+    controller = AdmissionController(max_cost=1000, max_queue=4, max_wait_seconds=1, fast_lane_cost_factor=0.25)
+
+    async def run():
+        async with controller.admit(800, fast_lane=True):
+            assert controller.stats()["in_flight_cost"] == 200
+        assert controller.stats()["in_flight_cost"] == 0
+
+    asyncio.run(run())
+    assert controller.stats()["fast_lane"] == 1
+
+def test_fast_lane_waits_when_cap_is_full():
+    controller = AdmissionController(max_cost=1000, max_queue=0, max_wait_seconds=1, fast_lane_cost_factor=0.25)
+
+    async def run():
+        async with controller.admit(1000):
+            with pytest.raises(AdmissionRejected):
+                async with controller.admit(800, fast_lane=True):
+                    pass
+
+    asyncio.run(run())
+    assert controller.stats()["fast_lane"] == 0
+
+def test_batch_is_admission_controlled(monkeypatch):
+    controller = AdmissionController(max_cost=1000, max_queue=0, max_wait_seconds=1)
+    monkeypatch.setattr(api_endpoints.config, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(api_endpoints, "admission", controller)
+    client = TestClient(app)
+    body = {"queries": [{"start": "2020-01-01", "end": "2020-03-01", "symbols": ["AAPL", "MSFT"]}]}
+
+    response = client.post("/api/returns/batch", json=body)
+    assert response.status_code == 200
+    assert controller.stats()["admitted"] == 1
+    assert controller.stats()["in_flight_cost"] == 0
+
+    # Two uncached symbols over two years cost the whole cap, so the batch has to wait
+    body["queries"][0].update(start="2018-01-01", end="2020-01-01")
+
+    async def hold_cap():
+        async with controller.admit(1):
+            return await asyncio.to_thread(client.post, "/api/returns/batch", json=body)
+
+    response = asyncio.run(hold_cap())
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+
+def test_ndjson_stream_is_admission_controlled(monkeypatch):
+    controller = AdmissionController(max_cost=1000, max_queue=0, max_wait_seconds=1)
+    monkeypatch.setattr(api_endpoints.config, "ADMISSION_ENABLED", True)
+    monkeypatch.setattr(api_endpoints, "admission", controller)
+    client = TestClient(app)
+    query = "/api/returns?start=2021-01-01&end=2021-03-01&symbols=AAPL&format=ndjson"
+
+    response = client.get(query)
+    assert response.status_code == 200
+    assert controller.stats()["admitted"] == 1
+    assert controller.stats()["in_flight_cost"] == 0
+
+    async def hold_cap():
+        async with controller.admit(1000):
+            return await asyncio.to_thread(client.get, query.replace("2021", "2019"))
+
+    response = asyncio.run(hold_cap())
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
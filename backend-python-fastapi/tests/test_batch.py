@@ -0,0 +1,56 @@
+from datetime import date
+
+import api_endpoints
+from api_endpoints import _merge_ranges, _plan_batch_fetches
+
+def test_merge_keeps_distant_ranges_apart():
+    ranges = [(date(2024, 1, 1), date(2024, 2, 1)), (date(2000, 1, 1), date(2000, 2, 1))]
+    assert _merge_ranges(ranges) == sorted(ranges)
+
+def test_merge_joins_overlapping_and_adjacent_ranges():
+    ranges = [
+        (date(2020, 1, 1), date(2020, 3, 1)),
+        (date(2020, 2, 1), date(2020, 4, 1)),
+        (date(2020, 4, 1), date(2020, 5, 1)),
+        (date(2020, 6, 1), date(2020, 7, 1))
+    ]
+    assert _merge_ranges(ranges) == [
+        (date(2020, 1, 1), date(2020, 5, 1)),
+        (date(2020, 6, 1), date(2020, 7, 1))
+    ]
+
+def test_plan_fetches_each_merged_range_once():
+    parsed = {
+        0: (date(2000, 1, 1), date(2000, 2, 1), ["AAPL"]),
+        1: (date(2024, 1, 1), date(2024, 2, 1), ["AAPL", "MSFT"]),
+        2: (date(2024, 1, 15), date(2024, 3, 1), ["MSFT"])
+    }
+    assert _plan_batch_fetches(parsed) == {
+        (date(2000, 1, 1), date(2000, 2, 1)): ["AAPL"],
+        (date(2024, 1, 1), date(2024, 2, 1)): ["AAPL"],
+        (date(2024, 1, 1), date(2024, 3, 1)): ["MSFT"]
+    }
+
+def test_batch_answers_distant_queries(monkeypatch):
+    from fastapi.testclient import TestClient
+    from main import app
+
+    fetched = []
+    fetch = api_endpoints.data_fetcher.fetch_daily_prices
+
+    def recording_fetch(start_date, end_date, symbols, cancel_event=None):
+        fetched.append((start_date, end_date))
+        return fetch(start_date, end_date, symbols, cancel_event)
+
+    monkeypatch.setattr(api_endpoints.data_fetcher, "fetch_daily_prices", recording_fetch)
+    response = TestClient(app).post("/api/returns/batch", json={"queries": [
+        {"start": "2000-03-01", "end": "2000-04-01", "symbols": ["AAPL"]},
+        {"start": "2024-03-01", "end": "2024-04-01", "symbols": ["AAPL"]}
+    ]})
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    assert len(lines) == 2 and all('"data"' in line for line in lines)
+    assert sorted(fetched) == [
+        (date(2000, 3, 1), date(2000, 4, 1)),
+        (date(2024, 3, 1), date(2024, 4, 1))
+    ]
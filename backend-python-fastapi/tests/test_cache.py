@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+import cache
+from cache import TTLLRUCache
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(cache, "time", fake)
+    return fake
+
+def block(fill):
+    """A value the cache sizes at exactly 100 bytes"""
+    return np.full(100, fill, dtype=np.uint8)
+
+def test_evicts_least_recently_used_beyond_byte_budget():
+    lru = TTLLRUCache("test", max_bytes=300)
+    for key in "abc":
+        lru.set(key, block(1))
+    assert lru.get("a") is not None
+
+    lru.set("d", block(1))
+
+    assert lru.get("b") is None
+    assert all(lru.get(key) is not None for key in "acd")
+    stats = lru.stats()
+    assert stats["evictions"] == 1 and stats["bytes"] == 300 and stats["entries"] == 3
+
+def test_replacing_a_key_does_not_count_twice():
+    lru = TTLLRUCache("test", max_bytes=300)
+    lru.set("a", block(1))
+    lru.set("a", block(2))
+
+    assert lru.stats()["bytes"] == 100
+    assert lru.get("a")[0] == 2
+
+def test_value_larger_than_budget_is_not_cached():
+    lru = TTLLRUCache("test", max_bytes=50)
+    lru.set("a", block(1))
+
+    assert lru.get("a") is None
+    assert lru.stats()["entries"] == 0
+
+def test_expired_entry_is_a_miss_but_served_stale(clock):
+    lru = TTLLRUCache("test", max_bytes=1000)
+    lru.set("a", block(1), expires_at=clock.now + 60)
+    lru.set("final", block(2))
+    assert lru.contains("a") and lru.get("a") is not None
+
+    clock.now += 61
+
+    assert not lru.contains("a")
+    assert lru.get("a") is None
+    assert lru.get_stale("a") is not None
+    assert lru.get("final") is not None
+    assert lru.stats()["expirations"] == 1
+
+def test_expired_entries_leave_through_eviction(clock):
+    lru = TTLLRUCache("test", max_bytes=200)
+    lru.set("a", block(1), expires_at=clock.now + 1)
+    clock.now += 2
+    lru.set("b", block(1))
+    lru.set("c", block(1))
+
+    assert lru.get_stale("a") is None
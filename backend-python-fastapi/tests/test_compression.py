@@ -0,0 +1,70 @@
+import gzip
+
+import pytest
+from fastapi.testclient import TestClient
+
+import api_endpoints
+import compression
+from compression import compress, negotiate_encoding
+from main import app
+
+@pytest.fixture
+def with_brotli():
+    pytest.importorskip("brotli")
+
+@pytest.fixture
+def without_brotli(monkeypatch):
+    monkeypatch.setattr(compression, "brotli", None)
+
+def test_brotli_preferred_over_gzip(with_brotli):
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("*") == "br"
+
+def test_gzip_without_brotli(without_brotli):
+    assert negotiate_encoding("gzip, br") == "gzip"
+    assert negotiate_encoding("br") is None
+
+def test_highest_q_value_wins(with_brotli):
+    assert negotiate_encoding("br;q=0.5, gzip;q=0.8") == "gzip"
+    assert negotiate_encoding("br;q=1.0, gzip;q=1.0") == "br"
+    assert negotiate_encoding("GZIP; Q=0.9") == "gzip"
+
+def test_zero_q_value_excludes_coding(with_brotli):
+    assert negotiate_encoding("br;q=0, gzip") == "gzip"
+    assert negotiate_encoding("*;q=0") is None
+    assert negotiate_encoding("*, br;q=0") == "gzip"
+    assert negotiate_encoding("gzip;q=bogus") is None
+
+def test_identity_refusal_still_negotiates_compression(with_brotli):
+    assert negotiate_encoding("identity;q=0, gzip") == "gzip"
+    # Nothing acceptable is left; the body is sent unencoded rather than failing
+    assert negotiate_encoding("identity;q=0") is None
+
+def test_no_header_means_no_encoding():
+    assert negotiate_encoding(None) is None
+    assert negotiate_encoding("") is None
+
+def test_small_bodies_are_left_unencoded():
+    assert compress(b"x" * 10, "gzip") is None
+    assert compress(b"x" * 2048, None) is None
+    assert gzip.decompress(compress(b"x" * 2048, "gzip")) == b"x" * 2048
+
+def test_gzip_output_is_deterministic():
+    body = b"0123456789" * 500
+    assert compress(body, "gzip") == compress(body, "gzip")
+
+def test_repeat_request_is_served_from_compressed_cache():
+    client = TestClient(app)
+    query = "/api/returns?start=2019-01-01&end=2019-07-01&symbols=AAPL,MSFT"
+    before = api_endpoints.compressed_responses.stats()["hits"]
+
+    first = client.get(query, headers={"accept-encoding": "gzip"})
+    second = client.get(query, headers={"accept-encoding": "gzip"})
+
+    assert first.headers["content-encoding"] == second.headers["content-encoding"] == "gzip"
+    assert first.headers["etag"] == second.headers["etag"]
+    assert first.content == second.content
+    assert api_endpoints.compressed_responses.stats()["hits"] == before + 1
+
+def test_compressed_cache_is_per_worker():
+    assert api_endpoints.compressed_responses.shared is None
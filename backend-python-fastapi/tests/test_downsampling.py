@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from downsampling import LTTB, MIN_MAX, NO_DOWNSAMPLING, downsample_indices, lttb_indices, min_max_indices
+
+@pytest.fixture
+def series():
+    rng = np.random.default_rng(3)
+    y = np.cumsum(rng.normal(0, 1, 1000))
+    return np.arange(1000, dtype=np.float64), y
+
+@pytest.mark.parametrize("target", [3, 10, 97, 500, 999])
+def test_lttb_keeps_end_points_and_target_size(series, target):
+    x, y = series
+    indices = lttb_indices(x, y, target)
+
+    assert len(indices) == target
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+
+@pytest.mark.parametrize("target", [1000, 5000])
+def test_lttb_keeps_everything_when_target_is_not_smaller(series, target):
+    x, y = series
+    np.testing.assert_array_equal(lttb_indices(x, y, target), np.arange(len(y)))
+
+def test_lttb_keeps_a_spike(series):
+    x, y = series
+    y = y.copy()
+    y[421] = y.max() + 100
+    assert 421 in lttb_indices(x, y, 50)
+
+@pytest.mark.parametrize("target", [2, 10, 101, 998])
+def test_minmax_keeps_end_points_and_extremes(series, target):
+    _, y = series
+    indices = min_max_indices(y, target)
+
+    # First, last, minimum and maximum are kept even below a target of 4
+    assert len(indices) <= max(target, 4)
+    assert indices[0] == 0 and indices[-1] == len(y) - 1
+    assert np.all(np.diff(indices) > 0)
+    assert np.argmin(y) in indices and np.argmax(y) in indices
+
+def test_minmax_keeps_every_bucket_extreme(series):
+    _, y = series
+    indices = min_max_indices(y, 22)
+
+    for bucket in np.array_split(np.arange(len(y)), 10):
+        assert bucket[np.argmin(y[bucket])] in indices
+        assert bucket[np.argmax(y[bucket])] in indices
+
+@pytest.mark.parametrize("target", [1000, 5000])
+def test_minmax_keeps_everything_when_target_is_not_smaller(series, target):
+    _, y = series
+    np.testing.assert_array_equal(min_max_indices(y, target), np.arange(len(y)))
+
+def test_downsample_dispatch(series):
+    x, y = series
+    np.testing.assert_array_equal(downsample_indices(x, y, NO_DOWNSAMPLING, 10), np.arange(len(y)))
+    np.testing.assert_array_equal(downsample_indices(x, y, LTTB, None), np.arange(len(y)))
+    assert len(downsample_indices(x, y, LTTB, 10)) == 10
+    assert len(downsample_indices(x, y, MIN_MAX, 10)) <= 10
+    with pytest.raises(ValueError):
+        downsample_indices(x, y, "mean", 10)
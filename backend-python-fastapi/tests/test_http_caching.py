@@ -0,0 +1,31 @@
+from fastapi.testclient import TestClient
+
+from main import app
+
+QUERY = "/api/returns?start=2020-01-01&end=2020-06-01&symbols=AAPL,MSFT"
+
+def test_format_from_accept_varies_on_accept():
+    client = TestClient(app)
+    json_response = client.get(QUERY)
+    msgpack_response = client.get(QUERY, headers={"accept": "application/x-msgpack"})
+
+    assert json_response.headers["content-type"].startswith("application/json")
+    assert msgpack_response.headers["content-type"] == "application/x-msgpack"
+    for response in (json_response, msgpack_response):
+        assert "immutable" in response.headers["cache-control"]
+        assert response.headers["vary"] == "Accept, Accept-Encoding"
+    assert json_response.headers["etag"] != msgpack_response.headers["etag"]
+
+def test_format_parameter_only_varies_on_encoding():
+    response = TestClient(app).get(QUERY + "&format=msgpack", headers={"accept": "application/json"})
+
+    assert response.headers["content-type"] == "application/x-msgpack"
+    assert response.headers["vary"] == "Accept-Encoding"
+
+def test_not_modified_keeps_vary():
+    client = TestClient(app)
+    etag = client.get(QUERY).headers["etag"]
+    response = client.get(QUERY, headers={"if-none-match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["vary"] == "Accept, Accept-Encoding"
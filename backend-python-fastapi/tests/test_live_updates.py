@@ -0,0 +1,114 @@
+import asyncio
+import json
+from datetime import date
+
+import numpy as np
+import pytest
+
+from data_processor import StockDataProcessor
+from live_updates import LiveSubscriber, LiveUpdateHub, SymbolPoller
+from price_series import DailySeries, day_number
+
+FIRST_DAY = day_number(date(2024, 3, 4))
+
+class IdleFetcher:
+    """Fetcher whose polls fail, so only the updates made by the tests publish"""
+
+    def fetch_latest_prices(self, symbol, days):
+        raise RuntimeError("not polled in tests")
+
+def prices(closes):
+    return DailySeries(np.arange(FIRST_DAY, FIRST_DAY + len(closes)), np.array(closes, dtype=float))
+
+def drain(subscriber):
+    messages = []
+    while not subscriber.queue.empty():
+        message = subscriber.queue.get_nowait()
+        messages.append(None if message is None else json.loads(message))
+    return messages
+
+@pytest.fixture
+def hub():
+    return LiveUpdateHub(IdleFetcher(), StockDataProcessor(), max_pollers=2)
+
+@pytest.fixture
+def poller(hub):
+    """A poller registered with the hub but without a polling task"""
+    poller = hub._pollers["AAPL"] = SymbolPoller("AAPL")
+    subscriber = LiveSubscriber(16)
+    poller.subscribers.add(subscriber)
+    subscriber.symbols.add("AAPL")
+    return poller
+
+def test_first_poll_publishes_snapshot(hub, poller):
+    (subscriber,) = poller.subscribers
+    hub._update(poller, prices([100.0, 101.0, 99.0]))
+
+    (message,) = drain(subscriber)
+    assert message["type"] == "snapshot"
+    assert [point["date"] for point in message["returns"]] == ["2024-03-05", "2024-03-06"]
+    assert message["returns"][0]["return"] == pytest.approx(0.01)
+
+def test_unchanged_poll_publishes_nothing(hub, poller):
+    (subscriber,) = poller.subscribers
+    hub._update(poller, prices([100.0, 101.0, 99.0]))
+    drain(subscriber)
+
+    hub._update(poller, prices([100.0, 101.0, 99.0]))
+    assert drain(subscriber) == []
+    assert hub.stats()["published"] == 1
+
+def test_update_contains_only_changed_and_new_points(hub, poller):
+    (subscriber,) = poller.subscribers
+    hub._update(poller, prices([100.0, 101.0, 99.0]))
+    drain(subscriber)
+
+    hub._update(poller, prices([100.0, 101.0, 102.0]))
+    (changed,) = drain(subscriber)
+    assert changed["type"] == "update"
+    assert [point["date"] for point in changed["returns"]] == ["2024-03-06"]
+
+    hub._update(poller, prices([100.0, 101.0, 102.0, 103.0]))
+    (appended,) = drain(subscriber)
+    assert [point["date"] for point in appended["returns"]] == ["2024-03-07"]
+    # Late subscribers get the whole current window
+    assert len(json.loads(poller.snapshot)["returns"]) == 3
+
+def test_full_queue_drops_subscriber(hub, poller):
+    (subscriber,) = poller.subscribers
+    slow = LiveSubscriber(1)
+    poller.subscribers.add(slow)
+    slow.symbols.add("AAPL")
+    slow.send("pending")
+
+    hub._update(poller, prices([100.0, 101.0, 99.0]))
+    assert drain(slow) == [None]
+    assert poller.subscribers == {subscriber}
+    assert hub.stats()["overflows"] == 1
+
+def test_subscriptions_beyond_poller_limit_are_rejected(hub):
+    async def run():
+        first, second = hub.connect(), hub.connect()
+        hub.subscribe(first, ["AAPL", "MSFT"])
+
+        with pytest.raises(ValueError):
+            hub.subscribe(second, ["AAPL", "NVDA"])
+        # Rejected subscriptions are all-or-nothing
+        assert second.symbols == set()
+
+        # Symbols that are already polled do not need a new poller
+        hub.subscribe(second, ["AAPL", "MSFT"])
+        assert second.symbols == {"AAPL", "MSFT"}
+
+        hub.unsubscribe(first, ["MSFT"])
+        hub.unsubscribe(second, ["MSFT"])
+        hub.subscribe(second, ["NVDA"])
+
+        stats = hub.stats()
+        await hub.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stats["pollers"] == 2
+    assert stats["max_pollers"] == 2
+    assert stats["rejected"] == 1
@@ -0,0 +1,46 @@
+from datetime import date, datetime
+
+import market_calendar
+from market_calendar import MARKET_TIMEZONE
+
+def at(year, month, day, hour, minute=0):
+    return datetime(year, month, day, hour, minute, tzinfo=MARKET_TIMEZONE)
+
+# 2024-06-07 is a Friday, 2024-06-10 the following Monday
+FRIDAY, MONDAY = date(2024, 6, 7), date(2024, 6, 10)
+
+def test_last_closed_session_across_weekend():
+    assert market_calendar.last_closed_session(at(2024, 6, 7, 15, 59)) == date(2024, 6, 6)
+    assert market_calendar.last_closed_session(at(2024, 6, 7, 16)) == FRIDAY
+    assert market_calendar.last_closed_session(at(2024, 6, 8, 12)) == FRIDAY
+    assert market_calendar.last_closed_session(at(2024, 6, 10, 9)) == FRIDAY
+    assert market_calendar.last_closed_session(at(2024, 6, 10, 16, 30)) == MONDAY
+
+def test_next_session_close_skips_weekend():
+    assert market_calendar.next_session_close(at(2024, 6, 7, 12)) == at(2024, 6, 7, 16)
+    assert market_calendar.next_session_close(at(2024, 6, 7, 16)) == at(2024, 6, 10, 16)
+    assert market_calendar.next_session_close(at(2024, 6, 9, 12)) == at(2024, 6, 10, 16)
+
+def test_closed_sessions_never_expire():
+    assert market_calendar.expiry_for(FRIDAY, at(2024, 6, 8, 12)) is None
+    assert market_calendar.expiry_for(FRIDAY, at(2024, 6, 7, 16)) is None
+
+def test_open_session_expires_at_its_close():
+    assert market_calendar.expiry_for(FRIDAY, at(2024, 6, 7, 10)) == at(2024, 6, 7, 16).timestamp()
+
+def test_weekend_range_expires_at_next_session_close():
+    # Data asked for up to Monday on a Saturday changes once Monday closes
+    assert market_calendar.expiry_for(MONDAY, at(2024, 6, 8, 12)) == at(2024, 6, 10, 16).timestamp()
+    assert market_calendar.expiry_for(date(2024, 6, 9), at(2024, 6, 8, 12)) == at(2024, 6, 10, 16).timestamp()
+
+def test_holidays_count_as_sessions():
+    # Exchange holidays are not modelled: July 4th expires at its own "close",
+    # one session early, which only costs a refetch
+    assert market_calendar.is_trading_day(date(2024, 7, 4))
+    assert market_calendar.expiry_for(date(2024, 7, 4), at(2024, 7, 4, 12)) == at(2024, 7, 4, 16).timestamp()
+    assert market_calendar.is_final(date(2024, 7, 4), at(2024, 7, 5, 9))
+
+def test_sessions_between_counts_weekdays():
+    assert market_calendar.sessions_between(FRIDAY, MONDAY) == 1
+    assert market_calendar.sessions_between(date(2024, 6, 3), date(2024, 6, 17)) == 10
+    assert market_calendar.sessions_between(MONDAY, FRIDAY) == 0
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_processor import StockDataProcessor
+from portfolio_analytics import PortfolioAnalyzer
+
+@pytest.fixture
+def analyzer():
+    return PortfolioAnalyzer(StockDataProcessor())
+
+@pytest.fixture
+def gapped_matrix():
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(0.0, 0.02, size=(250, 4))
+    matrix[:, 1] += 0.5 * matrix[:, 0]
+    # Symbols that did not trade: scattered holidays, a late listing and a long halt
+    matrix[rng.random(matrix.shape) < 0.05] = np.nan
+    matrix[:60, 2] = np.nan
+    matrix[100:180, 3] = np.nan
+    return matrix
+
+def test_covariance_matches_pandas(analyzer, gapped_matrix):
+    expected = pd.DataFrame(gapped_matrix).cov().to_numpy()
+    np.testing.assert_allclose(analyzer.covariance_matrix(gapped_matrix), expected, rtol=1e-9)
+
+def test_correlation_matches_pandas(analyzer, gapped_matrix):
+    expected = pd.DataFrame(gapped_matrix).corr().to_numpy()
+    np.testing.assert_allclose(analyzer.correlation_matrix(gapped_matrix), expected, rtol=1e-9)
+
+def test_beta_matches_pandas(analyzer, gapped_matrix):
+    frame = pd.DataFrame(gapped_matrix)
+    result = analyzer.beta(gapped_matrix, benchmark_column=0)
+    for column in frame:
+        shared = frame[[column, 0]].dropna()
+        covariance = shared.cov().iloc[0, 1]
+        assert result["beta"][column] == pytest.approx(covariance / shared[0].var(), rel=1e-9)
+        assert result["correlation"][column] == pytest.approx(shared.corr().iloc[0, 1], rel=1e-9)
+        assert result["observations"][column] == len(shared)
+
+def test_pairs_without_two_shared_dates_are_nan(analyzer):
+    matrix = np.array([
+        [0.01, np.nan],
+        [np.nan, 0.02],
+        [0.03, np.nan]
+    ])
+    assert np.isnan(analyzer.covariance_matrix(matrix)[0, 1])
+    assert np.isnan(analyzer.correlation_matrix(matrix)[0, 1])
+
+def test_rolling_correlation_matches_pandas(analyzer, gapped_matrix):
+    window = 20
+    frame = pd.DataFrame(gapped_matrix)
+    result = analyzer.rolling_correlation(gapped_matrix, benchmark_column=0, window=window)
+    for column in frame:
+        expected = frame[column].rolling(window).corr(frame[0]).to_numpy()
+        # Only windows in which both symbols traded every day are filled
+        complete = frame[[column, 0]].notna().all(axis=1).rolling(window).sum().to_numpy() == window
+        assert complete.any()
+        np.testing.assert_allclose(result[complete, column], expected[complete], rtol=1e-7)
+        assert np.isnan(result[~complete, column]).all()
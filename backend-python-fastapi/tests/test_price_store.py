@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_fetcher import StockDataFetcher
+from price_providers import PriceProvider
+from price_store import PriceStore
+
+class AdjustingProvider(PriceProvider):
+    """Closes of 100 on every business day, divided by a split factor set by the test
+
+    Like yfinance, every call returns all closes adjusted as of the time of the call.
+    """
+
+    name = "adjusting"
+
+    def __init__(self):
+        self.split_factor = 1.0
+        self.calls = []
+
+    def fetch_close_prices(self, symbol, start_date, end_date):
+        self.calls.append((start_date, end_date))
+        dates = pd.bdate_range(start_date, end_date, inclusive="left")
+        return pd.Series(100.0 / self.split_factor, index=dates, name="Close")
+
+def make_fetcher(tmp_path, provider):
+    return StockDataFetcher(price_store=PriceStore(str(tmp_path / "prices.db")), provider=provider)
+
+def test_gap_fill_after_split_refetches_range_on_new_basis(tmp_path):
+    provider = AdjustingProvider()
+    fetcher = make_fetcher(tmp_path, provider)
+    fetcher._load_symbol_prices("NVDA", date(2024, 1, 1), date(2024, 2, 1))
+
+    # 10:1 split: the provider now reports every earlier close divided by 10
+    provider.split_factor = 10.0
+    prices = fetcher._load_symbol_prices("NVDA", date(2024, 1, 1), date(2024, 3, 1))
+
+    assert np.allclose(prices.values, 10.0)
+    assert provider.calls[-1] == (date(2024, 1, 1), date(2024, 3, 1))
+
+def test_gap_fill_on_same_basis_only_fetches_gap(tmp_path):
+    provider = AdjustingProvider()
+    fetcher = make_fetcher(tmp_path, provider)
+    fetcher._load_symbol_prices("MSFT", date(2024, 1, 1), date(2024, 2, 1))
+    prices = fetcher._load_symbol_prices("MSFT", date(2024, 1, 1), date(2024, 3, 1))
+
+    assert np.allclose(prices.values, 100.0)
+    # The gap plus the last stored session before it, which is compared with the store
+    assert provider.calls[-1] == (date(2024, 1, 31), date(2024, 3, 1))
+    assert fetcher.price_store.missing_ranges("MSFT", date(2024, 1, 1), date(2024, 3, 1)) == []
+
+class SlowProvider(PriceProvider):
+    """Closes of 100 on every business day, taking a while to answer"""
+
+    name = "slow"
+
+    def __init__(self, latency_seconds):
+        self.latency_seconds = latency_seconds
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch_close_prices(self, symbol, start_date, end_date):
+        with self._lock:
+            self.calls.append((start_date, end_date))
+        time.sleep(self.latency_seconds)
+        dates = pd.bdate_range(start_date, end_date, inclusive="left")
+        return pd.Series(100.0, index=dates, name="Close")
+
+def test_concurrent_loads_including_open_session_share_one_fetch(tmp_path):
+    # The session in progress is never marked covered, so followers must not
+    # go back for the gap the leader already fetched
+    provider = SlowProvider(latency_seconds=0.3)
+    fetcher = make_fetcher(tmp_path, provider)
+    start_date, end_date = date.today() - timedelta(days=60), date.today() + timedelta(days=1)
+    barrier = threading.Barrier(10)
+    latencies = []
+
+    def load():
+        barrier.wait()
+        started = time.monotonic()
+        prices = fetcher._load_symbol_prices("MSFT", start_date, end_date)
+        latencies.append(time.monotonic() - started)
+        assert not prices.empty
+
+    threads = [threading.Thread(target=load) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(provider.calls) == 1
+    assert max(latencies) < 2 * provider.latency_seconds
+    assert fetcher.fetch_flight.stats()["executions"] == 1
+
+def test_follower_fetches_what_leader_range_left_out(tmp_path):
+    provider = SlowProvider(latency_seconds=0.3)
+    fetcher = make_fetcher(tmp_path, provider)
+    ranges = [(date(2024, 1, 1), date(2024, 2, 1)), (date(2024, 1, 1), date(2024, 3, 1))]
+    results = {}
+
+    def load(start_date, end_date):
+        results[end_date] = fetcher._load_symbol_prices("MSFT", start_date, end_date)
+
+    first = threading.Thread(target=load, args=ranges[0])
+    first.start()
+    time.sleep(0.1)
+    load(*ranges[1])
+    first.join()
+
+    assert results[date(2024, 3, 1)].last_date == date(2024, 2, 29)
+    assert fetcher.price_store.missing_ranges("MSFT", date(2024, 1, 1), date(2024, 3, 1)) == []
@@ -0,0 +1,141 @@
+import pytest
+
+from metrics import UPSTREAM_RETRIES
+from resilience import CircuitBreaker, TokenBucket, UpstreamGuard, UpstreamUnavailable
+
+def retries_total():
+    _, _, _, samples = UPSTREAM_RETRIES.collect()
+    return sum(sample[1] for sample in samples)
+
+def make_guard(max_retries):
+    return UpstreamGuard(
+        TokenBucket(1000, 1000),
+        CircuitBreaker(failure_threshold=100, reset_seconds=30),
+        max_retries=max_retries,
+        retry_base_seconds=0,
+        retry_max_seconds=0
+    )
+
+def test_retries_are_counted():
+    failures = iter([RuntimeError("throttled"), RuntimeError("throttled")])
+
+    def flaky():
+        error = next(failures, None)
+        if error is not None:
+            raise error
+        return "ok"
+
+    before = retries_total()
+    assert make_guard(max_retries=2).call(flaky) == "ok"
+    assert retries_total() - before == 2
+
+def test_final_failure_is_not_counted_as_retry():
+    def broken():
+        raise RuntimeError("down")
+
+    before = retries_total()
+    with pytest.raises(UpstreamUnavailable):
+        make_guard(max_retries=1).call(broken)
+    assert retries_total() - before == 1
+
+class FakeClock:
+    """Monotonic clock advanced by hand; sleeping advances it"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def test_circuit_opens_after_threshold_and_recovers_through_half_open():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30, clock=clock)
+
+    for _ in range(2):
+        assert breaker.allow()
+        breaker.record_failure()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    assert breaker.stats() == {"state": CircuitBreaker.OPEN, "consecutive_failures": 3, "times_opened": 1}
+    assert not breaker.allow()
+
+    clock.now += 29.9
+    assert not breaker.allow()
+
+    # Half-open: exactly one trial call goes through
+    clock.now += 0.1
+    assert breaker.allow()
+    assert breaker.stats()["state"] == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.stats() == {"state": CircuitBreaker.CLOSED, "consecutive_failures": 0, "times_opened": 1}
+    assert breaker.allow()
+
+def test_failed_trial_reopens_circuit():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.stats()["state"] == CircuitBreaker.OPEN
+    assert not breaker.allow()
+    clock.now += 10
+    assert breaker.allow()
+
+def test_released_trial_lets_another_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=10, clock=clock)
+    breaker.record_failure()
+    clock.now += 10
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=10, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.stats()["state"] == CircuitBreaker.CLOSED
+
+def test_bucket_spends_burst_then_waits_for_refill():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+
+    for _ in range(3):
+        assert bucket.acquire()
+    assert clock.sleeps == []
+    assert bucket.available() == pytest.approx(0)
+
+    assert bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+def test_bucket_refills_up_to_burst():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=2, burst=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+
+    clock.now += 1
+    assert bucket.available() == pytest.approx(2)
+    clock.now += 60
+    assert bucket.available() == pytest.approx(3)
+
+def test_bucket_gives_up_when_deadline_would_pass():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1, burst=1, clock=clock, sleep=clock.sleep)
+    assert bucket.acquire()
+
+    assert not bucket.acquire(deadline=clock.now + 0.5)
+    assert clock.sleeps == []
+    assert bucket.acquire(deadline=clock.now + 1)
@@ -0,0 +1,78 @@
+import pickle
+import time
+
+import numpy as np
+
+from cache import TTLLRUCache, decode_shared
+from price_series import DailySeries
+from shared_cache import SQLiteCacheBackend
+
+def test_sqlite_backend_evicts_oldest_entries_over_size_cap(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "shared.db"), max_bytes=10_000)
+    for i in range(50):
+        backend.set(f"key{i}", bytes(1_000))
+
+    assert backend.size() <= 10_000
+    assert backend.get("key0") is None
+    assert backend.get("key49") == bytes(1_000)
+
+def test_sqlite_backend_caps_ttl_of_immutable_entries(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "shared.db"), max_bytes=10_000, max_ttl_seconds=0.05)
+    backend.set("immutable", b"value")
+    assert backend.get("immutable") == b"value"
+
+    time.sleep(0.1)
+    assert backend.get("immutable") is None
+
+def test_sqlite_backend_replaces_table_without_size_tracking(tmp_path):
+    import sqlite3
+
+    path = str(tmp_path / "shared.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+        conn.execute("INSERT INTO entries VALUES ('old', x'00', NULL)")
+
+    backend = SQLiteCacheBackend(path, max_bytes=10_000)
+    backend.set("new", b"value")
+    assert backend.get("new") == b"value"
+    assert backend.get("old") is None
+
+def test_series_round_trip_through_shared_backend(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "shared.db"), max_bytes=1_000_000)
+    writer = TTLLRUCache("prices", 1_000_000, shared=backend)
+    reader = TTLLRUCache("prices", 1_000_000, shared=backend)
+    series = DailySeries(np.arange(19000, 19010), np.linspace(100.0, 110.0, 10))
+    expires_at = time.time() + 60
+
+    writer.set("AAPL", series, expires_at)
+    writer.set("immutable", series)
+    cached = reader.get("AAPL")
+
+    assert np.array_equal(cached.days, series.days)
+    assert np.array_equal(cached.values, series.values)
+    assert decode_shared(backend.get(reader._shared_key("AAPL")))[1] == expires_at
+    assert reader.get("immutable") is not None
+    assert reader.stats()["shared_hits"] == 2
+
+def test_values_without_shared_encoding_stay_local(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "shared.db"), max_bytes=1_000_000)
+    local = TTLLRUCache("unknown", 1_000_000, shared=backend)
+
+    local.set("XYZ", True)
+    assert local.get("XYZ") is True
+    assert backend.get(local._shared_key("XYZ")) is None
+
+class Exploit:
+    executed = False
+
+    def __reduce__(self):
+        return (setattr, (Exploit, "executed", True))
+
+def test_pickled_payload_in_shared_backend_is_not_executed(tmp_path):
+    backend = SQLiteCacheBackend(str(tmp_path / "shared.db"), max_bytes=1_000_000)
+    reader = TTLLRUCache("prices", 1_000_000, shared=backend)
+    backend.set(reader._shared_key("AAPL"), pickle.dumps((Exploit(), None)))
+
+    assert reader.get("AAPL") is None
+    assert not Exploit.executed
+    assert reader.stats()["shared_errors"] == 1
@@ -0,0 +1,68 @@
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(index):
+        barrier.wait()
+        try:
+            results[index] = target()
+        except Exception as e:
+            errors[index] = e
+
+    threads = [threading.Thread(target=worker, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight("test")
+    calls = []
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return "value"
+
+    results, errors = run_concurrently(8, lambda: flight.do("key", slow))
+
+    assert errors == [None] * 8
+    assert len(calls) == 1
+    assert sorted(shared for _, shared in results) == [False] + [True] * 7
+    assert all(value == "value" for value, _ in results)
+    assert flight.stats() == {"executions": 1, "coalesced": 7, "in_flight": 0}
+
+def test_leader_exception_reaches_followers():
+    flight = SingleFlight("test")
+
+    def failing():
+        time.sleep(0.2)
+        raise ValueError("upstream failed")
+
+    _, errors = run_concurrently(4, lambda: flight.do("key", failing))
+
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert flight.stats()["executions"] == 1
+
+def test_key_is_released_after_the_call():
+    flight = SingleFlight("test")
+    with pytest.raises(ValueError):
+        flight.do("key", lambda: (_ for _ in ()).throw(ValueError("boom")))
+
+    assert flight.do("key", lambda: 1) == (1, False)
+    assert flight.do("key", lambda: 2) == (2, False)
+    assert flight.stats() == {"executions": 3, "coalesced": 0, "in_flight": 0}
+
+def test_different_keys_run_separately():
+    flight = SingleFlight("test")
+    assert flight.do("a", lambda: "a") == ("a", False)
+    assert flight.do("b", lambda: "b") == ("b", False)
@@ -0,0 +1,50 @@
+from datetime import date
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+import api_endpoints
+from main import app
+from price_series import DailySeries, StaleSeries, day_number
+from price_store import PriceStore
+from resilience import UpstreamUnavailable
+
+QUERY = "/api/returns?start=2020-01-01&end=2020-03-01&symbols=AAPL"
+
+@pytest.fixture
+def upstream_down(tmp_path, monkeypatch):
+    """The upstream fails and the store only holds January for AAPL"""
+    store = PriceStore(str(tmp_path / "prices.db"))
+    days = np.arange(day_number(date(2020, 1, 2)), day_number(date(2020, 2, 1)))
+    store.save("AAPL", DailySeries(days, 100.0 + np.arange(len(days))), date(2020, 1, 1), date(2020, 2, 1))
+
+    def unavailable(*args, **kwargs):
+        raise UpstreamUnavailable("upstream down")
+
+    fetcher = api_endpoints.data_fetcher
+    for cache in (fetcher.price_cache, api_endpoints.data_processor.returns_cache, api_endpoints.compressed_responses):
+        cache.clear()
+    monkeypatch.setattr(fetcher, "price_store", store)
+    monkeypatch.setattr(fetcher, "_load_symbol_prices", unavailable)
+    yield
+    store.close()
+
+def test_stale_prices_are_flagged(upstream_down):
+    prices = api_endpoints.data_fetcher.fetch_daily_prices(date(2020, 1, 1), date(2020, 3, 1), ["AAPL"])
+    assert isinstance(prices["AAPL"], StaleSeries) and prices["AAPL"].stale
+    assert prices["AAPL"].last_date < date(2020, 2, 1)
+
+def test_stale_response_is_not_cached_as_final(upstream_down):
+    client = TestClient(app)
+    response = client.get(QUERY, headers={"accept-encoding": "gzip"})
+
+    assert response.status_code == 200
+    assert "immutable" not in response.headers["cache-control"]
+    query_tag = api_endpoints.query_etag(date(2020, 1, 1), date(2020, 3, 1), ["AAPL"], "json")
+    assert query_tag not in response.headers["etag"]
+    assert api_endpoints.compressed_responses.get((query_tag, "gzip")) is None
+    prices = api_endpoints.data_fetcher.fetch_daily_prices(date(2020, 1, 1), date(2020, 3, 1), ["AAPL"])["AAPL"]
+    assert api_endpoints.data_processor.returns_cache.get(
+        api_endpoints.data_processor._returns_cache_key("AAPL", prices)
+    ) is None
@@ -0,0 +1,67 @@
+import os
+from datetime import date, timedelta
+
+import pandas as pd
+import pytest
+
+from data_fetcher import StockDataFetcher
+from price_providers import PriceProvider
+from symbol_universe import SymbolUniverse
+
+class EmptyProvider(PriceProvider):
+    """Knows no symbol: every range comes back without closes"""
+
+    name = "empty"
+
+    def fetch_close_prices(self, symbol, start_date, end_date):
+        return pd.Series(dtype=float, name="Close")
+
+def write_universe(path, symbols, mtime):
+    path.write_text("Symbol,Security Name\n" + "".join(f"{symbol},{symbol} Inc\n" for symbol in symbols))
+    os.utime(path, (mtime, mtime))
+
+def test_symbol_without_recent_closes_is_rejected():
+    fetcher = StockDataFetcher(provider=EmptyProvider())
+    fetcher.validate_symbols(["ZZZZ"])
+
+    with pytest.raises(ValueError):
+        fetcher.fetch_daily_prices(date.today() - timedelta(days=30), date.today() + timedelta(days=1), ["ZZZZ"])
+    with pytest.raises(ValueError, match="Unknown symbols: ZZZZ"):
+        fetcher.validate_symbols(["AAPL", "zzzz"])
+
+def test_symbol_without_old_closes_stays_valid():
+    # An old range may simply predate the listing
+    fetcher = StockDataFetcher(provider=EmptyProvider())
+    with pytest.raises(ValueError):
+        fetcher.fetch_daily_prices(date(2001, 1, 1), date(2001, 3, 1), ["NEWCO"])
+    fetcher.validate_symbols(["NEWCO"])
+
+def test_universe_restricts_symbols(tmp_path):
+    path = tmp_path / "universe.csv"
+    write_universe(path, ["IBM"], mtime=1_000_000)
+    fetcher = StockDataFetcher(universe=SymbolUniverse(str(path), {"AAPL": "Apple Inc"}))
+
+    fetcher.validate_symbols(["IBM", "AAPL"])
+    with pytest.raises(ValueError, match="Unknown symbols: ORCL"):
+        fetcher.validate_symbols(["ORCL"])
+
+def test_universe_reloads_when_file_changes(tmp_path):
+    path = tmp_path / "universe.csv"
+    write_universe(path, ["IBM"], mtime=1_000_000)
+    universe = SymbolUniverse(str(path), {})
+    assert not universe.reload()
+
+    write_universe(path, ["IBM", "ORCL"], mtime=1_000_100)
+    assert universe.reload()
+    assert universe.contains("ORCL")
+    assert universe.search("orcl", 5) == [{"symbol": "ORCL", "name": "ORCL Inc"}]
+
+def test_universe_keeps_index_when_reload_fails(tmp_path):
+    path = tmp_path / "universe.csv"
+    write_universe(path, ["IBM"], mtime=1_000_000)
+    universe = SymbolUniverse(str(path), {})
+
+    path.write_text("no symbols here\n")
+    os.utime(path, (1_000_100, 1_000_100))
+    assert not universe.reload()
+    assert universe.contains("IBM")
@@ -0,0 +1,130 @@
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta
+import asyncio
+import random
+import time
+import logging
+
+from starlette.concurrency import run_in_threadpool
+
+from config import config
+from data_fetcher import StockDataFetcher
+import market_calendar
+
+logger = logging.getLogger(__name__)
+
+class WarmupScheduler:
+    """Background task keeping the price cache warm for the configured symbol universe
+
+    On startup it fetches the full MAX_DATE_RANGE_DAYS window for every symbol,
+    then it sleeps until shortly after each market close and fetches only the
+    latest sessions. Failed symbols are retried with jittered exponential
+    backoff. The service reports ready once the initial warm-up has fetched
+    data; symbols that failed keep being retried in the background so a single
+    bad ticker cannot hold readiness back forever.
+
+    Warm-up only pays off with the price store: it fills the store, from which
+    any range inside the window is then served. Without the store it could only
+    fill the in-memory cache entry of the one exact warm-up range, so it is
+    skipped.
+    """
+
+    # Number of calendar days re-fetched after each close, enough to cover a long weekend
+    REFRESH_WINDOW_DAYS = 7
+
+    def __init__(self, fetcher: StockDataFetcher, symbols: List[str], range_days: int):
+        self.fetcher = fetcher
+        self.symbols = symbols
+        self.range_days = range_days
+        self.enabled = config.WARMUP_ENABLED and fetcher.price_store is not None
+        self.ready = not self.enabled
+        self.last_warm_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Start the background task (no-op if warm-up is disabled or there is no price store)"""
+        if config.WARMUP_ENABLED and not self.enabled:
+            logger.info("Skipping cache warm-up: it needs the price store (PRICE_STORE_ENABLED=false)")
+        if not self.enabled or self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run(), name="price-warmup")
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to finish"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        """
+        Get the warm-up state
+
+        Returns:
+            Dictionary with readiness, the time of the last successful warm-up and the last error
+        """
+        return {
+            "ready": self.ready,
+            "symbols": len(self.symbols),
+            "last_warm_at": self.last_warm_at,
+            "last_error": self.last_error
+        }
+
+    async def _run(self) -> None:
+        today = date.today()
+        logger.info(f"Warming price cache for {len(self.symbols)} symbols over {self.range_days} days")
+        await self._warm_with_backoff(
+            today - timedelta(days=self.range_days),
+            today + timedelta(days=1),
+            mark_ready=True
+        )
+        logger.info("Price cache warm-up complete")
+
+        while True:
+            await asyncio.sleep(self._seconds_until_refresh())
+            last_session = market_calendar.last_closed_session()
+            logger.info(f"Refreshing latest sessions up to {last_session}")
+            await self._warm_with_backoff(
+                last_session - timedelta(days=self.REFRESH_WINDOW_DAYS),
+                last_session + timedelta(days=1)
+            )
+
+    def _seconds_until_refresh(self) -> float:
+        now = datetime.now(market_calendar.MARKET_TIMEZONE)
+        refresh_at = market_calendar.next_session_close(now) + timedelta(
+            minutes=config.WARMUP_REFRESH_DELAY_MINUTES
+        )
+        jitter = random.uniform(0, config.WARMUP_JITTER_SECONDS)
+        return max(0.0, (refresh_at - now).total_seconds()) + jitter
+
+    async def _warm_with_backoff(self, start_date: date, end_date: date, mark_ready: bool = False) -> None:
+        """Fetch a range for all symbols, retrying the ones that failed until all succeed"""
+        pending = list(self.symbols)
+        backoff = config.WARMUP_RETRY_SECONDS
+
+        while pending:
+            try:
+                price_data = await run_in_threadpool(
+                    self.fetcher.fetch_daily_prices, start_date, end_date, pending
+                )
+                pending = [symbol for symbol in pending if symbol not in price_data]
+                self.last_error = f"No data for {', '.join(pending)}" if pending else None
+                if mark_ready and not self.ready:
+                    self.ready = True
+                    logger.info(f"Service ready with {len(price_data)} of {len(self.symbols)} symbols warm")
+            except ValueError as e:
+                self.last_error = str(e)
+
+            if not pending:
+                self.last_warm_at = time.time()
+                return
+
+            delay = backoff + random.uniform(0, backoff)
+            logger.warning(f"Warm-up incomplete for {len(pending)} symbols, retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+            backoff = min(backoff * 2, config.WARMUP_MAX_BACKOFF_SECONDS)
@@ -24,11 +24,10 @@ export async function fetchStockReturns(dateRange: DateRange, symbols?: string):
     }
 
     try {
+        // Plain GET without custom headers: avoids a CORS preflight and lets the
+        // browser cache revalidate responses with the ETag sent by the backend
         const response = await fetch(url, {
             method: 'GET',
-            headers: {
-                'Content-Type': 'application/json',
-            },
         });
 
         if (!response.ok) {